@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark do sistema de física do Gorillas 3D War.
+
+Derruba um prédio feito de blocos físicos e mede o tempo de frame com a
+simulação na thread principal e na task chain própria (usar_thread=True).
+Uma carga de lógica de jogo (em Python) é simulada a cada frame para que o
+paralelismo apareça em máquinas com vários núcleos.
+
+Uso:
+    python benchmark_fisica.py --quadros 600 --lado 8 --andares 20
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+from panda3d.core import loadPrcFileData, LPoint3, LVector3
+
+loadPrcFileData("", """
+    window-type none
+    audio-library-name null
+""")
+
+from direct.showbase.ShowBase import ShowBase
+from panda3d.bullet import BulletPlaneShape
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from src.fisica import SistemaFisica
+from src.modelos import obter_biblioteca
+
+
+def montar_predio(fisica, base, lado, andares):
+    """
+    Cria o chão e um prédio de lado x lado x andares blocos dinâmicos.
+    """
+    chao = base.render.attachNewNode('chao')
+    fisica.criar_corpo_fisico(
+        chao, 0, BulletPlaneShape(LVector3(0, 0, 1), 0), 'terreno', 'chao', e_estatico=True
+    )
+
+    biblioteca = obter_biblioteca(base)
+    blocos = base.render.attachNewNode('predio')
+    for x in range(lado):
+        for y in range(lado):
+            for z in range(andares):
+                bloco = blocos.attachNewNode(f'bloco_{x}_{y}_{z}')
+                bloco.setPos(x - lado / 2.0, y - lado / 2.0, z + 0.5)
+                biblioteca.instanciar("models/misc/box", bloco)
+                fisica.criar_corpo_fisico(
+                    bloco, 1.0, ('caixa', (0.5, 0.5, 0.5)), 'objetos_destrutiveis',
+                    'bloco', tags=['bloco']
+                )
+    return blocos
+
+
+def carga_logica(ms):
+    """
+    Ocupa a thread principal por 'ms' milissegundos, como a lógica do jogo.
+    """
+    fim = time.perf_counter() + ms / 1000.0
+    while time.perf_counter() < fim:
+        pass
+
+
+def executar(base, usar_thread, quadros, lado, andares, logica_ms):
+    """
+    Executa uma rodada do benchmark e retorna os tempos de frame em ms.
+    """
+    fisica = SistemaFisica(base, usar_thread=usar_thread, orcamento_ms=1000.0)
+    blocos = montar_predio(fisica, base, lado, andares)
+
+    # Explosão na base do prédio para iniciar o desabamento
+    fisica.aplicar_forca_explosao(LPoint3(0, 0, 1), 6.0, 40.0)
+
+    tempos = []
+    for _ in range(quadros):
+        inicio = time.perf_counter()
+        carga_logica(logica_ms)
+        fisica.atualizar(1.0 / 60.0)
+        base.taskMgr.step()
+        tempos.append((time.perf_counter() - inicio) * 1000.0)
+
+    passos = fisica.estatisticas['total_passos']
+    fisica.encerrar()
+    blocos.removeNode()
+    return tempos, passos
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da física do Gorillas 3D War")
+    parser.add_argument("--quadros", type=int, default=600, help="Frames por rodada")
+    parser.add_argument("--lado", type=int, default=8, help="Blocos por lado do prédio")
+    parser.add_argument("--andares", type=int, default=20, help="Andares do prédio")
+    parser.add_argument("--logica-ms", type=float, default=4.0,
+                        help="Tempo de lógica de jogo simulada por frame")
+    args = parser.parse_args()
+
+    base = ShowBase()
+    print(f"Prédio com {args.lado * args.lado * args.andares} blocos, "
+          f"{args.quadros} frames, {os.cpu_count()} núcleos")
+
+    for usar_thread in (False, True):
+        tempos, passos = executar(
+            base, usar_thread, args.quadros, args.lado, args.andares, args.logica_ms
+        )
+        tempos.sort()
+        modo = "task chain 'fisica'" if usar_thread else "thread principal"
+        print(f"{modo:>20}: média {statistics.mean(tempos):6.2f} ms | "
+              f"p95 {tempos[int(len(tempos) * 0.95)]:6.2f} ms | "
+              f"máx {tempos[-1]:6.2f} ms | {passos} passos")
+
+    base.destroy()
+
+
+if __name__ == "__main__":
+    main()
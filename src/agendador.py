@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Gorillas 3D War - Agendador de atualização dos efeitos
+Distribui o trabalho dos efeitos visuais entre os frames de acordo com a
+distância à câmera e um orçamento de tempo por frame.
+"""
+import time
+import numpy as np
+from panda3d.core import BoundingSphere
+
+
+class AgendadorEfeitos:
+    """
+    Agendador de atualização dos efeitos visuais.
+
+    As partículas são divididas em faixas de distância definidas pelo
+    'distancia_lod' do nível de qualidade atual: as próximas são atualizadas
+    todo frame, as distantes ou fora da tela a cada poucos frames (com o dt
+    acumulado). O tempo gasto por frame é medido e, quando passa do
+    orçamento, os intervalos aumentam e as emissões de baixa prioridade
+    (centelhas e depois fumaça) são recusadas.
+    """
+    # Prioridades de emissão (menor = recusada primeiro)
+    PRIORIDADE_CENTELHAS = 0
+    PRIORIDADE_FUMACA = 1
+    PRIORIDADE_ESSENCIAL = 2
+
+    # Carga (tempo / orçamento) a partir da qual cada prioridade é recusada
+    LIMITES_CARGA = {
+        PRIORIDADE_CENTELHAS: 1.0,
+        PRIORIDADE_FUMACA: 1.5,
+    }
+
+    def __init__(self, game, lod_manager, orcamento_ms=3.0,
+                 intervalos_faixas=(1, 2, 4), intervalo_fora_tela=8):
+        """
+        Inicializa o agendador.
+
+        Args:
+            game: Referência ao jogo principal.
+            lod_manager: Gerenciador de LOD que fornece o 'distancia_lod'.
+            orcamento_ms: Tempo máximo por frame para atualizar os efeitos.
+            intervalos_faixas: Intervalo em frames para as faixas próxima
+                               (até metade de distancia_lod), média (até
+                               distancia_lod) e distante.
+            intervalo_fora_tela: Intervalo em frames para efeitos fora da tela.
+        """
+        self.game = game
+        self.orcamento_ms = orcamento_ms
+        self.intervalos_faixas = np.array(intervalos_faixas, dtype=np.int64)
+        self.intervalo_fora_tela = intervalo_fora_tela
+
+        config = lod_manager.obter_configuracoes_atuais()
+        self.distancia_lod = config['distancia_lod']
+        lod_manager.registrar_callback_mudanca_qualidade(self._ajustar_qualidade)
+
+        # Estado da câmera no frame atual
+        self._posicao_camera = None
+        self._matriz_tela = None
+
+        # Medição de tempo
+        self._inicio_quadro = None
+        self.tempo_quadro_ms = 0.0
+        self.carga = 0.0          # Média móvel de tempo / orçamento
+        self.fator_sobrecarga = 1  # Multiplicador dos intervalos sob sobrecarga
+
+        # Estatísticas
+        self.estatisticas = {
+            'emissoes_recusadas': {
+                self.PRIORIDADE_CENTELHAS: 0,
+                self.PRIORIDADE_FUMACA: 0
+            },
+            'quadros_sobrecarregados': 0
+        }
+
+    def _ajustar_qualidade(self, qualidade_antiga, qualidade_nova, config):
+        """
+        Callback chamado quando a qualidade dos efeitos muda.
+        """
+        self.distancia_lod = config['distancia_lod']
+
+    def iniciar_quadro(self):
+        """
+        Marca o início da atualização dos efeitos e captura a câmera.
+        """
+        self._inicio_quadro = time.perf_counter()
+        self._capturar_camera()
+
+    def _capturar_camera(self):
+        """
+        Guarda a posição da câmera e a matriz de projeção do frame atual.
+
+        Returns:
+            NodePath da câmera ou None se não houver câmera.
+        """
+        camera = getattr(self.game, 'camera', None)
+        if camera is None or camera.isEmpty():
+            self._posicao_camera = None
+            self._matriz_tela = None
+            return None
+
+        pos = camera.getPos(self.game.render)
+        self._posicao_camera = np.array((pos[0], pos[1], pos[2]), dtype=np.float32)
+
+        # Matriz que leva pontos do mundo ao espaço de recorte da lente
+        lente = getattr(self.game, 'camLens', None)
+        if lente is None:
+            self._matriz_tela = None
+        else:
+            matriz = self.game.render.getMat(camera) * lente.getProjectionMat()
+            self._matriz_tela = np.array([list(matriz.getRow(i)) for i in range(4)], dtype=np.float32)
+        return camera
+
+    def fator_visibilidade(self, posicao, raio):
+        """
+        Avalia quanto detalhe vale a pena gastar em um efeito novo.
+
+        Um efeito fora do campo de visão da câmera vale 0.0. Um efeito
+        visível até 'distancia_lod' vale 1.0, e além disso o fator cai com a
+        distância. No modo de seguir projétil, efeitos perto do projétil
+        seguido contam como visíveis, porque a câmera está indo para lá.
+
+        Args:
+            posicao: Posição do efeito.
+            raio: Raio do efeito.
+
+        Returns:
+            Fator entre 0.0 (invisível) e 1.0 (detalhe completo).
+        """
+        camera = self._capturar_camera()
+        if camera is None:
+            return 1.0
+
+        # Destino previsto da câmera que segue o projétil
+        camera_jogo = getattr(self.game, 'camera_jogo', None)
+        if camera_jogo is not None:
+            ponto = camera_jogo.ponto_interesse()
+            if ponto is not None and (ponto - posicao).length() <= raio * 2.0 + 5.0:
+                return 1.0
+
+        # Teste da esfera do efeito contra o tronco de visão da lente
+        lente = getattr(self.game, 'camLens', None)
+        if lente is not None:
+            tronco = lente.makeBounds()
+            if tronco is not None:
+                centro = camera.getRelativePoint(self.game.render, posicao)
+                if not tronco.contains(BoundingSphere(centro, raio)):
+                    return 0.0
+
+        distancia = (camera.getPos(self.game.render) - posicao).length()
+        if distancia <= self.distancia_lod:
+            return 1.0
+        return max(0.25, self.distancia_lod / distancia)
+
+    def finalizar_quadro(self):
+        """
+        Mede o tempo gasto no frame e ajusta a carga.
+        """
+        if self._inicio_quadro is None:
+            return
+
+        self.tempo_quadro_ms = (time.perf_counter() - self._inicio_quadro) * 1000.0
+        self._inicio_quadro = None
+
+        # Média móvel para evitar oscilações entre frames
+        self.carga = self.carga * 0.8 + (self.tempo_quadro_ms / self.orcamento_ms) * 0.2
+
+        if self.carga > 1.0:
+            self.fator_sobrecarga = 2
+            self.estatisticas['quadros_sobrecarregados'] += 1
+        else:
+            self.fator_sobrecarga = 1
+
+    def pode_emitir(self, prioridade):
+        """
+        Indica se uma emissão da prioridade indicada cabe no orçamento.
+
+        Args:
+            prioridade: Uma das constantes PRIORIDADE_*.
+
+        Returns:
+            True se a emissão pode ser feita.
+        """
+        limite = self.LIMITES_CARGA.get(prioridade)
+        if limite is None or self.carga <= limite:
+            return True
+
+        self.estatisticas['emissoes_recusadas'][prioridade] += 1
+        return False
+
+    def intervalos(self, posicoes):
+        """
+        Calcula de quantos em quantos frames cada posição deve ser atualizada.
+
+        Args:
+            posicoes: Array (n, 3) com as posições no mundo.
+
+        Returns:
+            Array (n,) de inteiros com o intervalo de cada posição.
+        """
+        if self._posicao_camera is None:
+            return np.full(len(posicoes), self.fator_sobrecarga, dtype=np.int64)
+
+        # Faixas de distância a partir do distancia_lod
+        distancias = np.linalg.norm(posicoes - self._posicao_camera, axis=1)
+        limites = (self.distancia_lod * 0.5, self.distancia_lod)
+        resultado = self.intervalos_faixas[np.searchsorted(limites, distancias)]
+
+        # Fora do campo de visão da câmera
+        if self._matriz_tela is not None:
+            recorte = posicoes @ self._matriz_tela[:3] + self._matriz_tela[3]
+            w = recorte[:, 3:4]
+            visivel = (w[:, 0] > 0) & np.all(np.abs(recorte[:, :3]) <= w * 1.1, axis=1)
+            resultado = np.where(visivel, resultado, self.intervalo_fora_tela)
+
+        return resultado * self.fator_sobrecarga
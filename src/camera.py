@@ -174,6 +174,15 @@ class GameCamera:
         self.alvo = projetil
         self.modo = 'seguir_projetil'
         
+    def ponto_interesse(self):
+        """
+        Retorna o ponto para onde a câmera está indo no modo de seguir
+        projétil (a posição do projétil seguido), ou None nos demais modos.
+        """
+        if self.modo == 'seguir_projetil' and self.alvo and hasattr(self.alvo, 'get_pos'):
+            return self.alvo.get_pos()
+        return None
+        
     def modo_panoramico(self):
         """
         Ativa o modo de câmera panorâmica.
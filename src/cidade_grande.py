@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Gorillas 3D War - Cidade grande
+Modo de mapa grande: a cidade é dividida em lotes gerados sob demanda a
+partir da semente. Só os lotes perto da câmera e da área de jogo existem
+como prédios de verdade; os mais distantes viram caixas simples
+(impostores) e os que estão fora de alcance não ocupam memória nenhuma.
+"""
+import math
+import random
+import time
+
+import numpy as np
+
+from src.city import CityGenerator, Building, AtlasJanelas, criar_geom_caixas
+
+
+class CidadeGrande(CityGenerator):
+    """
+    Cidade de mapa grande, gerada e descartada aos lotes conforme a câmera
+    se move.
+
+    Cada lote (LADO_LOTE x LADO_LOTE posições da grade) é sorteado só a
+    partir da semente e da sua chave, então pode ser gerado em qualquer
+    ordem, descartado e gerado de novo igual. Um lote tem três estados:
+
+    - detalhe: prédios completos, com janelas, colisão e destruição;
+    - impostor: uma caixa colorida por prédio em um único Geom;
+    - descarregado: nada na memória.
+
+    Os gorilas ficam sempre dentro de uma única área de jogo (um círculo
+    de RAIO_AREA_JOGO, do tamanho da cidade normal) sorteada pela semente;
+    o resto da cidade é cenário.
+
+    O estado depende da distância do lote à câmera e à área de jogo, com
+    uma folga (HISTERESE) para não alternar na borda. As trocas são feitas aos
+    poucos, das mais próximas para as mais distantes, dentro de um
+    orçamento de tempo por frame.
+    """
+    # Distâncias (até a borda do lote) de cada nível
+    RAIO_DETALHE = 120.0
+    RAIO_IMPOSTOR = 400.0
+
+    # Folga para rebaixar um lote que já está carregado
+    HISTERESE = 1.15
+
+    # Raio da área onde ficam os gorilas (menor que RAIO_DETALHE, para que
+    # os prédios deles estejam sempre em detalhe)
+    RAIO_AREA_JOGO = 60.0
+
+    def __init__(self, game, raio_detalhe=None, raio_impostor=None, orcamento_ms=2.0):
+        """
+        Inicializa a cidade grande.
+
+        Args:
+            game: Referência ao jogo principal.
+            raio_detalhe: Distância até a qual os lotes têm prédios completos.
+            raio_impostor: Distância até a qual os lotes aparecem como caixas.
+            orcamento_ms: Tempo máximo por frame gasto gerando lotes.
+        """
+        # Os lotes não vão para o cache em disco: são gerados sob demanda
+        super().__init__(game, diretorio_cache=None)
+
+        self.raio_detalhe = raio_detalhe or self.RAIO_DETALHE
+        self.raio_impostor = raio_impostor or self.RAIO_IMPOSTOR
+        self.orcamento_ms = orcamento_ms
+
+        # Dimensões da cidade atual (em prédios e em lotes)
+        self.dimensoes = (0, 0)
+        self.dimensoes_lotes = (0, 0)
+        self.origem = (0.0, 0.0)
+
+        # Centro XY da área de jogo
+        self.centro_jogo = (0.0, 0.0)
+
+        # Impostores (chave -> NodePath) e atlas de janelas de cada lote
+        # em detalhe (o atlas do gerador fica só como entrada padrão do shader)
+        self.impostores = {}
+        self.atlas_lotes = {}
+
+        # Posição (linha, coluna) dos prédios carregados e dos destruídos,
+        # para que não voltem quando o lote for gerado de novo
+        self._posicao_predio = {}
+        self._removidos = set()
+
+        self.estatisticas = {'detalhe': 0, 'impostores': 0, 'pendentes': 0, 'tempo_ms': 0.0}
+        self._tarefa = None
+
+    @property
+    def passo(self):
+        """
+        Distância entre prédios vizinhos da grade.
+        """
+        return self.ESPACAMENTO_PREDIOS + self.LARGURA_RUA
+
+    def gerar_cidade(self, rows, cols, semente=None):
+        """
+        Prepara uma cidade grande e gera os lotes próximos da câmera.
+
+        Args:
+            rows: Número de linhas de prédios.
+            cols: Número de colunas de prédios.
+            semente: Semente da cidade; sorteada se omitida.
+
+        Returns:
+            NodePath do nó raiz da cidade.
+        """
+        self.limpar_cidade()
+
+        if semente is None:
+            semente = random.randrange(2 ** 31)
+        self.semente = semente
+
+        total_width = cols * self.passo - self.LARGURA_RUA
+        total_depth = rows * self.passo - self.LARGURA_RUA
+        self.dimensoes = (rows, cols)
+        self.dimensoes_lotes = (math.ceil(rows / self.LADO_LOTE), math.ceil(cols / self.LADO_LOTE))
+        self.origem = (-total_width / 2, -total_depth / 2)
+
+        # Chão do tamanho da cidade
+        self.city_size = max(total_width, total_depth)
+        self.create_ground()
+
+        # Área de jogo inteira dentro da cidade
+        rng = random.Random(f"{semente}:area")
+        folga_x = max(0.0, total_width / 2 - self.RAIO_AREA_JOGO)
+        folga_y = max(0.0, total_depth / 2 - self.RAIO_AREA_JOGO)
+        self.centro_jogo = (rng.uniform(-folga_x, folga_x), rng.uniform(-folga_y, folga_y))
+
+        # Os lotes próximos e os da área de jogo são gerados já, para os
+        # gorilas terem onde ficar
+        self.atualizar_lotes(orcamento_ms=None)
+
+        if self._tarefa is None:
+            self._tarefa = self.game.taskMgr.add(self._tarefa_atualizar, 'atualizar_cidade_grande')
+        return self.city_node
+
+    def planta_lote(self, chave):
+        """
+        Sorteia a planta de um lote: posição, dimensões e cor dos prédios.
+
+        Args:
+            chave: Chave (linha, coluna) do lote.
+
+        Returns:
+            Lista de (linha, coluna, x, y, largura, profundidade, altura,
+            cor) dos prédios não destruídos do lote.
+        """
+        rng = random.Random(f"{self.semente}:lote:{chave[0]}:{chave[1]}")
+        rows, cols = self.dimensoes
+        planta = []
+        for row in range(chave[0] * self.LADO_LOTE, min((chave[0] + 1) * self.LADO_LOTE, rows)):
+            for col in range(chave[1] * self.LADO_LOTE, min((chave[1] + 1) * self.LADO_LOTE, cols)):
+                # Sorteia sempre, para o resto do lote não mudar quando um
+                # prédio é destruído
+                height = rng.uniform(10, 30)
+                width = rng.uniform(3.0, 7.0)
+                depth = rng.uniform(3.0, 7.0)
+                cor = (rng.uniform(0.3, 0.5), rng.uniform(0.3, 0.5), rng.uniform(0.3, 0.6))
+                if (row, col) in self._removidos:
+                    continue
+                x = self.origem[0] + col * self.passo
+                y = self.origem[1] + row * self.passo
+                planta.append((row, col, x, y, width, depth, height, cor))
+        return planta
+
+    def _carregar_lote(self, chave):
+        """
+        Gera os prédios completos de um lote.
+        """
+        atlas = AtlasJanelas(largura=128) if self.shader_fachada is not None else None
+        self.lotes[chave] = {'predios': [], 'node': None}
+        for row, col, x, y, width, depth, height, cor in self.planta_lote(chave):
+            # Janelas sorteadas por prédio, independentes dos vizinhos
+            rng = random.Random(f"{self.semente}:predio:{row}:{col}")
+            building = Building(self.game, x, y, height, width, depth, atlas=atlas,
+                                rng=rng, color=cor)
+            self._registrar_predio(building, chave)
+            self._posicao_predio[building] = (row, col)
+
+        if atlas is not None:
+            atlas.atualizar_textura()
+            self.atlas_lotes[chave] = atlas
+        self._montar_lote(chave)
+
+    def _descarregar_lote(self, chave):
+        """
+        Descarta os prédios de um lote.
+        """
+        lote = self.lotes.pop(chave)
+        for predio in lote['predios']:
+            predio.node.removeNode()
+            self.grade.remover(predio)
+            self._lote_do_predio.pop(predio, None)
+            self._posicao_predio.pop(predio, None)
+        removidos = set(lote['predios'])
+        self.buildings = [b for b in self.buildings if b not in removidos]
+
+        if lote['node'] is not None:
+            lote['node'].removeNode()
+        self.atlas_lotes.pop(chave, None)
+
+    def _criar_impostor(self, chave):
+        """
+        Cria as caixas que representam um lote distante.
+        """
+        planta = self.planta_lote(chave)
+        if not planta:
+            self.impostores[chave] = None
+            return
+
+        minimos = [(x, y, 0.0) for _, _, x, y, _, _, _, _ in planta]
+        maximos = [(x + w, y + d, h) for _, _, x, y, w, d, h, _ in planta]
+        cores = [cor for *_, cor in planta]
+        geom_node = criar_geom_caixas(f'impostor_{chave[0]}_{chave[1]}', minimos, maximos, cores)
+        # Sem shader, como os níveis de caixas dos lotes
+        self.impostores[chave] = self.city_node.attachNewNode(geom_node)
+
+    def _remover_impostor(self, chave):
+        """
+        Remove as caixas de um lote.
+        """
+        impostor = self.impostores.pop(chave)
+        if impostor is not None:
+            impostor.removeNode()
+
+    def _montar_lote(self, chave):
+        """
+        Monta o Geom do lote com o atlas de janelas do próprio lote.
+        """
+        super()._montar_lote(chave)
+        node = self.lotes[chave]['node']
+        if node is not None and chave in self.atlas_lotes:
+            node.setShaderInput('atlas_janelas', self.atlas_lotes[chave].textura)
+
+    def _pontos_interesse(self):
+        """
+        Posições XY em volta das quais os lotes ficam carregados: a câmera
+        e o centro da área de jogo (cujos prédios, onde estão os gorilas,
+        nunca podem sumir durante o jogo).
+        """
+        camera = self.game.camera.getPos(self.game.render)
+        return [(camera.getX(), camera.getY()), self.centro_jogo]
+
+    def _distancias_lotes(self, pontos, alcance):
+        """
+        Distância de cada lote até o ponto de interesse mais próximo.
+
+        Args:
+            pontos: Posições XY de interesse.
+            alcance: Distância máxima considerada.
+
+        Returns:
+            Dicionário chave -> distância dos lotes dentro do alcance.
+        """
+        lado = self.LADO_LOTE * self.passo
+        linhas, colunas = self.dimensoes_lotes
+        distancias = {}
+        for px, py in pontos:
+            a0 = max(0, math.floor((py - alcance - self.origem[1]) / lado))
+            a1 = min(linhas - 1, math.floor((py + alcance - self.origem[1]) / lado))
+            b0 = max(0, math.floor((px - alcance - self.origem[0]) / lado))
+            b1 = min(colunas - 1, math.floor((px + alcance - self.origem[0]) / lado))
+            if a0 > a1 or b0 > b1:
+                continue
+
+            # Distância do ponto ao retângulo de cada lote
+            a, b = np.meshgrid(np.arange(a0, a1 + 1), np.arange(b0, b1 + 1), indexing='ij')
+            x0 = self.origem[0] + b * lado
+            y0 = self.origem[1] + a * lado
+            dx = np.maximum(np.maximum(x0 - px, px - (x0 + lado)), 0.0)
+            dy = np.maximum(np.maximum(y0 - py, py - (y0 + lado)), 0.0)
+            distancia = np.hypot(dx, dy)
+
+            for i, j in zip(*np.nonzero(distancia <= alcance)):
+                chave = (int(a[i, j]), int(b[i, j]))
+                d = float(distancia[i, j])
+                if d < distancias.get(chave, math.inf):
+                    distancias[chave] = d
+        return distancias
+
+    def atualizar_lotes(self, orcamento_ms=-1):
+        """
+        Carrega, rebaixa e descarta lotes conforme os pontos de interesse.
+
+        Args:
+            orcamento_ms: Tempo máximo gasto gerando lotes; o padrão da
+                          cidade se -1, sem limite se None. Pelo menos uma
+                          troca é feita por chamada.
+        """
+        inicio = time.perf_counter()
+        if orcamento_ms == -1:
+            orcamento_ms = self.orcamento_ms
+
+        distancias = self._distancias_lotes(self._pontos_interesse(), self.raio_impostor * self.HISTERESE)
+
+        # Nível desejado de cada lote (a histerese só vale para quem já está
+        # carregado naquele nível ou acima)
+        trocas = []
+        for chave, d in distancias.items():
+            detalhe = chave in self.lotes
+            impostor = chave in self.impostores
+            if d < self.raio_detalhe or (detalhe and d < self.raio_detalhe * self.HISTERESE):
+                if not detalhe:
+                    trocas.append((d, chave, 'detalhe'))
+            elif d < self.raio_impostor or ((detalhe or impostor) and d < self.raio_impostor * self.HISTERESE):
+                if detalhe or not impostor:
+                    trocas.append((d, chave, 'impostor'))
+            elif detalhe or impostor:
+                trocas.append((d, chave, None))
+
+        # Lotes fora de alcance são descartados na hora: é barato
+        for chave in [c for c in self.lotes if c not in distancias]:
+            self._descarregar_lote(chave)
+        for chave in [c for c in self.impostores if c not in distancias]:
+            self._remover_impostor(chave)
+
+        # Gera do mais próximo para o mais distante, dentro do orçamento
+        trocas.sort(key=lambda troca: troca[0])
+        feitas = 0
+        for _, chave, nivel in trocas:
+            if feitas and orcamento_ms is not None and \
+                    (time.perf_counter() - inicio) * 1000.0 > orcamento_ms:
+                break
+            if nivel == 'detalhe':
+                self._carregar_lote(chave)
+                if chave in self.impostores:
+                    self._remover_impostor(chave)
+            elif nivel == 'impostor':
+                if chave not in self.impostores:
+                    self._criar_impostor(chave)
+                if chave in self.lotes:
+                    self._descarregar_lote(chave)
+            else:
+                if chave in self.lotes:
+                    self._descarregar_lote(chave)
+                if chave in self.impostores:
+                    self._remover_impostor(chave)
+            feitas += 1
+
+        self.estatisticas = {
+            'detalhe': len(self.lotes),
+            'impostores': len(self.impostores),
+            'pendentes': len(trocas) - feitas,
+            'tempo_ms': (time.perf_counter() - inicio) * 1000.0
+        }
+
+    def _tarefa_atualizar(self, task):
+        """
+        Tarefa de cada frame: acompanha a câmera e os gorilas.
+        """
+        self.atualizar_lotes()
+        return task.cont
+
+    def limites(self):
+        """
+        Retorna os limites do mundo: a cidade grande inteira com a folga de
+        MARGEM_LIMITES.
+
+        Returns:
+            ((x_min, y_min, z_min), (x_max, y_max, z_max)).
+        """
+        rows, cols = self.dimensoes
+        meio_x = (cols * self.passo - self.LARGURA_RUA) / 2 + self.MARGEM_LIMITES
+        meio_y = (rows * self.passo - self.LARGURA_RUA) / 2 + self.MARGEM_LIMITES
+        z_min, z_max = self.ALTURA_LIMITES
+        return (-meio_x, -meio_y, z_min), (meio_x, meio_y, z_max)
+
+    def predios_area_jogo(self):
+        """
+        Retorna os prédios carregados cujo centro está na área de jogo.
+        """
+        cx, cy = self.centro_jogo
+        return [predio for predio in self.buildings
+                if math.hypot(predio.x + predio.width / 2 - cx,
+                              predio.y + predio.depth / 2 - cy) <= self.RAIO_AREA_JOGO]
+
+    def remover_predio(self, predio):
+        """
+        Remove um prédio e o marca como destruído, para que não volte
+        quando o seu lote for gerado de novo.
+
+        Args:
+            predio: Prédio a remover.
+        """
+        posicao = self._posicao_predio.pop(predio, None)
+        if posicao is not None:
+            self._removidos.add(posicao)
+        super().remover_predio(predio)
+
+    def limpar_cidade(self):
+        """
+        Remove todos os lotes, impostores e o registro de destruídos.
+        """
+        super().limpar_cidade()
+        for chave in list(self.impostores):
+            self._remover_impostor(chave)
+        self.atlas_lotes = {}
+        self._posicao_predio = {}
+        self._removidos = set()
+
+    def destruir(self):
+        """
+        Para a atualização dos lotes e remove a cidade.
+        """
+        if self._tarefa is not None:
+            self.game.taskMgr.remove(self._tarefa)
+            self._tarefa = None
+        super().destruir()
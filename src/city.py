@@ -3,169 +3,571 @@
 """
 Gorillas 3D War - Módulo de geração da cidade
 """
-from panda3d.core import NodePath, Texture, TextureStage
-from panda3d.core import CardMaker, PandaNode, LPoint3, LVector3
+from panda3d.core import NodePath, Texture, TextureStage, Filename, ShaderAttrib
+from panda3d.core import CardMaker, PandaNode, LODNode, LPoint3, LVector3
+from panda3d.core import Geom, GeomNode, GeomTriangles, GeomVertexData
+from panda3d.core import GeomVertexFormat, GeomVertexArrayFormat, InternalName
 from direct.showbase.ShowBase import ShowBase
+import os
 import random
 import numpy as np
+from src.grade import GradeEspacial
+from src.shaders import criar_shader_fachada
+
+# Incrementar sempre que a geração da cidade mudar, invalidando o cache em disco
+VERSAO_CIDADE = 2
+
+
+def criar_geom_malha(nome, vertices, normais, cores, fachada, janela, indices):
+    """
+    Cria um GeomNode com um único Geom a partir de arrays NumPy.
+    
+    Args:
+        nome: Nome do GeomNode.
+        vertices: Posições (n, 3).
+        normais: Normais (n, 3).
+        cores: Cores RGBA (n, 4).
+        fachada: Grade de janelas e canto no atlas (n, 4), como texcoord.
+        janela: Fração de cada célula ocupada pela janela (n, 2).
+        indices: Triângulos (m, 3).
+        
+    Returns:
+        GeomNode com a malha.
+    """
+    # Formato com arrays separados para escrita direta via NumPy
+    formato = GeomVertexFormat()
+    for coluna, componentes, contents in ((InternalName.getVertex(), 3, Geom.C_point),
+                                          (InternalName.getNormal(), 3, Geom.C_normal),
+                                          (InternalName.getColor(), 4, Geom.C_color),
+                                          (InternalName.getTexcoord(), 4, Geom.C_texcoord),
+                                          (InternalName.make('janela'), 2, Geom.C_other)):
+        array = GeomVertexArrayFormat()
+        array.addColumn(coluna, componentes, Geom.NT_float32, contents)
+        formato.addArray(array)
+    formato = GeomVertexFormat.registerFormat(formato)
+    
+    vdata = GeomVertexData(nome, formato, Geom.UHStatic)
+    vdata.setNumRows(len(vertices))
+    for indice, dados in enumerate((vertices, normais, cores, fachada, janela)):
+        destino = np.frombuffer(memoryview(vdata.modifyArray(indice)), dtype=np.float32)
+        destino[:] = np.ascontiguousarray(dados, dtype=np.float32).ravel()
+    
+    triangulos = GeomTriangles(Geom.UHStatic)
+    grande = len(vertices) > 0xffff
+    triangulos.setIndexType(Geom.NT_uint32 if grande else Geom.NT_uint16)
+    lista_indices = triangulos.modifyVertices()
+    lista_indices.setNumRows(indices.size)
+    np.asarray(memoryview(lista_indices))[:] = indices.ravel().astype(np.uint32 if grande else np.uint16)
+    
+    geom = Geom(vdata)
+    geom.addPrimitive(triangulos)
+    geom_node = GeomNode(nome)
+    geom_node.addGeom(geom)
+    return geom_node
+
+
+# Faces de uma caixa unitária (quatro laterais e o topo): cantos em ordem
+# anti-horária vistos de fora e normal
+FACES_CAIXA = np.array([
+    [(1, 1, 0), (0, 1, 0), (0, 1, 1), (1, 1, 1)],  # Frente (y = 1)
+    [(0, 0, 0), (1, 0, 0), (1, 0, 1), (0, 0, 1)],  # Trás (y = 0)
+    [(0, 1, 0), (0, 0, 0), (0, 0, 1), (0, 1, 1)],  # Esquerda (x = 0)
+    [(1, 0, 0), (1, 1, 0), (1, 1, 1), (1, 0, 1)],  # Direita (x = 1)
+    [(0, 0, 1), (1, 0, 1), (1, 1, 1), (0, 1, 1)],  # Topo (z = 1)
+], dtype=np.float32)
+NORMAIS_CAIXA = np.array([(0, 1, 0), (0, -1, 0), (-1, 0, 0), (1, 0, 0), (0, 0, 1)], dtype=np.float32)
+
+
+def criar_geom_caixas(nome, minimos, maximos, cores):
+    """
+    Cria um GeomNode com caixas coloridas, sem base e sem janelas (níveis
+    de detalhe baixos e impostores).
+
+    Args:
+        nome: Nome do GeomNode.
+        minimos: Cantos mínimos das caixas (n, 3).
+        maximos: Cantos máximos das caixas (n, 3).
+        cores: Cores RGB das caixas (n, 3); o topo fica mais escuro.
+
+    Returns:
+        GeomNode com as caixas.
+    """
+    minimos = np.asarray(minimos, dtype=np.float32)
+    tamanhos = np.asarray(maximos, dtype=np.float32) - minimos
+    n = len(minimos)
+    faces = len(FACES_CAIXA)
+
+    vertices = minimos[:, None, None, :] + FACES_CAIXA[None] * tamanhos[:, None, None, :]
+    normais = np.broadcast_to(NORMAIS_CAIXA[None, :, None, :], (n, faces, 4, 3))
+
+    # Topo com 80% da cor, como nos prédios
+    sombra = np.ones(faces, dtype=np.float32)
+    sombra[-1] = 0.8
+    cores = np.asarray(cores, dtype=np.float32)[:, None, :] * sombra[None, :, None]
+    cores = np.concatenate((cores, np.ones((n, faces, 1), dtype=np.float32)), axis=2)
+    cores = np.repeat(cores[:, :, None, :], 4, axis=2)
+
+    quads = 4 * np.arange(n * faces, dtype=np.uint32)[:, None]
+    indices = (quads + np.array([0, 1, 2, 0, 2, 3], dtype=np.uint32)).reshape(-1, 3)
+
+    total = n * faces * 4
+    return criar_geom_malha(
+        nome, vertices.reshape(-1, 3), normais.reshape(-1, 3), cores.reshape(-1, 4),
+        np.full((total, 4), -1.0, dtype=np.float32), np.zeros((total, 2), dtype=np.float32),
+        indices
+    )
+
+
+class AtlasJanelas:
+    """
+    Atlas com o estado das janelas de todos os prédios.
+    
+    Cada prédio recebe uma região retangular (empacotada em prateleiras) com
+    um texel por janela: R é o limiar de acendimento, G a fase da
+    cintilação e B marca as células que têm janela. A região de cada face
+    tem uma coluna e uma linha extras sem janela, que o shader lê na borda
+    da grade. Mudar o estado de janelas é escrever texels e reenviar a
+    textura uma vez.
+    """
+    def __init__(self, largura=256):
+        """
+        Inicializa o atlas.
+        
+        Args:
+            largura: Largura do atlas em texels (a altura cresce conforme
+                     a necessidade).
+        """
+        self.largura = largura
+        self.pixels = np.zeros((64, largura, 4), dtype=np.uint8)
+        
+        # Prateleira atual do empacotamento
+        self._x = 0
+        self._y = 0
+        self._altura_prateleira = 0
+        
+        self.textura = Texture('atlas_janelas')
+        self.textura.setMagfilter(Texture.FTNearest)
+        self.textura.setMinfilter(Texture.FTNearest)
+        self._alterado = True
+        
+    def alocar(self, largura, altura):
+        """
+        Reserva uma região do atlas.
+        
+        Args:
+            largura: Largura da região em texels.
+            altura: Altura da região em texels.
+            
+        Returns:
+            Canto (x, y) da região.
+        """
+        if largura > self.largura:
+            raise ValueError(f"Região de {largura} texels não cabe no atlas de {self.largura}")
+        
+        # Nova prateleira quando a atual enche
+        if self._x + largura > self.largura:
+            self._y += self._altura_prateleira
+            self._x = 0
+            self._altura_prateleira = 0
+        
+        # Dobra a altura do atlas se necessário
+        while self._y + altura > len(self.pixels):
+            self.pixels = np.concatenate((self.pixels, np.zeros_like(self.pixels)))
+        
+        canto = (self._x, self._y)
+        self._x += largura
+        self._altura_prateleira = max(self._altura_prateleira, altura)
+        return canto
+        
+    def escrever(self, x, y, texels):
+        """
+        Escreve um bloco de texels (altura, largura, 4) a partir de (x, y).
+        """
+        altura, largura = texels.shape[:2]
+        self.pixels[y:y + altura, x:x + largura] = texels
+        self._alterado = True
+        
+    def atualizar_textura(self):
+        """
+        Envia os texels alterados para a textura em uma única cópia.
+        """
+        if not self._alterado:
+            return
+        altura = len(self.pixels)
+        if self.textura.getXSize() != self.largura or self.textura.getYSize() != altura:
+            self.textura.setup2dTexture(self.largura, altura, Texture.T_unsigned_byte, Texture.F_rgba8)
+        
+        # Sem inverter as linhas: o shader endereça as linhas da imagem em memória
+        self.textura.setRamImageAs(self.pixels.tobytes(), "RGBA")
+        self._alterado = False
+        
+    def cursor(self):
+        """
+        Estado do empacotamento (x, y, altura da prateleira).
+        """
+        return (self._x, self._y, self._altura_prateleira)
+        
+    def restaurar(self, pixels, cursor):
+        """
+        Restaura texels e empacotamento salvos.
+        
+        Args:
+            pixels: Texels (altura, largura, 4).
+            cursor: Estado do empacotamento retornado por cursor().
+        """
+        self.pixels = np.array(pixels, dtype=np.uint8)
+        self.largura = self.pixels.shape[1]
+        self._x, self._y, self._altura_prateleira = (int(v) for v in cursor)
+        self._alterado = True
+        
+    def limpar(self):
+        """
+        Libera todas as regiões.
+        """
+        self.pixels[:] = 0
+        self._x = self._y = self._altura_prateleira = 0
+        self._alterado = True
+
 
 class Building:
     """
     Classe que representa um prédio na cidade 3D.
     """
-    def __init__(self, game, x, y, height, width=None, depth=None):
+    # Ordem das faces laterais
+    LADOS = ['front', 'back', 'left', 'right']
+    
+    # Cores das janelas desenhadas como geometria (sem o atlas)
+    COR_JANELA_ACESA = (0.9, 0.9, 0.6)
+    COR_JANELA_APAGADA = (0.1, 0.1, 0.2)
+    
+    def __init__(self, game, x, y, height, width=None, depth=None, atlas=None,
+                 rng=None, estado=None, color=None):
+        """
+        Inicializa um prédio.
+        
+        Args:
+            game: Referência ao jogo principal.
+            x, y: Canto do prédio no chão.
+            height: Altura do prédio.
+            width, depth: Dimensões da base (aleatórias se omitidas).
+            atlas: AtlasJanelas onde guardar as janelas; sem atlas, as
+                   janelas viram quads na malha do prédio.
+            rng: Gerador aleatório (random.Random) da cidade; o módulo
+                 random se omitido.
+            estado: Estado salvo (cor, janelas e região no atlas) de um
+                    prédio já gerado; nada é sorteado e a malha só é
+                    montada se for pedida.
+            color: Cor RGB do prédio (aleatória se omitida).
+        """
+        rng = rng or random
+        
         # Referência ao jogo
         self.game = game
+        self.atlas = atlas
         
         # Posição e dimensões
         self.x = x
         self.y = y
         self.height = height
-        self.width = width if width else random.uniform(3.0, 7.0)
-        self.depth = depth if depth else random.uniform(3.0, 7.0)
-        
-        # Cores do prédio (variações de cinza)
-        self.color = (
-            random.uniform(0.3, 0.5),
-            random.uniform(0.3, 0.5),
-            random.uniform(0.3, 0.6)
-        )
+        self.width = width if width else rng.uniform(3.0, 7.0)
+        self.depth = depth if depth else rng.uniform(3.0, 7.0)
         
-        # Nó principal do prédio
+        # Nó principal do prédio (referência local para crateras e efeitos;
+        # a geometria é desenhada pelo lote do CityGenerator)
         self.node = NodePath("building")
         self.node.reparentTo(game.render)
         self.node.setPos(x, y, 0)
         
-        # Cria a geometria do prédio
-        self.create_building()
+        # Malha (vértices, normais, cores, fachada, janela, índices),
+        # montada na primeira consulta
+        self._malha = None
         
-        # Armazena quais janelas estão acesas
-        self.lit_windows = []
+        # Estado das janelas: limiar de acendimento e fase da cintilação,
+        # por face (ordem de LADOS), coluna e andar
+        if estado is not None:
+            self.color = tuple(estado['cor'])
+            self.limiares = estado['limiares']
+            self.fases = estado['fases']
+            self.regiao_atlas = estado['regiao_atlas']
+            return
         
-        # Adiciona janelas ao prédio
-        self.add_windows()
+        # Cores do prédio (variações de cinza)
+        self.color = tuple(color) if color else (
+            rng.uniform(0.3, 0.5),
+            rng.uniform(0.3, 0.5),
+            rng.uniform(0.3, 0.6)
+        )
+        
+        self.sortear_janelas(rng)
+        self.regiao_atlas = None
+        if atlas is not None:
+            self._reservar_atlas()
+        
+    @staticmethod
+    def contar_janelas(width, height):
+        """
+        Número de janelas (por face, por andar) de um prédio.
+        """
+        return max(2, int(width / 0.8)), max(3, int(height / 1.2))
+        
+    @property
+    def grade_janelas(self):
+        """
+        Número de janelas (por face, por andar).
+        """
+        return self.contar_janelas(self.width, self.height)
+        
+    def sortear_janelas(self, rng):
+        """
+        Sorteia o limiar de acendimento (acesa se abaixo da fração de
+        janelas acesas) e a fase da cintilação de cada janela.
+        
+        Args:
+            rng: Gerador aleatório.
+        """
+        windows_h, windows_v = self.grade_janelas
+        forma = (len(self.LADOS), windows_h, windows_v)
+        total = forma[0] * windows_h * windows_v
+        self.limiares = np.array([rng.random() for _ in range(total)], dtype=np.float32).reshape(forma)
+        self.fases = np.array([rng.random() for _ in range(total)], dtype=np.float32).reshape(forma)
+        
+    def _reservar_atlas(self):
+        """
+        Reserva a região do prédio no atlas e escreve o estado das janelas.
+        
+        A região de cada face tem uma coluna e uma linha extras sem janela.
+        """
+        windows_h, windows_v = self.grade_janelas
+        colunas = windows_h + 1
+        linhas = windows_v + 1
+        x0, y0 = self.atlas.alocar(len(self.LADOS) * colunas, linhas)
+        self.regiao_atlas = (x0, y0)
+        
+        texels = np.zeros((linhas, len(self.LADOS) * colunas, 4), dtype=np.uint8)
+        for lado in range(len(self.LADOS)):
+            bloco = texels[:windows_v, lado * colunas:lado * colunas + windows_h]
+            bloco[..., 0] = self.limiares[lado].T * 255.0
+            bloco[..., 1] = self.fases[lado].T * 255.0
+            bloco[..., 2] = 255
+            bloco[..., 3] = 255
+        self.atlas.escrever(x0, y0, texels)
+        
+    @property
+    def malha(self):
+        """
+        Malha do prédio, montada na primeira consulta.
+        """
+        if self._malha is None:
+            self.finalizar_malha()
+        return self._malha
         
     def create_building(self):
         """
-        Cria a geometria do prédio.
-        """
-        # Base do prédio (parte inferior)
-        cm = CardMaker('building-bottom')
-        cm.setFrame(0, self.width, 0, self.depth)
-        bottom = self.node.attachNewNode(cm.generate())
-        bottom.setP(-90)  # Rotação para ficar no chão
-        bottom.setColor(*self.color)
-        
-        # Faces do prédio
-        # Frente
-        cm = CardMaker('building-front')
-        cm.setFrame(0, self.width, 0, self.height)
-        front = self.node.attachNewNode(cm.generate())
-        front.setPos(0, self.depth, 0)
-        front.setH(180)
-        front.setColor(*self.color)
-        
-        # Trás
-        cm = CardMaker('building-back')
-        cm.setFrame(0, self.width, 0, self.height)
-        back = self.node.attachNewNode(cm.generate())
-        back.setPos(self.width, 0, 0)
-        back.setH(0)
-        back.setColor(*self.color)
-        
-        # Esquerda
-        cm = CardMaker('building-left')
-        cm.setFrame(0, self.depth, 0, self.height)
-        left = self.node.attachNewNode(cm.generate())
-        left.setPos(0, 0, 0)
-        left.setH(90)
-        left.setColor(*self.color)
-        
-        # Direita
-        cm = CardMaker('building-right')
-        cm.setFrame(0, self.depth, 0, self.height)
-        right = self.node.attachNewNode(cm.generate())
-        right.setPos(self.width, self.depth, 0)
-        right.setH(-90)
-        right.setColor(*self.color)
-        
-        # Topo
-        cm = CardMaker('building-top')
-        cm.setFrame(0, self.width, 0, self.depth)
-        top = self.node.attachNewNode(cm.generate())
-        top.setPos(0, 0, self.height)
-        top.setP(-90)
-        top.setColor(self.color[0] * 0.8, self.color[1] * 0.8, self.color[2] * 0.8)
-        
-        # Aplica textura (se disponível)
-        # self.apply_texture()
+        Cria a geometria do prédio: as paredes, o topo e a base.
+        
+        A geometria não vira nós próprios: os quads são acumulados na malha
+        do prédio (coordenadas do mundo, cor por vértice) e o CityGenerator
+        junta as malhas de vários prédios em um único Geom por lote. As
+        paredes são os quatro primeiros quads da malha.
+        """
+        w, d, h = self.width, self.depth, self.height
+        cor_topo = (self.color[0] * 0.8, self.color[1] * 0.8, self.color[2] * 0.8)
+        
+        # Paredes: (origem, eixo u, eixo v, normal), com u × v = normal
+        for origem, eixo_u, eixo_v, normal in self._faces_laterais():
+            self._adicionar_quads([origem], eixo_u, eixo_v, normal, [self.color])
+        
+        # Topo e base
+        self._adicionar_quads([(0, 0, h)], (w, 0, 0), (0, d, 0), (0, 0, 1), [cor_topo])
+        self._adicionar_quads([(0, 0, 0)], (0, d, 0), (w, 0, 0), (0, 0, -1), [self.color])
+        
+    def _faces_laterais(self):
+        """
+        Retorna as quatro faces laterais como (origem, eixo u, eixo v,
+        normal), na ordem 'front', 'back', 'left', 'right'.
+        """
+        w, d, h = self.width, self.depth, self.height
+        return [
+            ((w, d, 0), (-w, 0, 0), (0, 0, h), (0, 1, 0)),   # Frente (y = depth)
+            ((0, 0, 0), (w, 0, 0), (0, 0, h), (0, -1, 0)),   # Trás (y = 0)
+            ((0, d, 0), (0, -d, 0), (0, 0, h), (-1, 0, 0)),  # Esquerda (x = 0)
+            ((w, 0, 0), (0, d, 0), (0, 0, h), (1, 0, 0)),    # Direita (x = width)
+        ]
+        
+    def _adicionar_quads(self, origens, eixo_u, eixo_v, normal, cores):
+        """
+        Acumula quads na malha do prédio.
+        
+        Args:
+            origens: Cantos iniciais dos quads (n, 3), relativos ao prédio.
+            eixo_u: Lado u dos quads.
+            eixo_v: Lado v dos quads.
+            normal: Normal (para fora) dos quads.
+            cores: Cores RGB dos quads (n, 3).
+        """
+        origens = np.asarray(origens, dtype=np.float32) + (self.x, self.y, 0.0)
+        eixo_u = np.asarray(eixo_u, dtype=np.float32)
+        eixo_v = np.asarray(eixo_v, dtype=np.float32)
+        n = len(origens)
+        
+        cantos = np.stack((origens, origens + eixo_u, origens + eixo_u + eixo_v, origens + eixo_v), axis=1)
+        cores = np.hstack((np.asarray(cores, dtype=np.float32), np.ones((n, 1), dtype=np.float32)))
+        
+        base = self._num_vertices + 4 * np.arange(n, dtype=np.uint32)[:, None]
+        self._vertices.append(cantos.reshape(-1, 3))
+        self._normais.append(np.tile(np.asarray(normal, dtype=np.float32), (4 * n, 1)))
+        self._cores.append(np.repeat(cores, 4, axis=0))
+        self._fachada.append(np.full((4 * n, 4), -1.0, dtype=np.float32))
+        self._janela.append(np.zeros((4 * n, 2), dtype=np.float32))
+        self._indices.append((base + np.array([0, 1, 2, 0, 2, 3], dtype=np.uint32)).reshape(-1, 3))
+        self._num_vertices += 4 * n
         
     def add_windows(self):
         """
         Adiciona janelas ao prédio.
+        
+        Com atlas, as janelas não têm geometria: o estado vai para a região
+        do prédio no atlas e as paredes recebem as coordenadas da grade de
+        janelas lidas pelo shader da fachada. Sem atlas, cada janela é um
+        quad colorido na malha.
         """
         # Número de janelas horizontal e vertical
-        windows_h = max(2, int(self.width / 0.8))
-        windows_v = max(3, int(self.height / 1.2))
+        windows_h, windows_v = self.grade_janelas
         
-        # Tamanho das janelas
-        window_width = (self.width * 0.8) / windows_h
+        # Tamanho das janelas (vertical)
         window_height = (self.height * 0.8) / windows_v
-        
-        # Espaçamento
-        h_spacing = (self.width - (window_width * windows_h)) / (windows_h + 1)
         v_spacing = (self.height - (window_height * windows_v)) / (windows_v + 1)
         
+        if self.regiao_atlas is not None:
+            self._mapear_janelas(windows_h, windows_v, window_height, v_spacing)
+            return
+        
         # Probabilidade de janela acesa
         lit_prob = 0.4
         
+        # Grade de janelas (i ao longo da face, j na altura)
+        i, j = np.meshgrid(np.arange(windows_h), np.arange(windows_v), indexing='ij')
+        i = i.ravel()
+        j = j.ravel()
+        z_pos = v_spacing + j * (window_height + v_spacing)
+        
         # Adiciona janelas em cada face do prédio
-        sides = ['front', 'back', 'left', 'right']
-        for side in sides:
-            for i in range(windows_h):
-                for j in range(windows_v):
-                    # Determina se a janela está acesa
-                    is_lit = random.random() < lit_prob
-                    window_color = (0.9, 0.9, 0.6) if is_lit else (0.1, 0.1, 0.2)
-                    
-                    # Posição da janela
-                    x_pos = h_spacing + i * (window_width + h_spacing)
-                    z_pos = v_spacing + j * (window_height + v_spacing)
-                    
-                    # Cria a janela
-                    cm = CardMaker(f'window-{side}-{i}-{j}')
-                    
-                    if side in ['front', 'back']:
-                        cm.setFrame(x_pos, x_pos + window_width, z_pos, z_pos + window_height)
-                        window = self.node.attachNewNode(cm.generate())
-                        
-                        if side == 'front':
-                            window.setPos(0, self.depth + 0.01, 0)
-                            window.setH(180)
-                        else:  # back
-                            window.setPos(self.width, -0.01, 0)
-                            window.setH(0)
-                    else:  # left or right
-                        w_depth = (self.depth * 0.8) / windows_h
-                        d_spacing = (self.depth - (w_depth * windows_h)) / (windows_h + 1)
-                        x_pos = d_spacing + i * (w_depth + d_spacing)
-                        
-                        cm.setFrame(x_pos, x_pos + w_depth, z_pos, z_pos + window_height)
-                        window = self.node.attachNewNode(cm.generate())
-                        
-                        if side == 'left':
-                            window.setPos(0, 0, 0)
-                            window.setH(90)
-                        else:  # right
-                            window.setPos(self.width, self.depth, 0)
-                            window.setH(-90)
-                    
-                    window.setColor(*window_color)
-                    
-                    # Guarda referência se estiver acesa
-                    if is_lit:
-                        self.lit_windows.append((side, i, j, window))
-                        
+        for lado, (origem, eixo_u, eixo_v, normal) in enumerate(self._faces_laterais()):
+            comprimento = self.width if lado < 2 else self.depth
+            window_width = (comprimento * 0.8) / windows_h
+            h_spacing = (comprimento - (window_width * windows_h)) / (windows_h + 1)
+            x_pos = h_spacing + i * (window_width + h_spacing)
+            
+            # Direções unitárias da face
+            u = np.asarray(eixo_u, dtype=np.float32) / comprimento
+            v = np.asarray(eixo_v, dtype=np.float32) / self.height
+            n = np.asarray(normal, dtype=np.float32)
+            
+            # Janelas ligeiramente à frente da parede para evitar z-fighting
+            origens = (np.asarray(origem, dtype=np.float32) + n * 0.01 +
+                       x_pos[:, None] * u + z_pos[:, None] * v)
+            
+            acesas = self.limiares[lado].ravel() < lit_prob
+            cores = np.where(acesas[:, None], self.COR_JANELA_ACESA, self.COR_JANELA_APAGADA)
+            self._adicionar_quads(origens, u * window_width, v * window_height, normal, cores)
+            
+    def _mapear_janelas(self, windows_h, windows_v, window_height, v_spacing):
+        """
+        Dá às paredes as coordenadas da grade de janelas e o canto da
+        região de cada face no atlas.
+        
+        Nas coordenadas da grade, cada célula é uma janela mais o espaço
+        que a segue: a célula k começa na janela k e a janela ocupa a
+        fração window/(window + espaçamento) da célula.
+        """
+        colunas = windows_h + 1
+        x0, y0 = self.regiao_atlas
+        
+        passo_v = window_height + v_spacing
+        v_min = -v_spacing / passo_v
+        for lado in range(len(self.LADOS)):
+            comprimento = self.width if lado < 2 else self.depth
+            window_width = (comprimento * 0.8) / windows_h
+            h_spacing = (comprimento - (window_width * windows_h)) / (windows_h + 1)
+            passo_u = window_width + h_spacing
+            u_min = -h_spacing / passo_u
+            u_max = (comprimento - h_spacing) / passo_u
+            v_max = (self.height - v_spacing) / passo_v
+            
+            # Cantos da parede na ordem de _adicionar_quads, com o canto da
+            # região da face no atlas
+            canto = (x0 + lado * colunas, y0)
+            self._fachada[lado] = np.array([
+                (u_min, v_min) + canto, (u_max, v_min) + canto,
+                (u_max, v_max) + canto, (u_min, v_max) + canto
+            ], dtype=np.float32)
+            self._janela[lado] = np.tile(
+                np.array([window_width / passo_u, window_height / passo_v], dtype=np.float32), (4, 1)
+            )
+            
+    def definir_janela(self, lado, i, j, acesa):
+        """
+        Força uma janela a ficar acesa ou apagada (com atlas).
+        
+        Args:
+            lado: Face ('front', 'back', 'left' ou 'right').
+            i: Coluna da janela na face.
+            j: Andar da janela.
+            acesa: Se True, a janela fica acesa enquanto houver janelas
+                   acesas na cidade; se False, nunca acende.
+        """
+        k = self.LADOS.index(lado)
+        self.limiares[k, i, j] = 0.0 if acesa else 1.0
+        if self.atlas is not None and self.regiao_atlas is not None:
+            x0, y0 = self.regiao_atlas
+            colunas = self.limiares.shape[1] + 1
+            texel = self.atlas.pixels[y0 + j, x0 + k * colunas + i]
+            self.atlas.escrever(x0 + k * colunas + i, y0 + j,
+                                np.array([[[0 if acesa else 255, texel[1], 255, 255]]], dtype=np.uint8))
+            
+    def finalizar_malha(self):
+        """
+        Monta a geometria e as janelas e junta os quads na malha final do
+        prédio.
+        
+        Returns:
+            (vértices, normais, cores, fachada, janela, índices) como arrays
+            NumPy, em coordenadas do mundo.
+        """
+        # Malha em construção: listas de arrays de quads
+        self._vertices = []
+        self._normais = []
+        self._cores = []
+        self._fachada = []
+        self._janela = []
+        self._indices = []
+        self._num_vertices = 0
+        
+        # Cria a geometria do prédio e adiciona as janelas
+        self.create_building()
+        self.add_windows()
+        
+        self._malha = (
+            np.concatenate(self._vertices),
+            np.concatenate(self._normais),
+            np.concatenate(self._cores),
+            np.concatenate(self._fachada),
+            np.concatenate(self._janela),
+            np.concatenate(self._indices)
+        )
+        self._vertices = self._normais = self._cores = None
+        self._fachada = self._janela = self._indices = None
+        return self._malha
+        
+    def get_bounds(self):
+        """
+        Retorna a caixa do prédio no mundo como (mínimo, máximo).
+        """
+        return (
+            (self.x, self.y, 0.0),
+            (self.x + self.width, self.y + self.depth, self.height)
+        )
+        
     def get_top_position(self):
         """
         Retorna uma posição aleatória no topo do prédio.
@@ -186,23 +588,99 @@ class Building:
 class CityGenerator:
     """
     Gerador de cidade para o jogo Gorillas 3D War.
+    
+    Os prédios são desenhados em lotes: as malhas dos prédios de um bloco
+    de LADO_LOTE x LADO_LOTE posições da grade são juntadas em um único
+    Geom, e o lote é remontado quando um dos seus prédios é removido.
+    
+    Quando a placa de vídeo suporta GLSL, as janelas vêm de um atlas único
+    lido pelo shader da fachada; acender, apagar ou fazer cintilar as
+    janelas da cidade inteira é mudar um uniform ou reenviar o atlas.
+    
+    Cada lote é um LODNode com três níveis: a fachada completa de perto,
+    uma caixa colorida por prédio a média distância e, de longe, a
+    silhueta do lote (uma caixa por fileira de prédios). As distâncias de
+    troca seguem o nível de qualidade do GerenciadorLOD (conectar_lod).
     """
-    def __init__(self, game):
+    # Prédios por lado de um lote
+    LADO_LOTE = 3
+    
+    # Cidades guardadas no cache em disco (as mais antigas são apagadas)
+    MAXIMO_CIDADES_CACHE = 16
+    
+    # Distâncias de troca dos níveis de detalhe antes de conectar_lod
+    DISTANCIA_FACHADA = 100.0
+    DISTANCIA_SILHUETA = 400.0
+    
+    # Fim da troca para silhueta: distancia_lod * FATOR_SILHUETA * detalhe_modelos
+    FATOR_SILHUETA = 4.0
+    
+    # Distância até a qual a silhueta é desenhada
+    DISTANCIA_MAXIMA_LOD = 100000.0
+    
+    # Distância entre os cantos de prédios vizinhos e largura das ruas
+    ESPACAMENTO_PREDIOS = 12
+    LARGURA_RUA = 6
+    
+    # Folga dos limites do mundo além da borda da cidade e faixa de altura
+    MARGEM_LIMITES = 150.0
+    ALTURA_LIMITES = (-10.0, 200.0)
+    
+    def __init__(self, game, diretorio_cache="cache"):
         """
         Inicializa o gerador de cidade.
         
         Args:
             game: Referência ao jogo principal.
+            diretorio_cache: Diretório onde as cidades geradas são guardadas,
+                             relativo à pasta do jogo (a de main.py).
+                             None desativa o cache em disco.
         """
         self.game = game
         self.buildings = []
+
+        # Caminho absoluto: o mesmo arquivo serve para os testes com os.path e
+        # para o loader, que resolveria um caminho relativo pelo model-path
+        if diretorio_cache:
+            raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+            diretorio_cache = os.path.join(raiz, diretorio_cache)
+        self.diretorio_cache = diretorio_cache
+        
+        # Semente da cidade atual
+        self.semente = None
+        
+        # Lotes de desenho: chave -> {'predios': [...], 'node': NodePath}
+        self.lotes = {}
+        self._lote_do_predio = {}
+        
+        # Índice espacial dos prédios (células do tamanho de um quarteirão)
+        self.grade = GradeEspacial(tamanho_celula=18.0)
+        
+        # Distâncias de troca (fachada -> caixas, caixas -> silhueta) e o
+        # gerenciador de LOD que as define
+        self.distancias_lod = (self.DISTANCIA_FACHADA, self.DISTANCIA_SILHUETA)
+        self.lod_manager = None
+        
         self.city_node = NodePath("city")
         self.city_node.reparentTo(game.render)
         
+        # Atlas das janelas e shader da fachada (sem suporte a GLSL, as
+        # janelas são desenhadas como geometria)
+        self.atlas = None
+        self.shader_fachada = None
+        gsg = game.win.getGsg() if getattr(game, 'win', None) else None
+        if gsg is not None and gsg.getSupportsGlsl():
+            self.atlas = AtlasJanelas()
+            self.shader_fachada = criar_shader_fachada()
+            self.city_node.setShaderInput('atlas_janelas', self.atlas.textura)
+            self.definir_luzes_janelas(0.4)
+            self.definir_cintilacao(0.0)
+        
         # Tamanho da cidade
         self.city_size = 100
         
         # Cria o chão da cidade
+        self.chao = None
         self.create_ground()
         
     def create_ground(self):
@@ -211,6 +689,8 @@ class CityGenerator:
         """
         # Tamanho do chão (bem maior que a cidade para dar sensação de amplitude)
         ground_size = self.city_size * 3
+        if self.chao is not None:
+            self.chao.removeNode()
         
         # Cria o chão
         cm = CardMaker('ground')
@@ -221,14 +701,21 @@ class CityGenerator:
         
         # Cor de asfalto
         ground.setColor(0.2, 0.2, 0.2)
+        self.chao = ground
         
-    def gerar_cidade(self, rows, cols):
+    def gerar_cidade(self, rows, cols, semente=None):
         """
         Gera uma cidade com edifícios em grade.
         
+        A cidade é definida pela semente: a mesma semente sempre gera a
+        mesma cidade. Cidades já geradas são lidas do cache em disco (os
+        lotes em .bam e o estado dos prédios em .npz) em vez de serem
+        montadas de novo.
+        
         Args:
             rows: Número de linhas de prédios.
             cols: Número de colunas de prédios.
+            semente: Semente da cidade; sorteada se omitida.
             
         Returns:
             NodePath do nó raiz da cidade.
@@ -236,9 +723,18 @@ class CityGenerator:
         # Limpa quaisquer prédios existentes
         self.limpar_cidade()
         
+        if semente is None:
+            semente = random.randrange(2 ** 31)
+        self.semente = semente
+        
+        if self._ler_cache(rows, cols, semente):
+            return self.city_node
+        
+        rng = random.Random(semente)
+        
         # Espaçamento entre prédios
-        building_spacing = 12
-        street_width = 6
+        building_spacing = self.ESPACAMENTO_PREDIOS
+        street_width = self.LARGURA_RUA
         
         # Calcula o tamanho total da cidade
         total_width = cols * building_spacing + (cols - 1) * street_width
@@ -256,15 +752,153 @@ class CityGenerator:
                 y = start_y + row * (building_spacing + street_width)
                 
                 # Altura aleatória para o prédio
-                height = random.uniform(10, 30)
+                height = rng.uniform(10, 30)
                 
-                # Cria o prédio
-                building = Building(self.game, x, y, height)
-                self.buildings.append(building)
+                # Cria o prédio e o agrupa no lote do seu bloco
+                building = Building(self.game, x, y, height, atlas=self.atlas, rng=rng)
+                self._registrar_predio(building, (row // self.LADO_LOTE, col // self.LADO_LOTE))
+                
+        # Monta a geometria de todos os lotes
+        for chave in self.lotes:
+            self._montar_lote(chave)
+        if self.atlas is not None:
+            self.atlas.atualizar_textura()
+        
+        self._gravar_cache(rows, cols, semente)
                 
         # Retorna o nó da cidade
         return self.city_node
         
+    def _registrar_predio(self, building, chave):
+        """
+        Adiciona um prédio à lista, ao índice espacial e ao lote indicado.
+        """
+        self.buildings.append(building)
+        self.grade.inserir(building, *building.get_bounds())
+        self.lotes.setdefault(chave, {'predios': [], 'node': None})['predios'].append(building)
+        self._lote_do_predio[building] = chave
+        
+    def _caminho_cache(self, rows, cols, semente):
+        """
+        Retorna o caminho (sem extensão) do cache de uma cidade.
+        """
+        modo = 'atlas' if self.atlas is not None else 'geometria'
+        nome = f"cidade_{rows}x{cols}_s{semente}_{modo}_v{VERSAO_CIDADE}"
+        return os.path.join(self.diretorio_cache, nome)
+        
+    def _gravar_cache(self, rows, cols, semente):
+        """
+        Grava a cidade atual no cache: os lotes prontos em um .bam e as
+        caixas, cores e janelas dos prédios em um .npz.
+        """
+        if not self.diretorio_cache:
+            return
+        
+        caminho = self._caminho_cache(rows, cols, semente)
+        predios = self.buildings
+        dados = {
+            'predios': np.array([(b.x, b.y, b.width, b.depth, b.height) + tuple(b.color)
+                                 for b in predios], dtype=np.float64),
+            'lotes': np.array([self._lote_do_predio[b] for b in predios], dtype=np.int32),
+            'regioes': np.array([b.regiao_atlas or (-1, -1) for b in predios], dtype=np.int32),
+            'limiares': np.concatenate([b.limiares.ravel() for b in predios]),
+            'fases': np.concatenate([b.fases.ravel() for b in predios]),
+        }
+        if self.atlas is not None:
+            dados['atlas'] = self.atlas.pixels
+            dados['cursor_atlas'] = np.array(self.atlas.cursor(), dtype=np.int32)
+        
+        # Os shaders são aplicados de novo na leitura
+        raiz = NodePath('cidade')
+        for chave in sorted(self.lotes):
+            if self.lotes[chave]['node'] is not None:
+                self.lotes[chave]['node'].copyTo(raiz)
+        for node_np in raiz.findAllMatches('**'):
+            node_np.node().clearAttrib(ShaderAttrib)
+        
+        try:
+            os.makedirs(self.diretorio_cache, exist_ok=True)
+            np.savez_compressed(caminho + '.npz', **dados)
+            if not raiz.writeBamFile(Filename.fromOsSpecific(caminho + '.bam')):
+                print(f"Aviso: Não foi possível gravar o cache da cidade em {caminho}.bam")
+            self._podar_cache()
+        except OSError as e:
+            print(f"Aviso: Não foi possível gravar o cache da cidade: {e}")
+        raiz.removeNode()
+        
+    def _podar_cache(self):
+        """
+        Apaga as cidades mais antigas do cache além de MAXIMO_CIDADES_CACHE.
+        """
+        nomes = [nome[:-4] for nome in os.listdir(self.diretorio_cache)
+                 if nome.startswith('cidade_') and nome.endswith('.bam')]
+        caminhos = sorted((os.path.join(self.diretorio_cache, nome) for nome in nomes),
+                          key=lambda caminho: os.path.getmtime(caminho + '.bam'))
+        for caminho in caminhos[:-self.MAXIMO_CIDADES_CACHE]:
+            for extensao in ('.bam', '.npz'):
+                if os.path.exists(caminho + extensao):
+                    os.remove(caminho + extensao)
+        
+    def _ler_cache(self, rows, cols, semente):
+        """
+        Lê uma cidade do cache em disco, se existir.
+        
+        Returns:
+            True se a cidade foi carregada.
+        """
+        if not self.diretorio_cache:
+            return False
+        
+        caminho = self._caminho_cache(rows, cols, semente)
+        if not (os.path.exists(caminho + '.npz') and os.path.exists(caminho + '.bam')):
+            return False
+        
+        try:
+            dados = np.load(caminho + '.npz')
+            modelo = self.game.loader.loadModel(Filename.fromOsSpecific(caminho + '.bam'), noCache=True)
+        except (OSError, ValueError) as e:
+            print(f"Aviso: Cache da cidade inválido em {caminho}: {e}")
+            return False
+        
+        # Prédios sem malha: o estado salvo basta para colisões, danos e
+        # para remontar um lote quando um prédio é removido
+        limiares = dados['limiares']
+        fases = dados['fases']
+        inicio = 0
+        for linha, chave, regiao in zip(dados['predios'], dados['lotes'], dados['regioes']):
+            x, y, width, depth, height = (float(v) for v in linha[:5])
+            windows_h, windows_v = Building.contar_janelas(width, height)
+            forma = (len(Building.LADOS), windows_h, windows_v)
+            fim = inicio + forma[0] * windows_h * windows_v
+            estado = {
+                'cor': tuple(float(v) for v in linha[5:8]),
+                'limiares': limiares[inicio:fim].reshape(forma).copy(),
+                'fases': fases[inicio:fim].reshape(forma).copy(),
+                'regiao_atlas': tuple(int(v) for v in regiao) if regiao[0] >= 0 else None,
+            }
+            inicio = fim
+            building = Building(self.game, x, y, height, width, depth, atlas=self.atlas, estado=estado)
+            self._registrar_predio(building, (int(chave[0]), int(chave[1])))
+        
+        # Lotes prontos, identificados pelo nome
+        for lote_np in modelo.findAllMatches('**/+LODNode'):
+            _, _, linha_lote, coluna_lote = lote_np.getName().split('_')
+            lote_np.reparentTo(self.city_node)
+            self._preparar_lote(lote_np)
+            self.lotes[(int(linha_lote), int(coluna_lote))]['node'] = lote_np
+        modelo.removeNode()
+        
+        if self.atlas is not None:
+            self.atlas.restaurar(dados['atlas'], dados['cursor_atlas'])
+            self.atlas.atualizar_textura()
+        
+        # Marca a cidade como recente para a poda do cache
+        try:
+            os.utime(caminho + '.bam')
+        except OSError:
+            pass
+        return True
+        
     def limpar_cidade(self):
         """
         Remove todos os prédios da cidade.
@@ -272,6 +906,238 @@ class CityGenerator:
         for building in self.buildings:
             building.node.removeNode()
         self.buildings = []
+        self.grade.limpar()
+        
+        for lote in self.lotes.values():
+            if lote['node'] is not None:
+                lote['node'].removeNode()
+        self.lotes = {}
+        self._lote_do_predio = {}
+        if self.atlas is not None:
+            self.atlas.limpar()
+        
+    def destruir(self):
+        """
+        Remove a cidade, o chão e o nó raiz; o gerador não é mais usado.
+        """
+        if self.lod_manager is not None:
+            self.lod_manager.remover_callback_mudanca_qualidade(self._ajustar_qualidade)
+            self.lod_manager = None
+        self.limpar_cidade()
+        self.city_node.removeNode()
+        
+    def conectar_lod(self, lod_manager):
+        """
+        Passa a usar as distâncias de LOD do nível de qualidade atual e a
+        acompanhar as mudanças de qualidade.
+        
+        Args:
+            lod_manager: GerenciadorLOD do jogo.
+        """
+        self.lod_manager = lod_manager
+        self._ajustar_qualidade(None, lod_manager.obter_qualidade_atual(),
+                                lod_manager.obter_configuracoes_atuais())
+        lod_manager.registrar_callback_mudanca_qualidade(self._ajustar_qualidade)
+        
+    def _ajustar_qualidade(self, qualidade_antiga, qualidade_nova, config):
+        """
+        Callback chamado quando a qualidade dos efeitos muda.
+        """
+        fachada = config['distancia_lod']
+        silhueta = fachada * self.FATOR_SILHUETA * config['detalhe_modelos']
+        self.definir_distancias_lod(fachada, max(silhueta, fachada))
+        
+    def definir_distancias_lod(self, fachada, silhueta):
+        """
+        Define as distâncias de troca dos níveis de detalhe de todos os lotes.
+        
+        Args:
+            fachada: Distância até a qual a fachada completa é desenhada.
+            silhueta: Distância a partir da qual só a silhueta é desenhada.
+        """
+        self.distancias_lod = (fachada, silhueta)
+        for lote in self.lotes.values():
+            if lote['node'] is not None:
+                self._aplicar_distancias_lod(lote['node'])
+                
+    def _aplicar_distancias_lod(self, lote_np):
+        """
+        Atualiza as distâncias de troca do LODNode de um lote.
+        """
+        fachada, silhueta = self.distancias_lod
+        lod = lote_np.node()
+        lod.setSwitch(0, fachada, 0.0)
+        lod.setSwitch(1, silhueta, fachada)
+        lod.setSwitch(2, self.DISTANCIA_MAXIMA_LOD, silhueta)
+        
+    def definir_luzes_janelas(self, fracao):
+        """
+        Define a fração de janelas acesas na cidade inteira (só com o
+        shader da fachada).
+        
+        Args:
+            fracao: 0.0 apaga todas as janelas, 1.0 acende todas.
+        """
+        self.city_node.setShaderInput('fracao_acesas', float(fracao))
+        
+    def definir_cintilacao(self, intensidade):
+        """
+        Define a intensidade da cintilação das janelas acesas (só com o
+        shader da fachada).
+        
+        Args:
+            intensidade: 0.0 (luz estável) a 1.0.
+        """
+        self.city_node.setShaderInput('cintilacao', float(intensidade))
+        
+    def definir_janela(self, predio, lado, i, j, acesa):
+        """
+        Força uma janela de um prédio a ficar acesa ou apagada.
+        
+        Args:
+            predio: Prédio da janela.
+            lado: Face ('front', 'back', 'left' ou 'right').
+            i: Coluna da janela na face.
+            j: Andar da janela.
+            acesa: Estado da janela.
+        """
+        predio.definir_janela(lado, i, j, acesa)
+        if predio.atlas is not None:
+            predio.atlas.atualizar_textura()
+        
+    def _montar_lote(self, chave):
+        """
+        (Re)cria o Geom único de um lote com as malhas dos seus prédios.
+        
+        Args:
+            chave: Chave do lote.
+        """
+        lote = self.lotes[chave]
+        if lote['node'] is not None:
+            lote['node'].removeNode()
+            lote['node'] = None
+        if not lote['predios']:
+            return
+        
+        # Junta as malhas, deslocando os índices de cada prédio
+        colunas = [[] for _ in range(5)]
+        indices = []
+        deslocamento = 0
+        for predio in lote['predios']:
+            for coluna, dados in zip(colunas, predio.malha[:5]):
+                coluna.append(dados)
+            indices.append(predio.malha[5] + deslocamento)
+            deslocamento += len(predio.malha[0])
+        
+        nome = f'lote_predios_{chave[0]}_{chave[1]}'
+        fachada = criar_geom_malha(
+            f'{nome}_fachada',
+            *(np.concatenate(coluna) for coluna in colunas), np.concatenate(indices)
+        )
+        
+        # Caixas: um prédio por caixa
+        limites = [predio.get_bounds() for predio in lote['predios']]
+        caixas = criar_geom_caixas(
+            f'{nome}_caixas', [minimo for minimo, _ in limites], [maximo for _, maximo in limites],
+            [predio.color for predio in lote['predios']]
+        )
+        
+        # Silhueta: uma caixa por fileira, com a altura média da fileira
+        fileiras = {}
+        for predio, (minimo, maximo) in zip(lote['predios'], limites):
+            fileiras.setdefault(round(predio.y, 3), []).append((predio, minimo, maximo))
+        minimos, maximos, cores = [], [], []
+        for fileira in fileiras.values():
+            minimos.append((min(m[0] for _, m, _ in fileira), min(m[1] for _, m, _ in fileira), 0.0))
+            maximos.append((max(m[0] for _, _, m in fileira), max(m[1] for _, _, m in fileira),
+                            sum(m[2] for _, _, m in fileira) / len(fileira)))
+            cores.append(tuple(np.mean([p.color for p, _, _ in fileira], axis=0)))
+        silhueta = criar_geom_caixas(f'{nome}_silhueta', minimos, maximos, cores)
+        
+        # Níveis do lote, do mais próximo ao mais distante
+        lod = LODNode(nome)
+        lote['node'] = self.city_node.attachNewNode(lod)
+        for nivel in (fachada, caixas, silhueta):
+            lod.addSwitch(1.0, 0.0)
+            lote['node'].attachNewNode(nivel)
+        minimo = np.min([m for m, _ in limites], axis=0)
+        maximo = np.max([m for _, m in limites], axis=0)
+        lod.setCenter(LPoint3(*((minimo + maximo) / 2.0)))
+        self._preparar_lote(lote['node'])
+        
+    def _preparar_lote(self, lote_np):
+        """
+        Aplica os shaders e as distâncias de troca ao nó de um lote (estado
+        que não vai para o cache em disco).
+        """
+        if self.shader_fachada is not None:
+            lote_np.setShader(self.shader_fachada)
+            # Sem janelas, a iluminação por vértice basta
+            for nivel_np in list(lote_np.getChildren())[1:]:
+                nivel_np.setShaderOff(1)
+        self._aplicar_distancias_lod(lote_np)
+        
+    def remover_predio(self, predio):
+        """
+        Remove um prédio da lista, do índice espacial e do seu lote de
+        desenho (o nó do prédio fica a cargo de quem chama).
+        
+        Args:
+            predio: Prédio a remover.
+        """
+        if predio in self.buildings:
+            self.buildings.remove(predio)
+        self.grade.remover(predio)
+        
+        # Remonta o lote sem o prédio
+        chave = self._lote_do_predio.pop(predio, None)
+        if chave is not None:
+            self.lotes[chave]['predios'].remove(predio)
+            self._montar_lote(chave)
+        
+    def predios_no_ponto(self, ponto):
+        """
+        Retorna os prédios que contêm um ponto.
+        """
+        return self.grade.consultar_ponto(ponto)
+        
+    def predios_na_esfera(self, centro, raio):
+        """
+        Retorna os prédios que tocam uma esfera.
+        """
+        return self.grade.consultar_esfera(centro, raio)
+        
+    def predios_no_raio(self, origem, direcao, distancia_maxima=1000.0):
+        """
+        Retorna (distância, prédio) dos prédios atingidos por um raio,
+        do mais próximo ao mais distante.
+        """
+        return self.grade.consultar_raio(origem, direcao, distancia_maxima)
+        
+    def predios_no_segmento(self, inicio, fim, raio=0.0):
+        """
+        Retorna (fração, prédio) dos prédios que um segmento (ou uma esfera
+        de raio 'raio' varrida por ele) toca, em ordem ao longo do segmento.
+        """
+        return self.grade.consultar_segmento(inicio, fim, raio)
+        
+    def limites(self):
+        """
+        Retorna os limites do mundo da cidade atual: a área da cidade com
+        uma folga de MARGEM_LIMITES e a faixa de altura ALTURA_LIMITES.
+        
+        Returns:
+            ((x_min, y_min, z_min), (x_max, y_max, z_max)).
+        """
+        meio = self.city_size / 2 + self.MARGEM_LIMITES
+        z_min, z_max = self.ALTURA_LIMITES
+        return (-meio, -meio, z_min), (meio, meio, z_max)
+        
+    def predios_area_jogo(self):
+        """
+        Retorna os prédios onde os gorilas podem ser posicionados.
+        """
+        return self.buildings
         
     @property
     def predios(self):
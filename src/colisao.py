@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Gorillas 3D War - Testes de colisão contínuos
+Funções de varredura de uma esfera ao longo de um segmento. Todas retornam a
+fração (0.0 a 1.0) do segmento em que a esfera toca o alvo pela primeira vez,
+ou None se não houver toque. Uma esfera que já começa tocando o alvo é
+ignorada (está saindo dele), o que evita impactos no ponto de lançamento.
+"""
+import math
+
+
+def varrer_esfera_plano_z(inicio, fim, raio, z=0.0):
+    """
+    Varre uma esfera contra o plano horizontal de altura z (vindo de cima).
+
+    Args:
+        inicio: Posição inicial do centro da esfera.
+        fim: Posição final do centro da esfera.
+        raio: Raio da esfera.
+        z: Altura do plano.
+
+    Returns:
+        Fração do segmento no toque ou None.
+    """
+    altura_inicio = inicio[2] - raio - z
+    altura_fim = fim[2] - raio - z
+    if altura_inicio < 0.0 or altura_fim > 0.0:
+        return None
+    if altura_inicio == altura_fim:
+        return 0.0
+    return altura_inicio / (altura_inicio - altura_fim)
+
+
+def varrer_esfera_esfera(inicio, fim, raio, centro, raio_alvo):
+    """
+    Varre uma esfera contra uma esfera parada.
+
+    Args:
+        inicio: Posição inicial do centro da esfera.
+        fim: Posição final do centro da esfera.
+        raio: Raio da esfera em movimento.
+        centro: Centro da esfera alvo.
+        raio_alvo: Raio da esfera alvo.
+
+    Returns:
+        Fração do segmento no toque ou None.
+    """
+    # Raio combinado: equivale a varrer um ponto contra a esfera somada
+    r = raio + raio_alvo
+    dx, dy, dz = fim[0] - inicio[0], fim[1] - inicio[1], fim[2] - inicio[2]
+    mx, my, mz = inicio[0] - centro[0], inicio[1] - centro[1], inicio[2] - centro[2]
+
+    c = mx * mx + my * my + mz * mz - r * r
+    if c <= 0.0:
+        return None  # Começa dentro
+
+    b = mx * dx + my * dy + mz * dz
+    if b >= 0.0:
+        return None  # Afastando-se
+
+    a = dx * dx + dy * dy + dz * dz
+    discriminante = b * b - a * c
+    if discriminante < 0.0:
+        return None
+
+    t = (-b - math.sqrt(discriminante)) / a
+    return t if t <= 1.0 else None
+
+
+def intervalo_segmento_caixa(inicio, fim, raio, minimo, maximo):
+    """
+    Intervalo do segmento dentro de uma caixa alinhada aos eixos expandida
+    pelo raio (método das placas).
+
+    Args:
+        inicio: Início do segmento.
+        fim: Fim do segmento.
+        raio: Expansão da caixa em cada eixo.
+        minimo: Canto mínimo (x, y, z) da caixa.
+        maximo: Canto máximo (x, y, z) da caixa.
+
+    Returns:
+        (entrada, saida) em frações da reta do segmento, sem limitar a
+        [0, 1], ou None se a reta não passa pela caixa.
+    """
+    entrada = -math.inf
+    saida = math.inf
+
+    for eixo in range(3):
+        origem = inicio[eixo]
+        direcao = fim[eixo] - origem
+        baixo = minimo[eixo] - raio
+        alto = maximo[eixo] + raio
+
+        if direcao == 0.0:
+            if origem < baixo or origem > alto:
+                return None
+            continue
+
+        t1 = (baixo - origem) / direcao
+        t2 = (alto - origem) / direcao
+        if t1 > t2:
+            t1, t2 = t2, t1
+        entrada = max(entrada, t1)
+        saida = min(saida, t2)
+        if entrada > saida:
+            return None
+
+    return entrada, saida
+
+
+def varrer_esfera_caixa(inicio, fim, raio, minimo, maximo):
+    """
+    Varre uma esfera contra uma caixa alinhada aos eixos.
+
+    A caixa é expandida pelo raio da esfera em cada eixo; nos cantos o
+    teste é levemente conservador.
+
+    Args:
+        inicio: Posição inicial do centro da esfera.
+        fim: Posição final do centro da esfera.
+        raio: Raio da esfera.
+        minimo: Canto mínimo (x, y, z) da caixa.
+        maximo: Canto máximo (x, y, z) da caixa.
+
+    Returns:
+        Fração do segmento no toque ou None.
+    """
+    intervalo = intervalo_segmento_caixa(inicio, fim, raio, minimo, maximo)
+    if intervalo is None:
+        return None
+
+    # Começa dentro (entrada negativa) ou só toca depois do fim do segmento
+    entrada = intervalo[0]
+    if entrada < 0.0 or entrada > 1.0:
+        return None
+    return entrada
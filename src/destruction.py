@@ -7,6 +7,7 @@ from panda3d.core import NodePath, CollisionSphere, CollisionNode
 from panda3d.core import LPoint3, Vec3, BitMask32
 import random
 import math
+from src.modelos import obter_biblioteca
 
 class DestructionSystem:
     """
@@ -149,8 +150,7 @@ class DestructionSystem:
         
         # Cria uma "cratera" no prédio
         # Para simplificar, vamos usar uma esfera preta para simular o buraco
-        crater = self.game.loader.loadModel("models/misc/sphere")
-        crater.reparentTo(predio.node)
+        crater = obter_biblioteca(self.game).instanciar("models/misc/sphere", predio.node, "cratera")
         
         # Configura a posição com base na face
         if face == 'frente':
@@ -209,9 +209,8 @@ class DestructionSystem:
         if hasattr(self.game, 'som'):
             self.game.som.tocar_som('impacto_predio', posicao, volume=1.0)
             
-        # Remove o prédio da lista de prédios do jogo
-        if predio in self.game.gerador_cidade.predios:
-            self.game.gerador_cidade.predios.remove(predio)
+        # Remove o prédio da lista e do índice espacial da cidade
+        self.game.gerador_cidade.remover_predio(predio)
             
         # Remove o nó do prédio
         predio.node.removeNode()
@@ -254,8 +253,7 @@ class DestructionSystem:
         self.fragment_id_counter += 1
         
         # Cria o modelo do fragmento (usando uma forma simples)
-        fragment = self.game.loader.loadModel("models/misc/sphere")
-        fragment.reparentTo(self.fragments_node)
+        fragment = obter_biblioteca(self.game).instanciar("models/misc/sphere", self.fragments_node, "fragmento")
         fragment.setPos(posicao)
         
         # Escala aleatória
@@ -3,20 +3,25 @@
 """
 Gorillas 3D War - Módulo para efeitos visuais
 """
-from panda3d.core import NodePath, PointLight, AmbientLight, Spotlight
-from panda3d.core import LPoint3, LVector3, ColorBlendAttrib, TransparencyAttrib, VBase4
-from panda3d.core import TextureStage, Texture, LineSegs
+from panda3d.core import AmbientLight, Spotlight
+from panda3d.core import LPoint3, ColorBlendAttrib, TransparencyAttrib, VBase4
+from panda3d.core import TextureStage, LineSegs
 from direct.particles.ParticleEffect import ParticleEffect
-import random
 import math
 import time
+import numpy as np
 
-from panda3d.core import NodePath, LPoint3, LVector3, TransparencyAttrib
-from panda3d.core import TextureStage, Texture, PNMImage, TextNode
-from panda3d.core import AmbientLight, PointLight, DirectionalLight
+from panda3d.core import LPoint3, TransparencyAttrib
+from panda3d.core import TextureStage, TextNode
+from panda3d.core import AmbientLight, DirectionalLight
 
 # Importa os módulos de melhoria
-from src.pool import ParticlePool, ObjectPool
+from src.pool import ParticlePool
+from src.particulas import MotorParticulas, RenderizadorParticulas
+from src.texturas import GeradorTexturas
+from src.luzes import GerenciadorLuzes
+from src.linhas import LinhaDinamica
+from src.agendador import AgendadorEfeitos
 from src.shaders import ShaderManager
 from src.lod import GerenciadorLOD, QualidadeEfeitos
 
@@ -60,18 +65,29 @@ class EffectsSystem:
         # Registra callback para ajustar os efeitos quando a qualidade mudar
         self.lod_manager.registrar_callback_mudanca_qualidade(self._ajustar_qualidade_efeitos)
         
+        # Agendador que distribui a atualização dos efeitos pelos frames
+        self.agendador = AgendadorEfeitos(self.game, self.lod_manager)
+        
         # Inicializa pools de objetos para reutilização
         self._inicializar_pools()
         
+        # Distribui o conjunto fixo de luzes dinâmicas entre as explosões
+        self.gerenciador_luzes = GerenciadorLuzes(self.game, self.lod_manager)
+        
+        # Inicializa os motores de partículas vetorizados
+        self._inicializar_motores_particulas()
+        
         # Obtém referência ao sistema de física (se disponível)
         self.sistema_fisica = getattr(self.game, 'sistema_fisica', None)
         
         # Listas para armazenar diferentes tipos de efeitos ativos
         self.explosoes = []
-        self.rastros = []
         self.particulas_ativas = []
         self.fragmentos = []
         
+        # Identificador sequencial das explosões (grupo das partículas nos motores)
+        self._proximo_id_explosao = 0
+        
         # Carrega texturas para efeitos
         self.texturas = self._carregar_texturas()
         
@@ -81,7 +97,15 @@ class EffectsSystem:
             'num_particulas': 0,
             'num_rastros': 0,
             'num_fragmentos': 0,
-            'tempo_render': 0.0
+            'tempo_render': 0.0,
+            # Trabalho evitado por explosões fora da tela ou distantes
+            'culling': {
+                'explosoes_fora_tela': 0,
+                'explosoes_distantes': 0,
+                'particulas_evitadas': 0,
+                'fragmentos_evitados': 0,
+                'subefeitos_evitados': 0
+            }
         }
         
         # Flag para efeitos de alta qualidade
@@ -95,14 +119,9 @@ class EffectsSystem:
         """
         Inicializa os pools de objetos para reutilização.
         """
-        # Pool para partículas de explosão
-        self.pool_particulas_explosao = ParticlePool(
-            self.game, 
-            "models/misc/sphere", 
-            self.particulas_node,
-            initial_size=50,
-            max_size=200
-        )
+        # Detritos e centelhas não usam pools de nós: vivem em slots dos
+        # motores de partículas e são desenhados em lote
+        config_ultra = self.lod_manager.configuracoes[QualidadeEfeitos.ULTRA]
         
         # Pool para partículas de fumaça
         self.pool_particulas_fumaca = ParticlePool(
@@ -110,48 +129,80 @@ class EffectsSystem:
             "models/misc/plane", 
             self.fumaca_node,
             initial_size=20,
-            max_size=100
+            max_size=config_ultra['max_particulas_fumaca'] * 4
         )
         
-        # Pool para centelhas
-        self.pool_centelhas = ParticlePool(
-            self.game, 
-            "models/misc/sphere", 
-            self.centelhas_node,
-            initial_size=30,
-            max_size=150
-        )
-        
-        # Pool para rastros
-        self.pool_rastros = ParticlePool(
-            self.game, 
-            "models/misc/sphere", 
-            self.rastros_node,
-            initial_size=40,
-            max_size=200
+        # Pool para ondas de choque
+        self.pool_ondas_choque = ParticlePool(
+            self.game,
+            "models/misc/sphere",
+            self.explosoes_node,
+            initial_size=5,
+            max_size=20
         )
         
-        # Pool para luzes (função de fábrica customizada)
-        def criar_luz():
-            luz = PointLight('luz_pool')
-            luz.setColor((1, 0.5, 0.2, 1))
-            luz.setAttenuation((1, 0, 0.5))
-            luz_np = self.game.render.attachNewNode(luz)
-            luz_np.setPos(0, 0, 0)
-            return luz_np
-        
-        def resetar_luz(luz_np):
-            luz_np.setPos(0, 0, 0)
-            luz_np.getNode().setColor((1, 0.5, 0.2, 1))
-            luz_np.getNode().setAttenuation((1, 0, 0.5))
-            self.game.render.clearLight(luz_np)
-            
-        self.pool_luzes = ObjectPool(
-            factory_func=criar_luz,
-            reset_func=resetar_luz,
+        # Pool para flashes de explosão
+        self.pool_flashes = ParticlePool(
+            self.game,
+            "models/misc/plane",
+            self.explosoes_node,
             initial_size=5,
             max_size=20
         )
+        
+        # Rastros de projéteis: linhas dinâmicas reutilizadas entre projéteis
+        self.rastros_livres = []
+        self.rastros_ativos = []
+    
+    def _inicializar_motores_particulas(self):
+        """
+        Inicializa os motores de partículas em estrutura de arrays.
+        A capacidade comporta várias explosões simultâneas na qualidade ULTRA.
+        """
+        config_ultra = self.lod_manager.configuracoes[QualidadeEfeitos.ULTRA]
+        
+        # Detritos: gravidade, resistência do ar e quique no chão
+        self.motor_detritos = MotorParticulas(
+            capacidade=config_ultra['max_particulas_explosao'] * 4,
+            gravidade=-9.8,
+            arrasto=0.98,
+            altura_chao=0.1,
+            restituicao=0.4,
+            atrito_chao=0.7,
+            lei_escala=MotorParticulas.ESCALA_DECAIMENTO,
+            fator_escala=0.99,
+            usar_rotacao=True
+        )
+        
+        # Centelhas: gravidade mais leve e cintilação
+        self.motor_centelhas = MotorParticulas(
+            capacidade=config_ultra['max_particulas_explosao'] * 2,
+            gravidade=-4.9,
+            lei_escala=MotorParticulas.ESCALA_PROPORCIONAL,
+            desvanecer=False,
+            cintilacao=0.3
+        )
+        
+        # Fumaça: sobe lentamente, cresce e desaparece (sprites do pool de fumaça)
+        self.motor_fumaca = MotorParticulas(
+            capacidade=config_ultra['max_particulas_fumaca'] * 4,
+            lei_escala=MotorParticulas.ESCALA_CRESCIMENTO
+        )
+        self.motor_fumaca.ao_expirar = self.pool_particulas_fumaca.release_particle
+        
+        self.motores_particulas = [
+            self.motor_detritos, self.motor_centelhas, self.motor_fumaca
+        ]
+        
+        # Partículas distantes ou fora da tela são atualizadas com menos frequência
+        for motor in self.motores_particulas:
+            motor.agendador = self.agendador
+        
+        # Detritos e centelhas são desenhados em lote (um Geom por tipo);
+        # a fumaça continua em sprites individuais com textura e billboard
+        RenderizadorParticulas(self.motor_detritos, self.particulas_node, 'icosaedro', 'lote_detritos')
+        lote_centelhas = RenderizadorParticulas(self.motor_centelhas, self.centelhas_node, 'octaedro', 'lote_centelhas')
+        lote_centelhas.node.setLightOff()
     
     def _carregar_texturas(self):
         """
@@ -162,29 +213,32 @@ class EffectsSystem:
         """
         texturas = {}
         
+        # Gerador usado quando algum arquivo de textura não existe
+        self.gerador_texturas = GeradorTexturas()
+        
         # Textura para fumaça
-        tex_fumaca = self.game.loader.loadTexture("texturas/fumaca.png")
+        tex_fumaca = self.game.loader.loadTexture("texturas/fumaca.png", okMissing=True)
         if not tex_fumaca:
             # Cria uma textura de fumaça procedural se não existir
             tex_fumaca = self._criar_textura_procedural("fumaca", 128, 128)
         texturas['fumaca'] = tex_fumaca
         
         # Textura para fogo
-        tex_fogo = self.game.loader.loadTexture("texturas/fogo.png")
+        tex_fogo = self.game.loader.loadTexture("texturas/fogo.png", okMissing=True)
         if not tex_fogo:
             # Cria uma textura de fogo procedural se não existir
             tex_fogo = self._criar_textura_procedural("fogo", 128, 128)
         texturas['fogo'] = tex_fogo
         
         # Textura para explosão
-        tex_explosao = self.game.loader.loadTexture("texturas/explosao.png")
+        tex_explosao = self.game.loader.loadTexture("texturas/explosao.png", okMissing=True)
         if not tex_explosao:
             # Cria uma textura de explosão procedural se não existir
             tex_explosao = self._criar_textura_procedural("explosao", 128, 128)
         texturas['explosao'] = tex_explosao
         
         # Textura para onda de choque
-        tex_onda = self.game.loader.loadTexture("texturas/onda_choque.png")
+        tex_onda = self.game.loader.loadTexture("texturas/onda_choque.png", okMissing=True)
         if not tex_onda:
             # Cria uma textura de onda procedural se não existir
             tex_onda = self._criar_textura_procedural("onda", 64, 64)
@@ -195,6 +249,7 @@ class EffectsSystem:
     def _criar_textura_procedural(self, tipo, largura, altura):
         """
         Cria uma textura procedural para quando as texturas não estão disponíveis.
+        A geração é vetorizada e o resultado fica em cache no disco.
         
         Args:
             tipo: Tipo de textura a criar ('fumaca', 'fogo', 'explosao', 'onda').
@@ -204,89 +259,7 @@ class EffectsSystem:
         Returns:
             Textura procedural criada.
         """
-        imagem = PNMImage(largura, altura)
-        imagem.addAlpha()
-        
-        if tipo == 'fumaca':
-            # Cria uma textura de fumaça com gradiente radial
-            for x in range(largura):
-                for y in range(altura):
-                    # Calcula distância normalizada do centro
-                    dx = (x / largura) - 0.5
-                    dy = (y / altura) - 0.5
-                    dist = math.sqrt(dx*dx + dy*dy) * 2.0
-                    
-                    # Cria gradiente radial
-                    valor = max(0, 1.0 - dist)
-                    valor = valor * valor  # Mais concentrado no centro
-                    
-                    # Define cor e alpha
-                    imagem.setXel(x, y, valor, valor, valor)
-                    imagem.setAlpha(x, y, valor * 0.8)
-        
-        elif tipo == 'fogo':
-            # Cria uma textura de fogo com gradiente vertical
-            for x in range(largura):
-                for y in range(altura):
-                    # Posição normalizada
-                    nx = x / largura
-                    ny = y / altura
-                    
-                    # Adiciona ruído para parecer mais natural
-                    noise = random.random() * 0.2
-                    
-                    # Gradiente de cores (vermelho -> amarelo)
-                    r = min(1.0, 0.7 + ny * 0.3 + noise)
-                    g = ny * 0.7 + noise * 0.5
-                    b = noise * 0.1
-                    
-                    # Define cor e alpha
-                    imagem.setXel(x, y, r, g, b)
-                    imagem.setAlpha(x, y, (1.0 - ny) * 0.9)
-        
-        elif tipo == 'explosao':
-            # Cria uma textura de explosão com gradiente radial
-            for x in range(largura):
-                for y in range(altura):
-                    # Calcula distância normalizada do centro
-                    dx = (x / largura) - 0.5
-                    dy = (y / altura) - 0.5
-                    dist = math.sqrt(dx*dx + dy*dy) * 2.0
-                    
-                    # Cria um anel
-                    valor = max(0, 1.0 - abs(dist - 0.5) * 2.0)
-                    valor = pow(valor, 0.5)  # Ajusta contraste
-                    
-                    # Define cor e alpha
-                    r = min(1.0, valor * 1.5)
-                    g = valor * 0.6
-                    b = valor * 0.3
-                    imagem.setXel(x, y, r, g, b)
-                    imagem.setAlpha(x, y, valor)
-        
-        elif tipo == 'onda':
-            # Cria uma textura de onda de choque (anel)
-            for x in range(largura):
-                for y in range(altura):
-                    # Calcula distância normalizada do centro
-                    dx = (x / largura) - 0.5
-                    dy = (y / altura) - 0.5
-                    dist = math.sqrt(dx*dx + dy*dy) * 2.0
-                    
-                    # Cria um anel fino
-                    valor = max(0, 1.0 - abs(dist - 0.8) * 8.0)
-                    
-                    # Define cor e alpha
-                    imagem.setXel(x, y, 1, 1, 1)
-                    imagem.setAlpha(x, y, valor)
-        
-        # Cria a textura do Panda3D a partir da imagem
-        textura = Texture()
-        textura.load(imagem)
-        textura.setMagfilter(Texture.FTLinear)
-        textura.setMinfilter(Texture.FTLinearMipmapLinear)
-        
-        return textura
+        return self.gerador_texturas.obter(tipo, largura, altura)
     
     def _aplicar_configuracoes_lod(self):
         """
@@ -303,11 +276,6 @@ class EffectsSystem:
         self.duracao_efeitos = config['duracao_efeitos']
         self.max_luzes = config['max_luzes']
         self.max_rastros = config['max_rastros']
-        
-        # Ajusta o raio das luzes
-        if hasattr(self, 'pool_luzes'):
-            for luz in self.pool_luzes.in_use:
-                luz.getNode().setAttenuation((1, 0, 1.0/config['raio_luz']))
     
     def _ajustar_qualidade_efeitos(self, qualidade_antiga, qualidade_nova, config):
         """
@@ -342,13 +310,8 @@ class EffectsSystem:
         """
         # Limita o número de partículas em explosões ativas
         for explosao in self.explosoes:
-            if 'particulas' in explosao and len(explosao['particulas']) > config['max_particulas_explosao']:
-                # Remove partículas excedentes
-                excesso = len(explosao['particulas']) - config['max_particulas_explosao']
-                for _ in range(excesso):
-                    if explosao['particulas']:
-                        particula = explosao['particulas'].pop()
-                        particula['node'].removeNode()
+            self.motor_detritos.limitar_grupo(explosao['id'], config['max_particulas_explosao'])
+            self.motor_fumaca.limitar_grupo(explosao['id'], config['max_particulas_fumaca'])
             
             # Ajusta duração dos efeitos
             if explosao['duracao'] > config['duracao_efeitos']:
@@ -358,33 +321,11 @@ class EffectsSystem:
                 explosao['duracao'] = config['duracao_efeitos']
                 explosao['tempo'] = max(0, explosao['duracao'] - (tempo_restante * fator))
         
-        # Limita o número de rastros
-        if len(self.rastros) > config['max_rastros']:
-            excesso = len(self.rastros) - config['max_rastros']
-            for _ in range(excesso):
-                if self.rastros:
-                    rastro = self.rastros.pop(0)  # Remove os mais antigos
-                    rastro['node'].removeNode()
-        
-        # Lista de rastros de projéteis
-        self.rastros = []
-        
-        # Nó pai para todos os efeitos
-        self.efeitos_node = NodePath("efeitos")
-        self.efeitos_node.reparentTo(game.render)
-        
-        # Cria nós separados para diferentes tipos de efeitos
-        self.explosoes_node = NodePath("explosoes")
-        self.explosoes_node.reparentTo(self.efeitos_node)
-        
-        self.particulas_node = NodePath("particulas")
-        self.particulas_node.reparentTo(self.efeitos_node)
-        
-        self.rastros_node = NodePath("rastros")
-        self.rastros_node.reparentTo(self.efeitos_node)
-        
-        # Pré-configura configurações de partículas
-        self.configurar_sistema_particulas()
+        # Rastros livres com o comprimento antigo são descartados; os ativos
+        # mantêm o comprimento até o projétil terminar
+        for rastro in self.rastros_livres:
+            rastro.remover()
+        self.rastros_livres = []
         
     def configurar_sistema_particulas(self):
         """
@@ -488,62 +429,86 @@ class EffectsSystem:
             num_fragmentos = 10
             forca_fisica = 500.0
         
-        # Cria nó para a explosão na hierarquia correta
-        explosao_node = NodePath(f"explosao_{len(self.explosoes)}")
-        explosao_node.reparentTo(self.explosoes_node)
-        explosao_node.setPos(posicao)
+        # Identificador da explosão (grupo das partículas nos motores)
+        id_explosao = self._proximo_id_explosao
+        self._proximo_id_explosao += 1
         
-        # Inicializa o dicionário da explosão
+        # Inicializa o dicionário da explosão (os nós de cada efeito vêm dos pools)
         explosao = {
-            'node': explosao_node,
+            'id': id_explosao,
             'posicao': LPoint3(*posicao),
             'raio': raio,
-            'tempo_vida': duracao,
-            'tempo_inicial': duracao,
+            'tempo': 0.0,
+            'duracao': duracao,
             'tipo': tipo
         }
         
-        # Adiciona luzes para a explosão
-        luzes = self._criar_luzes_explosao(explosao_node, cor_base, raio)
-        explosao['luzes'] = luzes
-        
-        # Cria a onda de choque (esfera que expande)
-        try:
-            onda_choque = self._criar_onda_choque(explosao_node, cor_base, raio)
-            explosao['onda_choque'] = onda_choque
-        except Exception as e:
-            print(f"Aviso: Erro ao criar onda de choque: {e}")
-            explosao['onda_choque'] = None
-        
-        # Cria o flash de luz inicial
-        try:
-            flash = self._criar_flash_explosao(explosao_node, cor_base, raio)
-            explosao['flash'] = flash
-        except Exception as e:
-            print(f"Aviso: Erro ao criar flash de explosão: {e}")
-            explosao['flash'] = None
-        
-        # Cria as partículas de explosão
-        try:
-            particulas = self._criar_particulas_explosao(explosao_node, num_particulas, raio, cor_base, duracao)
-            explosao['particulas'] = particulas
-        except Exception as e:
-            print(f"Aviso: Erro ao criar partículas de explosão: {e}")
-            particulas = []
-            explosao['particulas'] = particulas
-        
-        # Cria centelhas
-        num_centelhas = max(5, int(num_particulas * 0.3))
-        centelhas = self._criar_centelhas_explosao(explosao_node, num_centelhas, raio)
-        explosao['centelhas'] = centelhas
-        
-        # Cria fumaça
-        num_nuvens_fumaca = max(3, int(num_particulas * 0.2))
-        try:
-            self._criar_fumaca_explosao(explosao, num_nuvens_fumaca, raio, duracao)
-        except Exception as e:
-            print(f"Aviso: Erro ao criar fumaça de explosão: {e}")
-            explosao['fumaca'] = []
+        # Quanto da explosão a câmera vai ver: 0.0 fora da tela, menos de 1.0
+        # além do distancia_lod
+        visibilidade = self.agendador.fator_visibilidade(explosao['posicao'], raio)
+        explosao['visibilidade'] = visibilidade
+        culling = self.estatisticas['culling']
+        if visibilidade <= 0.0:
+            culling['explosoes_fora_tela'] += 1
+        elif visibilidade < 1.0:
+            culling['explosoes_distantes'] += 1
+        
+        # Registra a explosão como fonte de luz no gerenciador de luzes (fora
+        # da tela ela ainda ilumina a cena visível, mas com menos prioridade)
+        explosao['fonte_luz'] = self._criar_luzes_explosao(
+            explosao['posicao'], cor_base, raio, importancia=max(0.25, visibilidade)
+        )
+        
+        explosao['onda_choque'] = None
+        explosao['flash'] = None
+        if visibilidade > 0.0:
+            # Cria a onda de choque (esfera que expande)
+            try:
+                explosao['onda_choque'] = self._criar_onda_choque(explosao['posicao'], cor_base, raio)
+            except Exception as e:
+                print(f"Aviso: Erro ao criar onda de choque: {e}")
+            
+            # Cria o flash de luz inicial
+            try:
+                explosao['flash'] = self._criar_flash_explosao(explosao['posicao'], cor_base, raio)
+            except Exception as e:
+                print(f"Aviso: Erro ao criar flash de explosão: {e}")
+        else:
+            culling['subefeitos_evitados'] += 2
+        
+        # Cria as partículas de explosão (limitadas pelo LOD atual e reduzidas
+        # pela visibilidade)
+        num_particulas = min(num_particulas, self.max_particulas_explosao)
+        num_visiveis = int(num_particulas * visibilidade)
+        culling['particulas_evitadas'] += num_particulas - num_visiveis
+        num_particulas = num_visiveis
+        particulas = np.zeros(0, dtype=np.int64)
+        if num_particulas > 0:
+            try:
+                particulas = self._criar_particulas_explosao(explosao, num_particulas, raio, cor_base, duracao)
+            except Exception as e:
+                print(f"Aviso: Erro ao criar partículas de explosão: {e}")
+        explosao['particulas'] = particulas
+        
+        # Cria centelhas (as primeiras a serem recusadas se o orçamento acabar
+        # e omitidas em explosões distantes)
+        explosao['centelhas'] = np.zeros(0, dtype=np.int64)
+        if visibilidade < 0.5:
+            culling['subefeitos_evitados'] += 1
+        elif self.agendador.pode_emitir(AgendadorEfeitos.PRIORIDADE_CENTELHAS):
+            num_centelhas = max(5, int(num_particulas * 0.3))
+            explosao['centelhas'] = self._criar_centelhas_explosao(explosao, num_centelhas, raio)
+        
+        # Cria fumaça (recusada em seguida, sob carga maior)
+        explosao['fumaca'] = []
+        if visibilidade <= 0.0:
+            culling['subefeitos_evitados'] += 1
+        elif self.agendador.pode_emitir(AgendadorEfeitos.PRIORIDADE_FUMACA):
+            num_nuvens_fumaca = min(max(3, int(num_particulas * 0.2)), self.max_particulas_fumaca)
+            try:
+                self._criar_fumaca_explosao(explosao, num_nuvens_fumaca, raio, duracao)
+            except Exception as e:
+                print(f"Aviso: Erro ao criar fumaça de explosão: {e}")
         
         # Aplica efeitos de física se o sistema estiver disponível
         if self.sistema_fisica and self.usar_fisica_avancada:
@@ -552,6 +517,11 @@ class EffectsSystem:
                 posicao, raio * 2.0, forca_fisica, afetar_predios=(tipo == 'grande')
             )
             
+            # Fragmentos são apenas visuais: acompanham a visibilidade
+            num_visiveis = int(num_fragmentos * visibilidade)
+            culling['fragmentos_evitados'] += num_fragmentos - num_visiveis
+            num_fragmentos = num_visiveis
+            
             # Cria fragmentos se for uma explosão grande
             if num_fragmentos > 0:
                 # Define o modelo para os fragmentos
@@ -575,87 +545,45 @@ class EffectsSystem:
             self.estatisticas['num_particulas'] += len(explosao['centelhas'])
         
         return explosao
-    def _criar_luzes_explosao(self, node_pai, cor_base, raio):
+    def _criar_luzes_explosao(self, posicao, cor_base, raio, importancia=1.0):
         """
-        Cria luzes para a explosão para iluminar dinamicamente a cena.
+        Registra a explosão como fonte de luz para iluminar dinamicamente a cena.
+        A luz efetiva é atribuída pelo gerenciador de luzes, que funde
+        explosões próximas e respeita o limite de luzes do LOD.
         
         Args:
-            node_pai: Nó pai para anexar as luzes.
+            posicao: Posição da explosão.
             cor_base: Cor base da explosão.
             raio: Raio da explosão que afeta o alcance das luzes.
+            importancia: Peso da fonte na disputa pelas luzes disponíveis.
             
         Returns:
-            Lista de luzes criadas para a explosão.
-        """
-        # Lista para armazenar as luzes criadas
-        luzes = []
-        
-        try:
-            # Luz principal no centro da explosão
-            luz_central = PointLight('luz_explosao_central')
-            luz_central.setColor(VBase4(cor_base[0], cor_base[1], cor_base[2], 1))
-            luz_central.setAttenuation(LVector3(0.0, 0.0, 0.5 / raio))
-            luz_central_np = node_pai.attachNewNode(luz_central)
-            luz_central_np.setPos(0, 0, 0)
-            
-            # Define alcance com base no raio da explosão
-            alcance = raio * 3.0
-            luz_central.setMaxDistance(alcance)
-            
-            # Ativa a luz na cena
-            self.game.render.setLight(luz_central_np)
-            
-            luzes.append({
-                'node': luz_central_np,
-                'light': luz_central,
-                'tipo': 'central',
-                'intensidade_inicial': 1.0
-            })
-            
-            # Luz secundária com cor mais quente (tons de laranja)
-            luz_sec = PointLight('luz_explosao_secundaria')
-            cor_sec = VBase4(min(1.0, cor_base[0] * 1.2), 
-                            min(1.0, cor_base[1] * 0.7),
-                            min(0.5, cor_base[2] * 0.3), 1)
-            luz_sec.setColor(cor_sec)
-            luz_sec.setAttenuation(LVector3(0.0, 0.0, 1.0 / raio))
-            luz_sec_np = node_pai.attachNewNode(luz_sec)
-            luz_sec_np.setPos(0, 0, 0)
-            
-            # Define alcance menor para a luz secundária
-            luz_sec.setMaxDistance(alcance * 0.6)
-            
-            # Ativa a luz na cena
-            self.game.render.setLight(luz_sec_np)
-            
-            luzes.append({
-                'node': luz_sec_np,
-                'light': luz_sec,
-                'tipo': 'secundaria',
-                'intensidade_inicial': 0.8
-            })
-            
-        except Exception as e:
-            # Em caso de erro na criação de luzes, registra o problema mas não falha
-            print(f"Aviso: Erro ao criar luzes para explosão: {e}")
-        
-        return luzes
+            ID da fonte de luz registrada.
+        """
+        # Cor de fogo (laranja/amarelo) puxada para a cor da explosão
+        cor = (
+            min(1.0, 0.5 + cor_base[0] * 0.5),
+            min(1.0, 0.3 + cor_base[1] * 0.3),
+            min(1.0, 0.1 + cor_base[2] * 0.1)
+        )
+        return self.gerenciador_luzes.registrar_fonte(posicao, cor, raio, importancia=importancia)
     
-    def _criar_onda_choque(self, node_pai, cor_base, raio):
+    def _criar_onda_choque(self, posicao, cor_base, raio):
         """
         Cria uma onda de choque visual para a explosão (esfera que expande).
         
         Args:
-            node_pai: Nó pai para anexar a onda de choque.
+            posicao: Posição da explosão.
             cor_base: Cor base da explosão.
             raio: Raio da explosão.
             
         Returns:
             NodePath da onda de choque criada.
         """
-        # Cria uma esfera para representar a onda de choque
-        onda = self.game.loader.loadModel("models/misc/sphere")
-        onda.reparentTo(node_pai)
+        # Obtém uma esfera do pool para representar a onda de choque
+        onda = self.pool_ondas_choque.get_particle()
+        onda.setPos(posicao)
+        onda.setAlphaScale(1.0)
         
         # Configura a aparência da onda
         onda.setTransparency(TransparencyAttrib.MAlpha)
@@ -694,21 +622,22 @@ class EffectsSystem:
         
         return onda
         
-    def _criar_flash_explosao(self, node_pai, cor_base, raio):
+    def _criar_flash_explosao(self, posicao, cor_base, raio):
         """
         Cria um flash de luz inicial para a explosão.
         
         Args:
-            node_pai: Nó pai para anexar o flash.
+            posicao: Posição da explosão.
             cor_base: Cor base da explosão.
             raio: Raio da explosão.
             
         Returns:
             NodePath do flash criado.
         """
-        # Cria um quad para representar o flash
-        flash = self.game.loader.loadModel("models/misc/plane")
-        flash.reparentTo(node_pai)
+        # Obtém um quad do pool para representar o flash
+        flash = self.pool_flashes.get_particle()
+        flash.setPos(posicao)
+        flash.setAlphaScale(1.0)
         
         # Configura a aparência do flash
         flash.setTransparency(TransparencyAttrib.MAlpha)
@@ -737,144 +666,88 @@ class EffectsSystem:
         
         return flash
         
-    def _criar_particulas_explosao(self, node_pai, num_particulas, raio, cor_base, duracao):
+    def _direcoes_aleatorias(self, n):
+        """
+        Gera direções aleatórias em 3D (coordenadas esféricas).
+        
+        Args:
+            n: Número de direções.
+            
+        Returns:
+            Array (n, 3) com vetores unitários.
+        """
+        phi = np.random.uniform(0, math.pi * 2, n)
+        theta = np.random.uniform(0, math.pi, n)
+        seno_theta = np.sin(theta)
+        return np.stack((seno_theta * np.cos(phi), seno_theta * np.sin(phi), np.cos(theta)), axis=1)
+    
+    def _criar_particulas_explosao(self, explosao, num_particulas, raio, cor_base, duracao):
         """
         Cria partículas para a explosão.
         
         Args:
-            node_pai: Nó pai para anexar as partículas.
+            explosao: Dicionário com informações da explosão.
             num_particulas: Número de partículas a criar.
             raio: Raio da explosão.
             cor_base: Cor base da explosão.
             duracao: Duração da explosão em segundos.
             
         Returns:
-            Lista de partículas criadas.
+            Array com os slots das partículas no motor de detritos.
         """
-        particulas = []
+        n = num_particulas
         
-        # Cria fragmentos de detritos para simular a explosão
-        for _ in range(num_particulas):
-            # Direção aleatória em 3D
-            phi = random.uniform(0, math.pi * 2)
-            theta = random.uniform(0, math.pi)
-            
-            x = math.sin(theta) * math.cos(phi)
-            y = math.sin(theta) * math.sin(phi)
-            z = math.cos(theta)
-            
-            # Velocidade baseada no raio (maior raio = mais velocidade)
-            velocidade = random.uniform(5, 15) * (raio / 2.0)
-            direcao = LVector3(x, y, z)
-            
-            # Cria um modelo de detrito baseado na qualidade dos efeitos
-            if hasattr(self, 'qualidade') and self.qualidade == 'baixa':
-                # Versão simplificada para baixa qualidade
-                detrito = self.game.loader.loadModel("models/misc/sphere")
-            else:
-                # Escolhe entre modelos básicos que sabemos que existem
-                modelos = ["models/misc/cube", "models/misc/sphere"]
-                try:
-                    detrito = self.game.loader.loadModel(random.choice(modelos))
-                except Exception as e:
-                    # Fallback para modelo mais simples em caso de erro
-                    print(f"Aviso: Erro ao carregar modelo para detrito: {e}")
-                    detrito = self.game.loader.loadModel("models/misc/sphere")
-            
-            detrito.reparentTo(node_pai)
-            
-            # Escala aleatória pequena
-            escala = random.uniform(0.1, 0.3) * (raio / 2.0)
-            detrito.setScale(escala)
-            
-            # Cor baseada na cor da explosão com variações
-            r, g, b = cor_base
-            var = 0.2  # Variação de cor
-            cor_particula = (
-                min(1.0, r + random.uniform(-var, var)),
-                min(1.0, g + random.uniform(-var, var)),
-                min(1.0, b + random.uniform(-var, var))
-            )
-            detrito.setColor(*cor_particula, 1)
-            
-            # Rotação aleatória
-            detrito.setHpr(
-                random.uniform(0, 360),
-                random.uniform(0, 360),
-                random.uniform(0, 360)
-            )
-            
-            # Velocidade de rotação aleatória
-            rot_velocidade = LVector3(
-                random.uniform(-180, 180),
-                random.uniform(-180, 180),
-                random.uniform(-180, 180)
-            )
-            
-            # Tempo de vida aleatório
-            tempo_vida = random.uniform(duracao * 0.2, duracao * 0.8)
-            
-            # Adiciona a partícula à lista
-            particulas.append({
-                'node': detrito,
-                'velocidade': direcao * velocidade,
-                'rotacao': rot_velocidade,
-                'tempo_vida': tempo_vida,
-                'tempo_inicial': tempo_vida
-            })
+        # Velocidade baseada no raio (maior raio = mais velocidade)
+        velocidades = self._direcoes_aleatorias(n) * (np.random.uniform(5, 15, n) * (raio / 2.0))[:, None]
         
-        return particulas
+        # Escala aleatória pequena
+        escalas = np.random.uniform(0.1, 0.3, n) * (raio / 2.0)
+        
+        # Cor baseada na cor da explosão com variações
+        cores = np.ones((n, 4), dtype=np.float32)
+        cores[:, :3] = np.clip(np.asarray(cor_base) + np.random.uniform(-0.2, 0.2, (n, 3)), 0.0, 1.0)
+        
+        # Rotação e velocidade de rotação aleatórias
+        rotacoes = np.random.uniform(0, 360, (n, 3))
+        velocidades_rotacao = np.random.uniform(-180, 180, (n, 3))
+        
+        # Tempo de vida aleatório
+        vida = np.random.uniform(duracao * 0.2, duracao * 0.8, n)
         
-    def _criar_centelhas_explosao(self, node_pai, num_centelhas, raio):
+        posicoes = np.tile(np.asarray(explosao['posicao'], dtype=np.float32), (n, 1))
+        return self.motor_detritos.emitir(
+            posicoes, velocidades, vida, escalas, cores, grupo=explosao['id'],
+            escalas_finais=np.full(n, 0.01), rotacoes=rotacoes,
+            velocidades_rotacao=velocidades_rotacao
+        )
+        
+    def _criar_centelhas_explosao(self, explosao, num_centelhas, raio):
         """
         Cria centelhas brilhantes para a explosão.
         
         Args:
-            node_pai: Nó pai para anexar as centelhas.
+            explosao: Dicionário com informações da explosão.
             num_centelhas: Número de centelhas a criar.
             raio: Raio da explosão.
             
         Returns:
-            Lista de dicionários com informações das centelhas.
+            Array com os slots das centelhas no motor de centelhas.
         """
-        centelhas = []
+        n = num_centelhas
         
-        for _ in range(num_centelhas):
-            # Direção aleatória
-            phi = random.uniform(0, math.pi * 2)
-            theta = random.uniform(0, math.pi)
-            
-            x = math.sin(theta) * math.cos(phi)
-            y = math.sin(theta) * math.sin(phi)
-            z = math.cos(theta)
-            
-            # Velocidade alta para centelhas
-            velocidade = random.uniform(15, 30) * (raio / 2.0)
-            direcao = LVector3(x, y, z)
-            
-            # Cria pequeno ponto brilhante
-            centelha = self.game.loader.loadModel("models/misc/sphere")
-            centelha.reparentTo(node_pai)
-            
-            # Tamanho pequeno
-            escala = random.uniform(0.05, 0.15)
-            centelha.setScale(escala)
-            
-            # Cor branca/amarela brilhante
-            r = 1.0
-            g = random.uniform(0.8, 1.0)
-            b = random.uniform(0.3, 0.6)
-            centelha.setColor(r, g, b, 1)
-            centelha.setLightOff()
-            
-            centelhas.append({
-                'node': centelha,
-                'velocidade': direcao * velocidade,
-                'tempo_vida': random.uniform(0.2, 1.0),
-                'tempo_inicial': random.uniform(0.2, 1.0)
-            })
+        # Velocidade alta para centelhas
+        velocidades = self._direcoes_aleatorias(n) * (np.random.uniform(15, 30, n) * (raio / 2.0))[:, None]
+        
+        # Cor branca/amarela brilhante
+        cores = np.ones((n, 4), dtype=np.float32)
+        cores[:, 1] = np.random.uniform(0.8, 1.0, n)
+        cores[:, 2] = np.random.uniform(0.3, 0.6, n)
         
-        return centelhas
+        posicoes = np.tile(np.asarray(explosao['posicao'], dtype=np.float32), (n, 1))
+        return self.motor_centelhas.emitir(
+            posicoes, velocidades, np.random.uniform(0.2, 1.0, n),
+            np.full(n, 0.05), cores, grupo=explosao['id']
+        )
         
     def atualizar(self):
         """
@@ -882,11 +755,21 @@ class EffectsSystem:
         """
         dt = self.game.taskMgr.globalClock.getDt()
         
+        # Mede o tempo gasto e captura a câmera para as faixas de distância
+        self.agendador.iniciar_quadro()
+        
         # Atualiza cada explosão
         self._atualizar_explosoes(dt)
         
-        # Atualiza rastros de projéteis
-        self._atualizar_rastros(dt)
+        # Distribui as luzes dinâmicas entre as explosões ativas
+        self.gerenciador_luzes.atualizar(dt)
+        
+        # Avança as partículas em um passo vetorizado por motor; as distantes
+        # só são simuladas no seu intervalo de frames
+        for motor in self.motores_particulas:
+            motor.atualizar(dt)
+        
+        self.agendador.finalizar_quadro()
         
     def _criar_fumaca_explosao(self, explosao, num_nuvens, raio, duracao):
         """
@@ -898,71 +781,53 @@ class EffectsSystem:
             raio: Raio da explosão.
             duracao: Duração da explosão em segundos.
         """
-        node_pai = explosao['node']
-        fumaca = []
-        
-        # Cria várias nuvens de fumaça em posições aleatórias próximas ao centro
-        for _ in range(num_nuvens):
-            # Posição aleatória dentro do raio da explosão
-            pos = LVector3(
-                random.uniform(-raio/2, raio/2),
-                random.uniform(-raio/2, raio/2),
-                random.uniform(0, raio/2)  # Tende a subir
-            )
-            
-            # Cria o sprite da fumaça
-            nuvem = self.game.loader.loadModel("models/misc/plane")
-            nuvem.reparentTo(node_pai)
-            nuvem.setPos(pos)
-            
-            # Configura a aparência da fumaça
-            nuvem.setTransparency(TransparencyAttrib.MAlpha)
-            
-            # Cor cinza com variações
-            intensidade = random.uniform(0.3, 0.7)
-            nuvem.setColor(intensidade, intensidade, intensidade, 0.3)  # Inicialmente semi-transparente
-            
-            # Escala aleatória
-            escala_base = random.uniform(0.5, 1.5) * raio
-            nuvem.setScale(escala_base * 0.2)  # Começa pequena e cresce
+        # Só pega do pool os sprites que o motor ainda tem onde guardar
+        n = min(num_nuvens, self.motor_fumaca.num_livres)
+        if n <= 0:
+            explosao['fumaca'] = []
+            return
+        
+        # Posição aleatória dentro do raio da explosão (tende a subir)
+        posicoes = np.empty((n, 3), dtype=np.float32)
+        posicoes[:, :2] = np.random.uniform(-raio / 2, raio / 2, (n, 2))
+        posicoes[:, 2] = np.random.uniform(0, raio / 2, n)
+        posicoes += np.asarray(explosao['posicao'], dtype=np.float32)
+        
+        # Velocidade de subida lenta
+        velocidades = np.empty((n, 3), dtype=np.float32)
+        velocidades[:, :2] = np.random.uniform(-1, 1, (n, 2))
+        velocidades[:, 2] = np.random.uniform(1, 3, n)
+        
+        # Cor cinza com variações, inicialmente semi-transparente
+        cores = np.empty((n, 4), dtype=np.float32)
+        cores[:, :3] = np.random.uniform(0.3, 0.7, n)[:, None]
+        cores[:, 3] = 0.3
+        
+        # Começa pequena e cresce
+        escalas = np.random.uniform(0.5, 1.5, n) * raio * 0.2
+        
+        # Tempo de vida maior que a explosão para permanecer após
+        vida = np.random.uniform(duracao * 1.2, duracao * 2.5, n)
+        
+        nodes = []
+        for intensidade, (x, y, z), escala in zip(cores[:, 0].tolist(), posicoes.tolist(), escalas.tolist()):
+            # Obtém o sprite da fumaça do pool
+            nuvem = self.pool_particulas_fumaca.get_particle()
+            nuvem.setPosHprScale(x, y, z, 0, 0, 0, escala, escala, escala)
+            nuvem.setColor(intensidade, intensidade, intensidade, 1)
             
             # Sempre virado para a câmera
             nuvem.setBillboardPointEye()
             
             # Se tivermos texturas, aplica uma textura de fumaça
-            if hasattr(self, 'texturas') and 'fumaca' in self.texturas:
-                try:
-                    nuvem.setTexture(self.texturas['fumaca'])
-                except Exception as e:
-                    print(f"Aviso: Não foi possível aplicar textura de fumaça: {e}")
-            
-            # Velocidade de subida lenta
-            velocidade = LVector3(
-                random.uniform(-1, 1),
-                random.uniform(-1, 1),
-                random.uniform(1, 3)  # Tende a subir
-            )
-            
-            # Velocidade de rotação lenta
-            rot_vel = random.uniform(-20, 20)
-            
-            # Tempo de vida maior que a explosão para permanecer após
-            tempo_vida = random.uniform(duracao * 1.2, duracao * 2.5)
-            
-            fumaca.append({
-                'node': nuvem,
-                'velocidade': velocidade,
-                'rotacao': rot_vel,
-                'escala_base': escala_base,
-                'escala_atual': escala_base * 0.2,
-                'escala_max': escala_base * 2.0,  # Tamanho máximo que a fumaça pode crescer
-                'tempo_vida': tempo_vida,
-                'tempo_inicial': tempo_vida,
-                'alpha_inicial': 0.3
-            })
-        
-        # Armazena a lista de fumaça na explosão
-        explosao['fumaca'] = fumaca
+            if 'fumaca' in self.texturas:
+                nuvem.setTexture(self.texturas['fumaca'])
+            nodes.append(nuvem)
+        
+        # Armazena os slots da fumaça na explosão
+        explosao['fumaca'] = self.motor_fumaca.emitir(
+            posicoes, velocidades, vida, escalas, cores, grupo=explosao['id'], nodes=nodes
+        )
     
     def _atualizar_explosoes(self, dt):
         """
@@ -986,20 +851,8 @@ class EffectsSystem:
             if 'flash' in explosao and explosao['flash']:
                 self._atualizar_flash_explosao(explosao, tempo_normalizado, dt)
             
-            # Atualiza as partículas de detritos
-            if 'particulas' in explosao and explosao['particulas']:
-                self._atualizar_particulas_explosao(explosao, dt)
-            
-            # Atualiza a fumaça residual
-            if 'fumaca' in explosao and explosao['fumaca']:
-                self._atualizar_fumaca_explosao(explosao, dt)
-            
-            # Atualiza as centelhas
-            if 'centelhas' in explosao and explosao['centelhas']:
-                self._atualizar_centelhas_explosao(explosao, dt)
-            
-            # Atualiza as luzes
-            if 'luzes' in explosao and explosao['luzes']:
+            # Atualiza a intensidade da fonte de luz
+            if explosao.get('fonte_luz') is not None:
                 self._atualizar_luzes_explosao(explosao, tempo_normalizado)
             
             # Remove a explosão se duração foi excedida
@@ -1050,189 +903,22 @@ class EffectsSystem:
             # Esconde o flash após o início
             flash.hide()
     
-    def _atualizar_particulas_explosao(self, explosao, dt):
-        """
-        Atualiza as partículas da explosão.
-        
-        Args:
-            explosao: Dicionário com informações da explosão.
-            dt: Delta time.
-        """
-        # Atualiza cada partícula
-        for particula in list(explosao['particulas']):
-            # Decrementa o tempo de vida
-            particula['tempo_vida'] -= dt
-            
-            if particula['tempo_vida'] <= 0:
-                # Remove a partícula
-                particula['node'].removeNode()
-                explosao['particulas'].remove(particula)
-            else:
-                # Atualiza posição com base na velocidade
-                atual_pos = particula['node'].getPos()
-                
-                # Adiciona gravidade e friccion para simular física
-                nova_vel = particula['velocidade'] + LVector3(0, 0, -9.8 * dt)  # Gravidade
-                
-                # Reduz velocidade (simulando resistência do ar)
-                nova_vel *= 0.98
-                
-                # Atualiza posição
-                nova_pos = atual_pos + nova_vel * dt
-                particula['node'].setPos(nova_pos)
-                particula['velocidade'] = nova_vel
-                
-                # Atualiza rotação
-                if 'rotacao' in particula:
-                    h, p, r = particula['node'].getHpr()
-                    rot = particula['rotacao']
-                    particula['node'].setHpr(h + rot.getX() * dt, 
-                                            p + rot.getY() * dt, 
-                                            r + rot.getZ() * dt)
-                
-                # Diminui gradualmente a escala e transparência
-                tempo_ratio = particula['tempo_vida'] / particula['tempo_inicial']
-                
-                # Escala diferente para tipos diferentes de partículas
-                if 'tipo' in particula and particula['tipo'] == 'fragmento':
-                    escala_final = 0.05
-                else:
-                    escala_final = 0.01
-                    
-                escala_atual = particula['node'].getScale().getX()  # Assume escala uniforme
-                nova_escala = max(escala_final, escala_atual * 0.99)  # Reduz gradualmente
-                particula['node'].setScale(nova_escala)
-                
-                # Obtém a cor atual e ajusta o alpha
-                cor = particula['node'].getColor()
-                particula['node'].setColor(cor[0], cor[1], cor[2], tempo_ratio)
-                
-                # Verifica colisão com o chão
-                if nova_pos.getZ() < 0.1:
-                    # Quica ou pára dependendo da velocidade
-                    if abs(nova_vel.getZ()) > 1.0:
-                        # Quica com perda de energia
-                        particula['velocidade'].setZ(-nova_vel.getZ() * 0.4)
-                        
-                        # Reduz velocidade horizontal (atrito)
-                        particula['velocidade'].setX(nova_vel.getX() * 0.7)
-                        particula['velocidade'].setY(nova_vel.getY() * 0.7)
-                        
-                        # Corrige a posição (acima do chão)
-                        particula['node'].setZ(0.1)
-                    else:
-                        # Para de quicar se a velocidade for muito baixa
-                        particula['velocidade'] = LVector3(0, 0, 0)
-                        particula['node'].setZ(0.1)
-                        
-                        # Reduz o tempo de vida mais rapidamente
-                        particula['tempo_vida'] -= dt * 2.0
-    
-    def _atualizar_fumaca_explosao(self, explosao, dt):
-        """
-        Atualiza a fumaça residual da explosão.
-        
-        Args:
-            explosao: Dicionário com informações da explosão.
-            dt: Delta time.
-        """
-        fumaca = explosao['fumaca']
-        
-        # Decrementa o tempo de vida
-        fumaca['tempo_vida'] -= dt
-        
-        if fumaca['tempo_vida'] <= 0:
-            # Remove toda a fumaça
-            fumaca['node'].removeNode()
-            explosao['fumaca'] = None
-        else:
-            # Calcula a proporção de tempo restante
-            tempo_ratio = fumaca['tempo_vida'] / fumaca['tempo_inicial']
-            
-            # Atualiza cada nuvem de fumaça
-            for nuvem in fumaca['nuvens']:
-                # Atualiza posição (movimento lento para cima)
-                atual_pos = nuvem['node'].getPos()
-                nova_pos = atual_pos + nuvem['velocidade'] * dt
-                nuvem['node'].setPos(nova_pos)
-                
-                # Aumenta a escala gradualmente (expansão da fumaça)
-                escala_atual = nuvem['escala_inicial'] * (2.0 - tempo_ratio)
-                nuvem['node'].setScale(escala_atual)
-                
-                # Diminui a opacidade com o tempo
-                alpha = nuvem['alpha_inicial'] * tempo_ratio
-                nuvem['node'].setAlphaScale(alpha)
-    
-    def _atualizar_centelhas_explosao(self, explosao, dt):
-        """
-        Atualiza as centelhas da explosão.
-        
-        Args:
-            explosao: Dicionário com informações da explosão.
-            dt: Delta time.
-        """
-        # Atualiza cada centelha
-        for centelha in list(explosao['centelhas']):
-            # Decrementa o tempo de vida
-            centelha['tempo_vida'] -= dt
-            
-            if centelha['tempo_vida'] <= 0:
-                # Remove a centelha
-                centelha['node'].removeNode()
-                explosao['centelhas'].remove(centelha)
-            else:
-                # Atualiza posição
-                atual_pos = centelha['node'].getPos()
-                
-                # Adiciona gravidade (mais leve para centelhas)
-                nova_vel = centelha['velocidade'] + LVector3(0, 0, -4.9 * dt)
-                
-                # Atualiza posição
-                nova_pos = atual_pos + nova_vel * dt
-                centelha['node'].setPos(nova_pos)
-                centelha['velocidade'] = nova_vel
-                
-                # Pisca aleatoriamente para efeito de faiscamento
-                if random.random() < 0.3:
-                    visivel = not centelha['node'].isHidden()
-                    if visivel:
-                        centelha['node'].hide()
-                    else:
-                        centelha['node'].show()
-                
-                # Diminui o tamanho gradualmente
-                tempo_ratio = centelha['tempo_vida'] / centelha['tempo_inicial']
-                centelha['node'].setScale(0.05 * tempo_ratio)
-    
     def _atualizar_luzes_explosao(self, explosao, tempo_normalizado):
         """
-        Atualiza as luzes da explosão.
+        Atualiza a intensidade da fonte de luz da explosão.
         
         Args:
             explosao: Dicionário com informações da explosão.
             tempo_normalizado: Tempo normalizado (0.0 a 1.0).
         """
-        # Atualiza cada luz
-        for luz in explosao['luzes']:
-            # Calcula intensidade da luz (diminui com o tempo)
-            intensidade = max(0.0, 1.0 - (tempo_normalizado * 2.0))
-            
-            # Se for a primeira luz (principal)
-            if luz == explosao['luzes'][0]:
-                # Cor de fogo (laranja/amarelo)
-                cor = (intensidade, intensidade * 0.6, intensidade * 0.2, 1)
-            else:
-                # Cor secundaria (mais clara)
-                cor = (intensidade * 0.8, intensidade * 0.5, intensidade * 0.2, 1)
-                
-            # Atualiza cor da luz
-            luz.getNode().setColor(cor)
-            
-            # Remove a luz se estiver muito fraca
-            if intensidade <= 0.05:
-                self.game.render.clearLight(luz)
-                explosao['luzes'].remove(luz)
+        # Calcula intensidade da luz (diminui com o tempo)
+        intensidade = max(0.0, 1.0 - (tempo_normalizado * 2.0))
+        self.gerenciador_luzes.atualizar_fonte(explosao['fonte_luz'], intensidade)
+        
+        # Libera a fonte quando estiver muito fraca
+        if intensidade <= 0.05:
+            self.gerenciador_luzes.remover_fonte(explosao['fonte_luz'])
+            explosao['fonte_luz'] = None
     
     def _remover_explosao(self, explosao):
         """
@@ -1241,94 +927,67 @@ class EffectsSystem:
         Args:
             explosao: Dicionário com informações da explosão.
         """
-        # Remove luzes
-        if 'luzes' in explosao and explosao['luzes']:
-            for luz in explosao['luzes']:
-                self.game.render.clearLight(luz)
+        # Libera a fonte de luz (a luz desvanece no gerenciador)
+        if explosao.get('fonte_luz') is not None:
+            self.gerenciador_luzes.remover_fonte(explosao['fonte_luz'])
         
-        # Remove partículas
-        if 'particulas' in explosao and explosao['particulas']:
-            for particula in explosao['particulas']:
-                particula['node'].removeNode()
-                
-        # Remove centelhas
-        if 'centelhas' in explosao and explosao['centelhas']:
-            for centelha in explosao['centelhas']:
-                centelha['node'].removeNode()
-                
-        # Remove fumaça
-        if 'fumaca' in explosao and explosao['fumaca']:
-            explosao['fumaca']['node'].removeNode()
+        # As partículas, centelhas e fumaça vivem nos motores até o fim do
+        # próprio tempo de vida (a fumaça permanece após a explosão)
             
-        # Remove onda de choque e flash
+        # Devolve onda de choque e flash aos pools
         if 'onda_choque' in explosao and explosao['onda_choque']:
-            explosao['onda_choque'].removeNode()
+            self.pool_ondas_choque.release_particle(explosao['onda_choque'])
             
         if 'flash' in explosao and explosao['flash']:
-            explosao['flash'].removeNode()
+            self.pool_flashes.release_particle(explosao['flash'])
             
-        # Remove o nó principal
-        explosao['node'].removeNode()
-        
         # Remove da lista
         self.explosoes.remove(explosao)
                 
-    def criar_rastro_banana(self, posicao, cor=(1, 1, 0)):
+    def criar_rastro_projetil(self, cor=(1, 1, 0)):
         """
-        Cria um efeito de rastro para a banana.
+        Obtém um rastro para um projétil. O comprimento do rastro (em pontos)
+        segue o limite de rastros do nível de qualidade atual.
         
         Args:
-            posicao: Posição para criar o rastro.
             cor: Cor do rastro (padrão: amarelo).
+            
+        Returns:
+            LinhaDinamica do rastro; o projétil adiciona um ponto por frame.
         """
-        # Cria uma pequena partícula que vai desaparecer
-        particula = self.game.loader.loadModel("models/misc/sphere")
-        particula.reparentTo(self.rastros_node)
-        particula.setPos(posicao)
-        particula.setScale(0.1)
-        
-        # Configura transparência e efeito de brilho
-        particula.setTransparency(TransparencyAttrib.MAlpha)
-        particula.setColor(*cor, 0.7)
-        particula.setLightOff()  # Não afetado por luzes para parecer brilhante
-        
-        # Adiciona à lista de rastros
-        self.rastros.append({
-            'node': particula,
-            'tempo_vida': 0.5,
-            'tempo_inicial': 0.5,
-            'posicao': LPoint3(*posicao),
-            'escala_inicial': 0.1
-        })
+        if self.rastros_livres:
+            rastro = self.rastros_livres.pop()
+            rastro.definir_cor(cor)
+            rastro.node.show()
+        else:
+            rastro = LinhaDinamica(
+                self.rastros_node, self.max_rastros, cor,
+                alpha_maximo=0.7, espessura=4.0, nome='rastro_projetil'
+            )
+        
+        self.rastros_ativos.append(rastro)
+        self.estatisticas['num_rastros'] += 1
+        return rastro
     
-    def _atualizar_rastros(self, dt):
+    def liberar_rastro(self, rastro):
         """
-        Atualiza os rastros dos projéteis.
+        Devolve o rastro de um projétil para reutilização.
         
         Args:
-            dt: Delta time (tempo desde o último frame).
+            rastro: LinhaDinamica obtida com criar_rastro_projetil.
         """
-        # Atualiza cada rastro
-        for rastro in list(self.rastros):
-            # Decrementa o tempo de vida
-            rastro['tempo_vida'] -= dt
-            
-            if rastro['tempo_vida'] <= 0:
-                # Remove o rastro
-                rastro['node'].removeNode()
-                self.rastros.remove(rastro)
-            else:
-                # Calcula o progresso normalizado (0.0 a 1.0)
-                progresso = rastro['tempo_vida'] / rastro['tempo_inicial']
-                
-                # Aumenta ligeiramente a escala e diminui opacidade gradualmente
-                nova_escala = rastro['escala_inicial'] * (1.0 + (1.0 - progresso) * 0.5)
-                rastro['node'].setScale(nova_escala)
-                
-                # Ajusta a transparência
-                cor = rastro['node'].getColor()
-                nova_cor = (cor[0], cor[1], cor[2], progresso * 0.7)
-                rastro['node'].setColor(*nova_cor)
+        if rastro not in self.rastros_ativos:
+            return
+        
+        self.rastros_ativos.remove(rastro)
+        
+        # Só reaproveita rastros com o comprimento do nível de qualidade atual
+        if rastro.capacidade == self.max_rastros:
+            rastro.limpar()
+            rastro.node.hide()
+            self.rastros_livres.append(rastro)
+        else:
+            rastro.remover()
         
     def limpar_todos_efeitos(self):
         """
@@ -1338,14 +997,24 @@ class EffectsSystem:
         for explosao in list(self.explosoes):
             self._remover_explosao(explosao)
             
-        # Remove todos os rastros
-        for rastro in self.rastros:
-            rastro['node'].removeNode()
-        self.rastros = []
+        # Remove todas as partículas dos motores (a fumaça volta ao pool)
+        for motor in self.motores_particulas:
+            motor.limpar()
+        
+        # Garante que todos os nós emprestados voltaram aos pools
+        self.pool_particulas_fumaca.release_all()
+        self.pool_ondas_choque.release_all()
+        self.pool_flashes.release_all()
+        
+        # Devolve os rastros ativos
+        for rastro in list(self.rastros_ativos):
+            self.liberar_rastro(rastro)
+        
+        # Apaga todas as luzes dinâmicas
+        self.gerenciador_luzes.limpar()
         
         # Limpa as listas
         self.explosoes = []
-        self.rastros = []
         self.particulas_ativas = []
 
 
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Gorillas 3D War - Entulho estático
+Converte fragmentos que já pararam em malhas estáticas fundidas por área,
+que ficam na cena sem custo de simulação.
+"""
+import math
+from collections import OrderedDict
+
+
+class GerenciadorEntulho:
+    """
+    Gerenciador do entulho assentado.
+
+    O mundo é dividido em áreas quadradas no plano XY. Cada fragmento
+    assentado é copiado para o nó da sua área, e as áreas alteradas são
+    achatadas (flattenStrong) em poucas malhas com as cores embutidas nos
+    vértices. O número total de peças é limitado: quando o limite é
+    ultrapassado, o entulho das áreas alteradas há mais tempo é descartado.
+    """
+
+    def __init__(self, game, tamanho_area=20.0, max_pecas=600):
+        """
+        Inicializa o gerenciador de entulho.
+
+        Args:
+            game: Referência ao jogo principal.
+            tamanho_area: Lado (em unidades) de cada área de entulho.
+            max_pecas: Número máximo de peças mantidas em todas as áreas.
+        """
+        self.game = game
+        self.tamanho_area = tamanho_area
+        self.max_pecas = max_pecas
+
+        # Nó raiz de todo o entulho
+        self.node = self.game.render.attachNewNode('entulho')
+
+        # Áreas por índice (ix, iy), da alterada há mais tempo para a mais
+        # recente: {'node': NodePath, 'pecas': int}
+        self.areas = OrderedDict()
+
+        # Áreas com peças novas ainda não achatadas
+        self._pendentes = set()
+
+        self.total_pecas = 0
+
+        # Estatísticas acumuladas
+        self.estatisticas = {
+            'pecas_assentadas': 0,
+            'pecas_descartadas': 0,
+            'areas_achatadas': 0
+        }
+
+    def _indice_area(self, posicao):
+        """
+        Retorna o índice da área que contém uma posição.
+        """
+        return (math.floor(posicao[0] / self.tamanho_area),
+                math.floor(posicao[1] / self.tamanho_area))
+
+    def adicionar(self, visual):
+        """
+        Copia a geometria de um fragmento para o entulho da sua área.
+        O fragmento original pode ser removido em seguida.
+
+        Args:
+            visual: NodePath com a geometria do fragmento, já na cena.
+        """
+        chave = self._indice_area(visual.getPos(self.game.render))
+
+        area = self.areas.get(chave)
+        if area is None:
+            area = {'node': self.node.attachNewNode(f'entulho_{chave[0]}_{chave[1]}'), 'pecas': 0}
+            self.areas[chave] = area
+        else:
+            self.areas.move_to_end(chave)
+
+        # Cópia com a transformação do fragmento no mundo
+        copia = visual.copyTo(area['node'])
+        copia.setTransform(visual.getTransform(self.game.render))
+
+        # Nós de modelo (ModelRoot) impedem que o flattenStrong funda as peças
+        copia.clearModelNodes()
+
+        area['pecas'] += 1
+        self.total_pecas += 1
+        self.estatisticas['pecas_assentadas'] += 1
+        self._pendentes.add(chave)
+
+        # Respeita o limite de memória descartando as áreas mais antigas
+        while self.total_pecas > self.max_pecas and len(self.areas) > 1:
+            antiga = next(iter(self.areas))
+            if antiga == chave:
+                break
+            self._remover_area(antiga)
+
+    def achatar_pendentes(self):
+        """
+        Funde as peças novas de cada área alterada em malhas estáticas.
+        """
+        for chave in self._pendentes:
+            area = self.areas.get(chave)
+            if area is not None:
+                area['node'].flattenStrong()
+                self.estatisticas['areas_achatadas'] += 1
+        self._pendentes.clear()
+
+    def _remover_area(self, chave):
+        """
+        Remove todo o entulho de uma área.
+        """
+        area = self.areas.pop(chave)
+        area['node'].removeNode()
+        self.total_pecas -= area['pecas']
+        self.estatisticas['pecas_descartadas'] += area['pecas']
+        self._pendentes.discard(chave)
+
+    def limpar(self):
+        """
+        Remove todo o entulho.
+        """
+        for chave in list(self.areas):
+            self._remover_area(chave)
+        self.total_pecas = 0
+
+    def stats(self):
+        """
+        Retorna estatísticas do entulho.
+
+        Returns:
+            Dicionário com áreas, peças e nós de geometria atuais.
+        """
+        return dict(
+            self.estatisticas,
+            areas=len(self.areas),
+            pecas=self.total_pecas,
+            nos_geometria=self.node.findAllMatches('**/+GeomNode').getNumPaths()
+        )
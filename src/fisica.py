@@ -5,11 +5,19 @@ Sistema de física para o jogo Gorillas 3D War.
 Gerencia a interação física entre objetos, explosões e o ambiente.
 """
 
-from panda3d.core import NodePath, LVector3, LPoint3, BitMask32
+from panda3d.core import NodePath, LVector3, LPoint3, BitMask32, loadPrcFileData
+from direct.showbase.DirectObject import DirectObject
 from panda3d.bullet import BulletWorld, BulletRigidBodyNode, BulletSphereShape
-from panda3d.bullet import BulletBoxShape, BulletCylinderShape, BulletDebugNode
+from panda3d.bullet import BulletDebugNode
+from panda3d.bullet import BulletGhostNode
 import math
 import random
+import threading
+import time
+from src.modelos import obter_biblioteca
+from src.registro_corpos import RegistroCorpos
+from src.entulho import GerenciadorEntulho
+from src.formas import CacheFormas
 
 class SistemaFisica:
     """
@@ -17,19 +25,72 @@ class SistemaFisica:
     Utiliza o sistema Bullet Physics do Panda3D.
     """
     
-    def __init__(self, game):
+    def __init__(self, game, taxa_fisica=120.0, max_subpassos=8, orcamento_ms=4.0,
+                 intervalo_assentamento=0.5, max_pecas_entulho=600, usar_thread=False):
         """
         Inicializa o sistema de física.
         
         Args:
             game: Referência ao objeto principal do jogo.
+            taxa_fisica: Frequência fixa da simulação (passos por segundo).
+            max_subpassos: Número máximo de passos simulados por frame.
+            orcamento_ms: Tempo máximo de física por frame; limita os
+                          subpassos conforme o custo medido de cada passo.
+            intervalo_assentamento: Intervalo (segundos) entre as buscas por
+                                    fragmentos parados para virar entulho.
+            max_pecas_entulho: Limite de peças mantidas como entulho estático.
+            usar_thread: Se True, o Bullet avança em uma task chain própria
+                         (outra thread) e as transformações chegam à cena
+                         por um buffer duplo (ver _publicar_transformacoes).
         """
         self.game = game
         
+        # Passo fixo da simulação
+        self.passo_fisica = 1.0 / taxa_fisica
+        self.max_subpassos = max_subpassos
+        self.orcamento_ms = orcamento_ms
+        
+        # Estatísticas de custo da simulação
+        self.estatisticas = {
+            'passos_ultimo_quadro': 0,
+            'tempo_ultimo_quadro_ms': 0.0,
+            'tempo_medio_passo_ms': 0.0,
+            'subpassos_permitidos': max_subpassos,
+            'tempo_descartado': 0.0,
+            'total_passos': 0,
+            'contatos_iniciados': 0,
+            'contatos_terminados': 0
+        }
+        
+        # O Bullet só gera eventos de início/fim de contato com esta opção,
+        # que precisa estar ativa antes de criar o mundo
+        loadPrcFileData("", "bullet-enable-contact-events true")
+        
         # Cria o mundo de física
         self.mundo_fisica = BulletWorld()
         self.mundo_fisica.setGravity(LVector3(0, 0, -9.81))  # Gravidade padrão
         
+        # Raiz dos corpos dinâmicos. No modo com thread os corpos ficam fora
+        # da cena e a cena recebe cópias das suas transformações
+        self.usar_thread = usar_thread
+        if usar_thread:
+            self.raiz_corpos = NodePath('raiz_simulacao')
+        else:
+            self.raiz_corpos = self.game.render
+        
+        # Corpos com espelho visual na cena: nó do Bullet -> (nó do Bullet,
+        # espelho, se o espelho pertence ao sistema de física)
+        self._espelhos = {}
+        self._trava_espelhos = threading.Lock()
+        
+        # Buffer duplo de transformações: a thread da física preenche um
+        # buffer novo a cada frame e a thread principal aplica o último pronto
+        self._buffer_pronto = None
+        self._tarefa_thread = None
+        
+        # Tempo de jogo ainda não simulado pela thread da física
+        self._dt_pendente = 0.0
+        
         # Nó para visualização de depuração da física (quando ativado)
         self.debug_node = self.game.render.attachNewNode(BulletDebugNode('Debug'))
         self.debug_node.node().showWireframe(True)
@@ -48,11 +109,40 @@ class SistemaFisica:
             'objetos_destrutiveis': BitMask32.bit(5)
         }
         
-        # Lista de corpos físicos
-        self.corpos_fisicos = []
+        # Formas de colisão compartilhadas entre corpos de tamanho parecido
+        self.formas = CacheFormas()
+        
+        # Registro dos corpos físicos (por ID, nó, tag, categoria e expiração)
+        self.registro = RegistroCorpos()
         
-        # Lista de corpos temporários (como fragmentos de explosão)
-        self.corpos_temporarios = []
+        # Relógio da física, usado nos prazos de expiração dos corpos
+        self.tempo = 0.0
+        
+        # Sonda esférica de raio 1 para consultas pelo broadphase do Bullet;
+        # só entra no mundo durante a consulta
+        self._sonda = BulletGhostNode('sonda_consulta')
+        self._sonda.addShape(BulletSphereShape(1.0))
+        self._sonda.setIntoCollideMask(BitMask32.allOn())
+        self._sonda_np = self.raiz_corpos.attachNewNode(self._sonda)
+        
+        # Fragmentos que param (o Bullet os desativa) viram entulho estático
+        self.entulho = GerenciadorEntulho(game, max_pecas=max_pecas_entulho)
+        self.intervalo_assentamento = intervalo_assentamento
+        self._tempo_assentamento = 0.0
+        
+        # Fragmentos ainda em movimento ao fim do tempo de vida viram entulho
+        # assim que estiverem abaixo desta velocidade em duas buscas seguidas
+        # (só uma busca pegaria o topo de um salto); os que nunca param são
+        # descartados no prazo de segurança
+        self.velocidade_assentamento = 1.0
+        self.tempo_maximo_fragmentos = 30.0
+        
+        # Tempo parado até o Bullet desativar um fragmento (o padrão é 2 s)
+        self.tempo_desativacao_fragmentos = 0.5
+        
+        # Amortecimento angular depois do tempo de vida: faz o papel do atrito
+        # de rolamento, que o Bullet não aplica a esferas e cilindros
+        self.amortecimento_assentamento = 0.9
         
         # Objetos afetados por explosões recentes
         self.objetos_afetados = set()
@@ -66,8 +156,24 @@ class SistemaFisica:
         # Configurações de resposta a colisões
         self.coeficiente_restituicao = 0.3  # Elasticidade das colisões
         
-        # Callbacks para eventos de colisão
-        self.callbacks_colisao = []
+        # Assinaturas de eventos de contato (id -> dados)
+        self.assinaturas_contato = {}
+        self._proxima_assinatura = 0
+        
+        # Categorias cujos corpos avisam contatos ao Bullet
+        self._categorias_notificadas = set()
+        
+        # Contatos em andamento: par de IDs de corpos -> número de manifolds
+        self._contatos = {}
+        self._contatos_por_corpo = {}
+        
+        # Eventos de contato emitidos pelo Bullet
+        self._eventos = DirectObject()
+        self._eventos.accept('bullet-contact-added', self._contato_adicionado)
+        self._eventos.accept('bullet-contact-destroyed', self._contato_destruido)
+        
+        if usar_thread:
+            self._iniciar_thread()
     
     def atualizar(self, dt):
         """
@@ -76,55 +182,365 @@ class SistemaFisica:
         Args:
             dt: Delta time (tempo desde o último frame).
         """
-        # Atualiza a simulação de física
-        self.mundo_fisica.doPhysics(dt)
+        # Atualiza a simulação de física em passos fixos (no modo com thread
+        # a simulação já correu em paralelo; aqui só publica o resultado)
+        if self.usar_thread:
+            self._publicar_transformacoes()
+            with self._trava_espelhos:
+                self._dt_pendente += dt
+        else:
+            self._simular(dt)
+        
+        # Remove os corpos temporários expirados
+        self.tempo += dt
+        self._remover_corpos_expirados()
+        
+        # Converte periodicamente os fragmentos parados em entulho
+        self._tempo_assentamento += dt
+        if self._tempo_assentamento >= self.intervalo_assentamento:
+            self._tempo_assentamento = 0.0
+            self._assentar_fragmentos()
+    
+    def _iniciar_thread(self):
+        """
+        Cria a task chain da física e inicia a tarefa de simulação.
+        
+        A chain tem uma única thread sincronizada com o frame: cada frame
+        da thread principal corresponde a um avanço da simulação, feito em
+        paralelo com o cull/draw e a lógica do jogo. As chamadas ao Bullet
+        são protegidas pela trava global do módulo bullet do Panda3D.
+        """
+        task_mgr = self.game.taskMgr
+        task_mgr.setupTaskChain('fisica', numThreads=1, frameSync=True)
+        self._tarefa_thread = task_mgr.add(
+            self._tarefa_simulacao, 'simulacao_fisica', taskChain='fisica'
+        )
+    
+    def encerrar(self):
+        """
+        Para a thread da física (se houver) e remove todos os corpos.
+        """
+        if self._tarefa_thread is not None:
+            self.game.taskMgr.remove(self._tarefa_thread)
+            self._tarefa_thread = None
+        self.remover_todos_corpos()
+    
+    def _tarefa_simulacao(self, task):
+        """
+        Tarefa da thread da física: avança a simulação e preenche um buffer
+        novo com as transformações dos corpos espelhados.
+        """
+        with self._trava_espelhos:
+            dt = self._dt_pendente
+            self._dt_pendente = 0.0
+        self._simular(dt)
         
-        # Atualiza corpos temporários e remove os expirados
-        self._atualizar_corpos_temporarios(dt)
+        with self._trava_espelhos:
+            pares = list(self._espelhos.values())
         
-        # Processa colisões pendentes
-        self._processar_colisoes()
+        # TransformState é imutável: o buffer é uma foto consistente. Lê do
+        # PandaNode, que continua válido mesmo se o corpo for removido agora
+        buffer = [(espelho, corpo_node.getTransform()) for corpo_node, espelho, _ in pares]
+        
+        with self._trava_espelhos:
+            self._buffer_pronto = buffer
+        return task.cont
+    
+    def _publicar_transformacoes(self):
+        """
+        Ponto de sincronização: aplica na cena o último buffer completo da
+        thread da física. A cena nunca vê um passo pela metade.
+        """
+        with self._trava_espelhos:
+            buffer = self._buffer_pronto
+            self._buffer_pronto = None
+        
+        if buffer is None:
+            return
+        
+        render = self.game.render
+        for espelho, transformacao in buffer:
+            # Corpos removidos depois da foto deixam o espelho vazio
+            if not espelho.isEmpty():
+                espelho.setTransform(render, transformacao)
     
-    def _atualizar_corpos_temporarios(self, dt):
+    def _simular(self, dt):
         """
-        Atualiza corpos temporários e remove os expirados.
+        Avança a simulação em passos fixos de passo_fisica segundos.
+        
+        O Bullet acumula o tempo que não completa um passo e interpola as
+        transformações visuais entre os dois últimos estados, então os
+        objetos se movem suavemente mesmo com frames de duração irregular.
+        Picos de frame são limitados ao número de subpassos que cabe no
+        orçamento de tempo; o excedente é descartado (a simulação fica em
+        câmera lenta em vez de dar passos enormes).
         
         Args:
             dt: Delta time (tempo desde o último frame).
         """
-        # Atualiza e remove corpos temporários expirados
-        for corpo in list(self.corpos_temporarios):
-            corpo['tempo_vida'] -= dt
+        stats = self.estatisticas
+        
+        # Subpassos que cabem no orçamento, pelo custo médio medido
+        subpassos = self.max_subpassos
+        if stats['tempo_medio_passo_ms'] > 0.0:
+            cabem = int(self.orcamento_ms / stats['tempo_medio_passo_ms'])
+            subpassos = max(1, min(self.max_subpassos, cabem))
+        stats['subpassos_permitidos'] = subpassos
+        
+        # Descarta o tempo que não cabe nos subpassos permitidos
+        limite = subpassos * self.passo_fisica
+        if dt > limite:
+            stats['tempo_descartado'] += dt - limite
+            dt = limite
+        
+        inicio = time.perf_counter()
+        passos = self.mundo_fisica.doPhysics(dt, subpassos, self.passo_fisica)
+        tempo_ms = (time.perf_counter() - inicio) * 1000.0
+        
+        stats['passos_ultimo_quadro'] = passos
+        stats['tempo_ultimo_quadro_ms'] = tempo_ms
+        stats['total_passos'] += passos
+        if passos > 0:
+            # Média móvel do custo de um passo
+            custo = tempo_ms / passos
+            if stats['tempo_medio_passo_ms'] == 0.0:
+                stats['tempo_medio_passo_ms'] = custo
+            else:
+                stats['tempo_medio_passo_ms'] = stats['tempo_medio_passo_ms'] * 0.9 + custo * 0.1
+    
+    def _remover_corpos_expirados(self):
+        """
+        Remove os corpos temporários cujo tempo de vida terminou.
+        Apenas os corpos vencidos são visitados.
+        """
+        for corpo in self.registro.retirar_vencidos(self.tempo):
+            self._descartar_corpo(corpo)
+    
+    def _assentar_fragmentos(self):
+        """
+        Tira do mundo dinâmico os fragmentos que o Bullet desativou (parados)
+        e funde sua geometria no entulho estático da área. Depois do tempo de
+        vida, os que continuam rolando devagar também viram entulho.
+        """
+        assentados = 0
+        for corpo in self.registro.com_tag('fragmento'):
+            node_path = corpo['node']
+            node = node_path.node()
+            if node.isActive():
+                if self.tempo < corpo['assentar_em']:
+                    continue
+                if 'lento' not in corpo:
+                    node.setAngularDamping(self.amortecimento_assentamento)
+                lento = node.getLinearVelocity().length() < self.velocidade_assentamento
+                anterior = corpo.get('lento', False)
+                corpo['lento'] = lento
+                if not (lento and anterior):
+                    continue
             
-            # Remove corpos expirados
-            if corpo['tempo_vida'] <= 0:
-                self._remover_corpo_fisico(corpo['node'])
-                self.corpos_temporarios.remove(corpo)
+            for visual in self._node_visual(node_path).getChildren():
+                self.entulho.adicionar(visual)
+            self.registro.remover(corpo['id'])
+            self._descartar_corpo(corpo)
+            assentados += 1
+        
+        if assentados:
+            self.entulho.achatar_pendentes()
+    
+    def assinar_contato(self, categorias_a, categorias_b, ao_iniciar=None, ao_terminar=None):
+        """
+        Assina os eventos de início e fim de contato entre duas categorias.
+        
+        Cada par de corpos gera um único início quando passa a se tocar e um
+        único fim quando se separa (ou um deles é removido); contatos que
+        continuam de um frame para o outro não geram nada.
+        
+        Args:
+            categorias_a: Nome de categoria ou lista de nomes.
+            categorias_b: Nome de categoria ou lista de nomes.
+            ao_iniciar: Função chamada com (corpo_a, corpo_b) no início do
+                        contato, com corpo_a sempre do lado categorias_a.
+            ao_terminar: Função chamada com (corpo_a, corpo_b) no fim do contato.
+        
+        Returns:
+            ID da assinatura.
+        """
+        mascara_a = self._mascara_categorias(categorias_a)
+        mascara_b = self._mascara_categorias(categorias_b)
+        
+        id_assinatura = self._proxima_assinatura
+        self._proxima_assinatura += 1
+        self.assinaturas_contato[id_assinatura] = {
+            'mascara_a': mascara_a,
+            'mascara_b': mascara_b,
+            'ao_iniciar': ao_iniciar,
+            'ao_terminar': ao_terminar
+        }
+        
+        # Passa a notificar contatos dos corpos das categorias envolvidas
+        for categoria, mascara in self.categorias.items():
+            if categoria in self._categorias_notificadas:
+                continue
+            if not (mascara & (mascara_a | mascara_b)).isZero():
+                self._categorias_notificadas.add(categoria)
+                for corpo in self.registro.da_categoria(categoria):
+                    corpo['node'].node().notifyCollisions(True)
+        
+        return id_assinatura
+    
+    def cancelar_contato(self, id_assinatura):
+        """
+        Cancela uma assinatura de eventos de contato.
+        
+        Args:
+            id_assinatura: ID retornado por assinar_contato.
+        """
+        self.assinaturas_contato.pop(id_assinatura, None)
+    
+    def _mascara_categorias(self, categorias):
+        """
+        Converte um nome de categoria ou lista de nomes em uma máscara.
+        """
+        if isinstance(categorias, str):
+            categorias = [categorias]
+        
+        mascara = BitMask32(0)
+        for categoria in categorias:
+            mascara |= self.categorias[categoria]
+        return mascara
+    
+    def _par_contato(self, node0, node1):
+        """
+        Retorna os registros e a chave do par de corpos de um evento, ou None
+        se algum deles não estiver no registro.
+        """
+        corpo0 = self.registro.obter_por_node(node0)
+        corpo1 = self.registro.obter_por_node(node1)
+        if corpo0 is None or corpo1 is None:
+            return None
+        
+        if corpo0['id'] > corpo1['id']:
+            corpo0, corpo1 = corpo1, corpo0
+        return (corpo0['id'], corpo1['id']), corpo0, corpo1
     
-    def _processar_colisoes(self):
+    def _contato_adicionado(self, node0, node1):
         """
-        Processa as colisões que ocorreram no último frame.
+        Evento do Bullet: um manifold de contato foi criado.
         """
-        # Obtém o manifold de colisões
-        for contato in self.mundo_fisica.getContactManifolds():
-            node0 = contato.getNode0()
-            node1 = contato.getNode1()
+        par = self._par_contato(node0, node1)
+        if par is None:
+            return
+        chave, corpo0, corpo1 = par
+        
+        # Um par pode ter vários manifolds (formas compostas); só o primeiro
+        # inicia o contato
+        contagem = self._contatos.get(chave, 0)
+        self._contatos[chave] = contagem + 1
+        if contagem > 0:
+            return
+        
+        for id_corpo in chave:
+            self._contatos_por_corpo.setdefault(id_corpo, set()).add(chave)
+        
+        self.estatisticas['contatos_iniciados'] += 1
+        self._emitir_contato('ao_iniciar', corpo0, corpo1)
+    
+    def _contato_destruido(self, node0, node1):
+        """
+        Evento do Bullet: um manifold de contato foi destruído.
+        """
+        par = self._par_contato(node0, node1)
+        if par is None:
+            return
+        chave, corpo0, corpo1 = par
+        
+        contagem = self._contatos.get(chave)
+        if contagem is None:
+            return
+        if contagem > 1:
+            self._contatos[chave] = contagem - 1
+            return
+        
+        self._encerrar_contato(chave, corpo0, corpo1)
+    
+    def _encerrar_contato(self, chave, corpo0, corpo1):
+        """
+        Remove um par dos contatos em andamento e emite o fim do contato.
+        """
+        del self._contatos[chave]
+        for id_corpo in chave:
+            pares = self._contatos_por_corpo.get(id_corpo)
+            if pares is not None:
+                pares.discard(chave)
+                if not pares:
+                    del self._contatos_por_corpo[id_corpo]
+        
+        self.estatisticas['contatos_terminados'] += 1
+        if corpo0 is not None and corpo1 is not None:
+            self._emitir_contato('ao_terminar', corpo0, corpo1)
+    
+    def _encerrar_contatos_do_corpo(self, corpo):
+        """
+        Encerra os contatos em andamento de um corpo que está saindo do mundo.
+        """
+        for chave in list(self._contatos_por_corpo.get(corpo['id'], ())):
+            if chave[0] == corpo['id']:
+                self._encerrar_contato(chave, corpo, self.registro.obter(chave[1]))
+            else:
+                self._encerrar_contato(chave, self.registro.obter(chave[0]), corpo)
+    
+    def _emitir_contato(self, evento, corpo0, corpo1):
+        """
+        Chama as assinaturas cujas categorias correspondem ao par de corpos.
+        """
+        if corpo0['categoria'] is None or corpo1['categoria'] is None:
+            return
+        mascara0 = self.categorias[corpo0['categoria']]
+        mascara1 = self.categorias[corpo1['categoria']]
+        
+        for assinatura in list(self.assinaturas_contato.values()):
+            callback = assinatura[evento]
+            if callback is None:
+                continue
             
-            # Verifica se há pontos de contato
-            if contato.getNumManifoldPoints() > 0:
-                # Obtém informações do primeiro ponto de contato
-                ponto = contato.getManifoldPoint(0)
-                posicao = ponto.getPositionWorldOnB()
-                normal = ponto.getNormalWorldOnB()
-                impulso = ponto.getAppliedImpulse()
-                
-                # Dispara callbacks de colisão
-                for callback in self.callbacks_colisao:
-                    callback(node0, node1, posicao, normal, impulso)
+            a, b = assinatura['mascara_a'], assinatura['mascara_b']
+            if not (a & mascara0).isZero() and not (b & mascara1).isZero():
+                callback(corpo0, corpo1)
+            elif not (a & mascara1).isZero() and not (b & mascara0).isZero():
+                callback(corpo1, corpo0)
+    
+    def consultar_esfera(self, posicao, raio):
+        """
+        Retorna os corpos cujas formas tocam uma esfera, usando o broadphase
+        do Bullet em vez de percorrer todos os corpos.
+        
+        Args:
+            posicao: Centro da esfera (LPoint3).
+            raio: Raio da esfera.
+        
+        Returns:
+            Lista com os registros (dicionários) dos corpos encontrados.
+        """
+        self._sonda_np.setPos(posicao)
+        self._sonda_np.setScale(max(raio, 0.001))
+        
+        self.mundo_fisica.attachGhost(self._sonda)
+        resultado = self.mundo_fisica.contactTest(self._sonda, True)
+        self.mundo_fisica.removeGhost(self._sonda)
+        
+        encontrados = {}
+        for contato in resultado.getContacts():
+            for node in (contato.getNode0(), contato.getNode1()):
+                corpo = self.registro.obter_por_node(node)
+                if corpo is not None:
+                    encontrados[corpo['id']] = corpo
+        
+        return list(encontrados.values())
     
     def aplicar_forca_explosao(self, posicao, raio, forca, afetar_predios=True):
         """
         Aplica força radial de explosão a todos os objetos físicos dentro do raio.
+        Apenas os corpos encontrados pelo broadphase do Bullet são
+        examinados, então o custo depende da densidade local de corpos.
         
         Args:
             posicao: Posição da explosão (LPoint3).
@@ -140,8 +556,8 @@ class SistemaFisica:
         # Limita o raio ao máximo configurado
         raio_efetivo = min(raio, self.distancia_maxima_explosao)
         
-        # Verifica cada corpo físico
-        for corpo in self.corpos_fisicos:
+        # Verifica apenas os corpos que tocam a esfera da explosão
+        for corpo in self.consultar_esfera(posicao, raio_efetivo):
             node = corpo['node']
             
             # Pula prédios se não for para afetá-los
@@ -149,9 +565,9 @@ class SistemaFisica:
                 continue
             
             # Pula objetos estáticos
-            if not node.isStatic():
+            if not node.node().isStatic():
                 # Calcula a distância
-                pos_obj = node.getPos(self.game.render)
+                pos_obj = node.getPos(self.raiz_corpos)
                 vetor = pos_obj - posicao
                 distancia = vetor.length()
                 
@@ -176,7 +592,8 @@ class SistemaFisica:
                     direcao.z += 0.5
                     direcao.normalize()
                     
-                    # Aplica impulso ao corpo
+                    # Aplica impulso ao corpo (acordando-o se estiver dormindo)
+                    node.node().setActive(True)
                     node.node().applyImpulse(direcao * forca_aplicada, LPoint3(0, 0, 0))
                     
                     # Adiciona torque aleatório para girar o objeto
@@ -209,7 +626,9 @@ class SistemaFisica:
             num_fragmentos: Número de fragmentos a criar.
             forca: Força da explosão.
             escala_fragmentos: Escala dos fragmentos.
-            tempo_vida: Tempo de vida dos fragmentos em segundos.
+            tempo_vida: Tempo (segundos) depois do qual os fragmentos que
+                        ainda rolam devagar viram entulho; os que o Bullet
+                        desativa antes viram entulho na hora.
         
         Returns:
             Lista de nodes dos fragmentos criados.
@@ -220,16 +639,21 @@ class SistemaFisica:
             # Cria forma física baseada no tipo de fragmento
             tipo_forma = random.choice(['box', 'sphere', 'cylinder'])
             
+            # Escala aleatória; vai nas dimensões da forma (compartilhada) e
+            # no modelo visual, nunca no nó do corpo
+            variacao_escala = random.uniform(0.8, 1.2)
+            escala = escala_fragmentos * variacao_escala
+            
             if tipo_forma == 'box':
-                tamanho = random.uniform(0.1, 0.3) * escala_fragmentos
-                forma = BulletBoxShape(LVector3(tamanho, tamanho, tamanho))
+                tamanho = random.uniform(0.1, 0.3) * escala_fragmentos * escala
+                forma = self.formas.caixa((tamanho, tamanho, tamanho))
             elif tipo_forma == 'sphere':
-                raio = random.uniform(0.1, 0.25) * escala_fragmentos
-                forma = BulletSphereShape(raio)
+                raio = random.uniform(0.1, 0.25) * escala_fragmentos * escala
+                forma = self.formas.esfera(raio)
             else:  # cylinder
-                raio = random.uniform(0.1, 0.2) * escala_fragmentos
-                altura = random.uniform(0.2, 0.4) * escala_fragmentos
-                forma = BulletCylinderShape(raio, altura, 1)  # 1 = eixo Z
+                raio = random.uniform(0.1, 0.2) * escala_fragmentos * escala
+                altura = random.uniform(0.2, 0.4) * escala_fragmentos * escala
+                forma = self.formas.cilindro(raio, altura)
             
             # Cria nó físico
             corpo_node = BulletRigidBodyNode(f'fragmento_{i}')
@@ -245,12 +669,22 @@ class SistemaFisica:
             # Define atrito
             corpo_node.setFriction(0.8)
             
-            # Define categorias de colisão
-            corpo_node.setIntoCollideMask(self.categorias['fragmentos'])
-            corpo_node.setFromCollideMask(self.categorias['terreno'] | self.categorias['predios'])
+            # Amortecimento e limiares de repouso mais altos fazem o fragmento
+            # parar (e virar entulho) mais cedo
+            corpo_node.setLinearDamping(0.1)
+            corpo_node.setAngularDamping(0.3)
+            corpo_node.setLinearSleepThreshold(0.3)
+            corpo_node.setAngularSleepThreshold(0.5)
+            corpo_node.setDeactivationTime(self.tempo_desativacao_fragmentos)
+            
+            # Define categorias de colisão (o Bullet só tem máscara "into": dois
+            # corpos colidem quando as máscaras se cruzam)
+            corpo_node.setIntoCollideMask(
+                self.categorias['fragmentos'] | self.categorias['terreno'] | self.categorias['predios']
+            )
             
-            # Cria e posiciona o node visual
-            fragmento_np = self.game.render.attachNewNode(corpo_node)
+            # Cria e posiciona o node do corpo
+            fragmento_np = self.raiz_corpos.attachNewNode(corpo_node)
             fragmento_np.setPos(posicao)
             
             # Adiciona variação à posição
@@ -268,13 +702,16 @@ class SistemaFisica:
                 random.uniform(0, 360)
             )
             
-            # Escala aleatória
-            variacao_escala = random.uniform(0.8, 1.2)
-            fragmento_np.setScale(escala_fragmentos * variacao_escala)
+            # No modo com thread o modelo fica em um espelho na cena
+            visual_np = fragmento_np
+            if self.usar_thread:
+                visual_np = self.game.render.attachNewNode(f'fragmento_{i}')
+                visual_np.setTransform(fragmento_np.getTransform())
+                self._espelhar(fragmento_np, visual_np, proprio=True)
             
-            # Copia o modelo para o fragmento
-            modelo_fragmento = self.game.loader.loadModel(modelo)
-            modelo_fragmento.reparentTo(fragmento_np)
+            # Instancia o modelo compartilhado para o fragmento
+            modelo_fragmento = obter_biblioteca(self.game).instanciar(modelo, visual_np)
+            modelo_fragmento.setScale(escala)
             
             # Aplica materiais aleatórios (cor e textura)
             r, g, b = random.uniform(0.3, 0.8), random.uniform(0.3, 0.7), random.uniform(0.3, 0.6)
@@ -301,23 +738,19 @@ class SistemaFisica:
             )
             corpo_node.applyTorqueImpulse(torque)
             
-            # Adiciona à lista de fragmentos e corpos temporários
+            # Adiciona à lista de fragmentos
             fragmentos.append(fragmento_np)
             
-            # Adiciona aos corpos temporários para remoção automática
-            self.corpos_temporarios.append({
-                'node': fragmento_np,
-                'tempo_vida': tempo_vida,
-                'tempo_inicial': tempo_vida,
-                'tipo': 'fragmento'
-            })
-            
-            # Adiciona à lista geral de corpos
-            self.corpos_fisicos.append({
-                'node': fragmento_np,
-                'tags': ['fragmento', 'temporario'],
-                'nome': f'fragmento_{i}'
-            })
+            # Registra o corpo; sai do mundo ao virar entulho e só é removido
+            # por tempo se nunca parar (prazo de segurança)
+            corpo = self._registrar_corpo(
+                fragmento_np,
+                f'fragmento_{i}',
+                tags=['fragmento', 'temporario'],
+                categoria='fragmentos',
+                expira_em=self.tempo + max(tempo_vida, self.tempo_maximo_fragmentos)
+            )
+            corpo['assentar_em'] = self.tempo + tempo_vida
         
         return fragmentos
     
@@ -328,7 +761,9 @@ class SistemaFisica:
         Args:
             node_path: NodePath ao qual adicionar o corpo físico.
             massa: Massa do corpo (0 = estático).
-            forma: Forma física (BulletShape).
+            forma: Forma física (BulletShape) ou descrição para o cache de
+                   formas, como ('caixa', (x, y, z)), ('esfera', raio) ou
+                   ('cilindro', raio, altura).
             categoria: Categoria de colisão.
             nome: Nome para o corpo físico.
             tags: Lista de tags para categorizar o corpo.
@@ -340,6 +775,10 @@ class SistemaFisica:
         if tags is None:
             tags = []
         
+        # Descrições de forma usam a forma compartilhada do cache
+        if isinstance(forma, tuple):
+            forma = self.formas.obter(forma)
+        
         # Cria o nó para o corpo físico
         corpo_node = BulletRigidBodyNode(nome)
         corpo_node.addShape(forma)
@@ -353,59 +792,118 @@ class SistemaFisica:
         corpo_node.setRestitution(self.coeficiente_restituicao)
         corpo_node.setFriction(0.8)
         
-        # Define categorias de colisão
-        corpo_node.setIntoCollideMask(self.categorias[categoria])
-        
         # Define contra quais categorias colide
         mascara_colisao = BitMask32(0)
         for cat, mask in self.categorias.items():
             if cat != categoria:  # Não colide com objetos da mesma categoria
                 mascara_colisao |= mask
         
-        corpo_node.setFromCollideMask(mascara_colisao)
+        # Define categorias de colisão (o Bullet só tem máscara "into": dois
+        # corpos colidem quando as máscaras se cruzam)
+        corpo_node.setIntoCollideMask(self.categorias[categoria] | mascara_colisao)
         
         # Cria o NodePath para o corpo físico
-        corpo_np = node_path.attachNewNode(corpo_node)
-        corpo_np.setPos(0, 0, 0)  # Posição relativa ao nó pai
+        if self.usar_thread and not e_estatico:
+            # Corpo dinâmico fora da cena; o node_path passa a espelhá-lo
+            corpo_np = self.raiz_corpos.attachNewNode(corpo_node)
+            corpo_np.setTransform(node_path.getNetTransform())
+            self._espelhar(corpo_np, node_path, proprio=False)
+        else:
+            corpo_np = node_path.attachNewNode(corpo_node)
+            corpo_np.setPos(0, 0, 0)  # Posição relativa ao nó pai
         
         # Adiciona o corpo ao mundo físico
         self.mundo_fisica.attachRigidBody(corpo_node)
         
         # Registra o corpo
-        self.corpos_fisicos.append({
-            'node': corpo_np,
-            'tags': tags,
-            'nome': nome
-        })
+        self._registrar_corpo(corpo_np, nome, tags=tags, categoria=categoria)
         
         return corpo_np
     
+    def _espelhar(self, corpo_np, espelho, proprio):
+        """
+        Faz um nó da cena receber as transformações de um corpo simulado
+        na thread da física.
+        
+        Args:
+            corpo_np: NodePath do corpo (fora da cena).
+            espelho: NodePath na cena que acompanha o corpo.
+            proprio: Se True, o espelho é removido junto com o corpo.
+        """
+        with self._trava_espelhos:
+            self._espelhos[corpo_np.node()] = (corpo_np.node(), espelho, proprio)
+    
+    def _node_visual(self, corpo_np):
+        """
+        Retorna o nó da cena que mostra um corpo (o espelho, se houver).
+        """
+        espelhado = self._espelhos.get(corpo_np.node())
+        if espelhado is None:
+            return corpo_np
+        return espelhado[1]
+    
+    def _registrar_corpo(self, node_path, nome, tags, categoria, expira_em=None):
+        """
+        Registra um corpo já adicionado ao mundo físico.
+        
+        Args:
+            node_path: NodePath do corpo.
+            nome: Nome do corpo.
+            tags: Lista de tags do corpo.
+            categoria: Categoria de colisão do corpo.
+            expira_em: Instante de remoção automática, ou None.
+        
+        Returns:
+            Registro do corpo.
+        """
+        # Só corpos de categorias assinadas geram eventos de contato
+        if categoria in self._categorias_notificadas:
+            node_path.node().notifyCollisions(True)
+        
+        return self.registro.adicionar(
+            node_path, nome, tags=tags, categoria=categoria, expira_em=expira_em
+        )
+    
     def _remover_corpo_fisico(self, node_path):
         """
-        Remove um corpo físico do mundo e da lista.
+        Remove um corpo físico do mundo e do registro.
         
         Args:
             node_path: NodePath do corpo a remover.
         """
+        corpo = self.registro.obter_por_node(node_path.node())
+        if corpo is not None:
+            self.registro.remover(corpo['id'])
+            self._descartar_corpo(corpo)
+        else:
+            # Corpo que não está no registro: remove apenas do mundo e da cena
+            self._descartar_corpo({'node': node_path})
+    
+    def _descartar_corpo(self, corpo):
+        """
+        Retira do mundo físico e da cena um corpo que já saiu do registro.
+        
+        Args:
+            corpo: Registro do corpo.
+        """
+        node_path = corpo['node']
+        
+        # Encerra os contatos em andamento antes que o Bullet perca o corpo
+        if 'id' in corpo:
+            self._encerrar_contatos_do_corpo(corpo)
+        
         # Remove do mundo físico
         if node_path.node() and isinstance(node_path.node(), BulletRigidBodyNode):
             self.mundo_fisica.removeRigidBody(node_path.node())
         
-        # Remove da lista de corpos
-        for corpo in list(self.corpos_fisicos):
-            if corpo['node'] == node_path:
-                self.corpos_fisicos.remove(corpo)
-                break
-        
-        # Remove da lista de corpos temporários
-        for corpo in list(self.corpos_temporarios):
-            if corpo['node'] == node_path:
-                self.corpos_temporarios.remove(corpo)
-                break
-        
         # Remove da lista de objetos afetados
-        if node_path in self.objetos_afetados:
-            self.objetos_afetados.remove(node_path)
+        self.objetos_afetados.discard(node_path)
+        
+        # Remove o espelho visual, se for do sistema de física
+        with self._trava_espelhos:
+            espelhado = self._espelhos.pop(node_path.node(), None)
+        if espelhado is not None and espelhado[2]:
+            espelhado[1].removeNode()
         
         # Remove o NodePath
         node_path.removeNode()
@@ -414,25 +912,14 @@ class SistemaFisica:
         """
         Remove todos os corpos físicos.
         """
-        # Remove todos os corpos do mundo físico
-        for corpo in list(self.corpos_fisicos):
-            self._remover_corpo_fisico(corpo['node'])
+        for corpo in self.registro:
+            self._descartar_corpo(corpo)
         
-        # Limpa as listas
-        self.corpos_fisicos = []
-        self.corpos_temporarios = []
+        self.registro.limpar()
+        self._contatos.clear()
+        self._contatos_por_corpo.clear()
         self.objetos_afetados.clear()
-    
-    def registrar_callback_colisao(self, callback):
-        """
-        Registra um callback para eventos de colisão.
-        
-        Args:
-            callback: Função a ser chamada quando ocorrer uma colisão.
-                     Deve aceitar os parâmetros: node1, node2, posicao, normal, impulso
-        """
-        if callback not in self.callbacks_colisao:
-            self.callbacks_colisao.append(callback)
+        self.entulho.limpar()
     
     def ativar_depuracao(self, ativo=True):
         """
@@ -466,7 +953,7 @@ class SistemaFisica:
         self.coeficiente_restituicao = max(0.0, min(1.0, valor))
         
         # Atualiza corpos existentes
-        for corpo in self.corpos_fisicos:
+        for corpo in self.registro:
             node = corpo['node']
             if isinstance(node.node(), BulletRigidBodyNode):
                 node.node().setRestitution(self.coeficiente_restituicao)
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Gorillas 3D War - Cache de formas de colisão
+Compartilha as formas do Bullet entre corpos de dimensões parecidas.
+"""
+import math
+from panda3d.core import LVector3
+from panda3d.bullet import BulletSphereShape, BulletBoxShape, BulletCylinderShape, ZUp
+
+
+class CacheFormas:
+    """
+    Cache de formas de colisão do Bullet.
+
+    As dimensões são quantizadas em escala logarítmica (um número fixo de
+    degraus a cada dobro de tamanho), de modo que o erro relativo é o mesmo
+    para peças pequenas e grandes. Corpos com dimensões no mesmo degrau
+    recebem a mesma forma.
+
+    O Panda3D repassa a escala do nó do corpo para as suas formas, então um
+    corpo com forma compartilhada não deve ter escala própria: a variação de
+    tamanho fica na quantização e a escala visual vai no modelo filho.
+    """
+
+    def __init__(self, degraus_por_oitava=8):
+        """
+        Inicializa o cache.
+
+        Args:
+            degraus_por_oitava: Degraus de quantização a cada dobro de
+                                tamanho (8 dá erro máximo de ~4.5%).
+        """
+        self.degraus_por_oitava = degraus_por_oitava
+
+        # Formas por chave (tipo, dimensões quantizadas)
+        self.formas = {}
+
+        # Contadores de uso
+        self.consultas = 0
+        self.acertos = 0
+
+    def _quantizar(self, valor):
+        """
+        Retorna o degrau de quantização de uma dimensão.
+        """
+        return round(math.log2(max(valor, 1e-4)) * self.degraus_por_oitava)
+
+    def _dimensao(self, degrau):
+        """
+        Retorna a dimensão representada por um degrau.
+        """
+        return 2.0 ** (degrau / self.degraus_por_oitava)
+
+    def _obter(self, chave, criar):
+        """
+        Retorna a forma de uma chave, criando-a na primeira consulta.
+        """
+        self.consultas += 1
+        forma = self.formas.get(chave)
+        if forma is not None:
+            self.acertos += 1
+            return forma
+
+        forma = criar()
+        self.formas[chave] = forma
+        return forma
+
+    def esfera(self, raio):
+        """
+        Retorna uma esfera compartilhada.
+
+        Args:
+            raio: Raio da esfera.
+        """
+        q = self._quantizar(raio)
+        return self._obter(('esfera', q), lambda: BulletSphereShape(self._dimensao(q)))
+
+    def caixa(self, meias_dimensoes):
+        """
+        Retorna uma caixa compartilhada.
+
+        Args:
+            meias_dimensoes: Metades das dimensões (x, y, z) da caixa.
+        """
+        q = tuple(self._quantizar(v) for v in meias_dimensoes)
+        return self._obter(
+            ('caixa', q),
+            lambda: BulletBoxShape(LVector3(*(self._dimensao(v) for v in q)))
+        )
+
+    def cilindro(self, raio, altura):
+        """
+        Retorna um cilindro compartilhado ao longo do eixo Z.
+
+        Args:
+            raio: Raio do cilindro.
+            altura: Altura do cilindro.
+        """
+        q = (self._quantizar(raio), self._quantizar(altura))
+        return self._obter(
+            ('cilindro', q),
+            lambda: BulletCylinderShape(self._dimensao(q[0]), self._dimensao(q[1]), ZUp)
+        )
+
+    def obter(self, descricao):
+        """
+        Retorna a forma descrita por uma tupla.
+
+        Args:
+            descricao: ('esfera', raio), ('caixa', (x, y, z)) ou
+                       ('cilindro', raio, altura).
+
+        Returns:
+            Forma do Bullet compartilhada.
+        """
+        tipo = descricao[0]
+        if tipo == 'esfera':
+            return self.esfera(descricao[1])
+        if tipo == 'caixa':
+            return self.caixa(descricao[1])
+        if tipo == 'cilindro':
+            return self.cilindro(descricao[1], descricao[2])
+        raise ValueError(f"Tipo de forma desconhecido: {tipo}")
+
+    def stats(self):
+        """
+        Retorna estatísticas do cache.
+
+        Returns:
+            Dicionário com o número de formas (total e por tipo), consultas
+            e taxa de acerto.
+        """
+        por_tipo = {}
+        for tipo, _ in self.formas:
+            por_tipo[tipo] = por_tipo.get(tipo, 0) + 1
+
+        return {
+            'formas': len(self.formas),
+            'formas_por_tipo': por_tipo,
+            'consultas': self.consultas,
+            'acertos': self.acertos,
+            'taxa_acerto': self.acertos / self.consultas if self.consultas else 0.0
+        }
+
+    def limpar(self):
+        """
+        Descarta as formas do cache (corpos existentes continuam com as suas).
+        """
+        self.formas.clear()
+        self.consultas = 0
+        self.acertos = 0
@@ -16,14 +16,18 @@ import math
 import random
 import numpy as np
 from src.city import CityGenerator
+from src.cidade_grande import CidadeGrande
 from src.gorilla import Gorilla
 from src.projectile import Banana
+from src.projeteis import GerenciadorProjeteis
+from src.ia import OponenteCPU
 from src.effects import ExplosionManager
 from src.camera import GameCamera
 from src.ui import GameUI
 from src.sound import SoundManager
 from src.weather import WeatherSystem
 from src.destruction import DestructionSystem
+from src.modelos import BibliotecaModelos
 
 class Gorillas3DWar(ShowBase):
     """
@@ -39,6 +43,9 @@ class Gorillas3DWar(ShowBase):
         # Inicializa a classe base ShowBase do Panda3D
         ShowBase.__init__(self)
         
+        # Biblioteca de modelos compartilhada por todos os subsistemas
+        self.modelos = BibliotecaModelos(self)
+        
         # Configurações da janela
         self.configurar_janela()
         
@@ -59,7 +66,7 @@ class Gorillas3DWar(ShowBase):
         
         # Gera a cidade
         self.gerador_cidade = CityGenerator(self)
-        self.cidade = self.gerador_cidade.gerar_cidade(7, 7)
+        self.cidade = self.gerador_cidade.gerar_cidade(*self.dimensoes_cidade)
         
         # Configura a câmera e controles
         self.camera_jogo = GameCamera(self)
@@ -95,6 +102,9 @@ class Gorillas3DWar(ShowBase):
         # Sistema de efeitos visuais
         self.efeitos = ExplosionManager(self)
         
+        # Níveis de detalhe da cidade seguem a qualidade dos efeitos
+        self.gerador_cidade.conectar_lod(self.efeitos.lod_manager)
+        
         # Sistema de clima
         self.clima = WeatherSystem(self)
         self.clima.configurar_clima('ensolarado', 0.0)  # Clima padrão inicial
@@ -102,8 +112,9 @@ class Gorillas3DWar(ShowBase):
         # Sistema de destruíção de cenário
         self.destruicao = DestructionSystem(self)
         
-        # Lista de projéteis ativos
+        # Lista de projéteis ativos e a física em lote de todos eles
         self.projeteis = []
+        self.gerenciador_projeteis = GerenciadorProjeteis(self)
         
         print("Sistemas do jogo inicializados")
         
@@ -184,13 +195,24 @@ class Gorillas3DWar(ShowBase):
         
         # Flag para controlar se o jogador pode atirar
         self.pode_atirar = True
+        
+        # Oponente controlado pelo computador (jogador 2), se houver
+        self.contra_cpu = False
+        self.oponente = None
+        
+        # Cidade (linhas e colunas de prédios) e modo de mapa grande, em que
+        # a cidade é gerada aos lotes conforme a câmera se move
+        self.dimensoes_cidade = (7, 7)
+        self.dimensoes_cidade_grande = (64, 64)
+        self.cidade_grande = False
 
     def criar_gorilas(self):
         """
         Cria os gorilas dos jogadores e os posiciona em prédios aleatórios.
         """
-        # Escolhe dois prédios separados para posicionar os gorilas
-        predios = self.gerador_cidade.predios
+        # Escolhe dois prédios separados para posicionar os gorilas, dentro
+        # da área de jogo da cidade
+        predios = self.gerador_cidade.predios_area_jogo()
         if len(predios) < 2:
             print("Erro: Não há prédios suficientes para posicionar os gorilas")
             return
@@ -257,7 +279,7 @@ class Gorillas3DWar(ShowBase):
             gorila.atualizar(dt)
             
         # Atualiza os projéteis
-        self.atualizar_projeteis()
+        self.atualizar_projeteis(dt)
         
         # Atualiza efeitos visuais
         self.efeitos.atualizar()
@@ -276,16 +298,22 @@ class Gorillas3DWar(ShowBase):
         
         return task.cont
         
-    def atualizar_projeteis(self):
+    def atualizar_projeteis(self, dt):
         """
         Atualiza todos os projéteis ativos no jogo.
+        
+        Args:
+            dt: Delta time (tempo desde o último frame).
         """
+        # Avança e testa as colisões de todos os projéteis de uma vez
+        self.gerenciador_projeteis.atualizar(dt, self.gravidade, self.vento)
+        
         # Lista de projéteis para remover após a iteração
         para_remover = []
         
         # Atualiza cada projétil
         for projetil in self.projeteis:
-            resultado = projetil.atualizar(self.gravidade, self.vento)
+            resultado = projetil.atualizar()
             
             # Verifica se o projétil colidiu ou saiu da tela
             if resultado == 'colisao' or resultado == 'fora_limites':
@@ -312,8 +340,11 @@ class Gorillas3DWar(ShowBase):
         indice_alvo = 1 - self.jogador_atual
         gorila_alvo = self.gorilas[indice_alvo]
         
+        # O impacto calculado no voo diz o que foi atingido
+        impacto = projetil.impacto or {'tipo': 'chao', 'objeto': None}
+        
         # Verifica se o projétil acertou o gorila alvo
-        if projetil.verificar_colisao_com(gorila_alvo.node):
+        if impacto['tipo'] == 'gorila' and impacto['objeto'] is gorila_alvo:
             # Cria uma explosão no ponto de impacto
             self.efeitos.criar_explosao(projetil.get_pos())
             
@@ -337,12 +368,9 @@ class Gorillas3DWar(ShowBase):
         posicao_impacto = projetil.get_pos()
         self.efeitos.criar_explosao(posicao_impacto)
         
-        # Verifica se acertou algum prédio
-        for predio in self.gerador_cidade.predios:
-            if projetil.verificar_colisao_com_predio(predio):
-                # Causa danos ao prédio
-                self.destruicao.criar_explosao_predio(posicao_impacto, 2.0, predio)
-                break
+        # Causa danos se acertou um prédio
+        if impacto['tipo'] == 'predio':
+            self.destruicao.criar_explosao_predio(posicao_impacto, 2.0, impacto['objeto'])
         
         # Troca o jogador se não acertou
         self.novo_turno(manter_jogador=False)
@@ -404,6 +432,71 @@ class Gorillas3DWar(ShowBase):
         # Atualiza a UI
         self.ui.atualizar_info_jogador()
         
+        # Vez do computador
+        self.verificar_turno_cpu()
+        
+    def novo_jogo(self, contra_cpu=False, dificuldade='medio', cidade_grande=False):
+        """
+        Inicia um novo jogo entre dois jogadores ou contra o computador.
+        
+        Args:
+            contra_cpu: Se True, o jogador 2 é controlado pelo computador.
+            dificuldade: Dificuldade do oponente ('facil', 'medio' ou 'dificil').
+            cidade_grande: Se True, joga no mapa grande.
+        """
+        if self.oponente is not None:
+            self.oponente.cancelar()
+        self.contra_cpu = contra_cpu
+        self.oponente = OponenteCPU(self, dificuldade) if contra_cpu else None
+        
+        # Troca o gerador de cidade se o modo de mapa mudou
+        if cidade_grande != self.cidade_grande:
+            self.gerador_cidade.destruir()
+            self.gerador_cidade = CidadeGrande(self) if cidade_grande else CityGenerator(self)
+            self.gerador_cidade.conectar_lod(self.efeitos.lod_manager)
+            self.cidade_grande = cidade_grande
+        self.iniciar_jogo()
+        
+    def verificar_turno_cpu(self):
+        """
+        Se for a vez do computador, planeja o tiro e bloqueia a entrada do
+        jogador até o disparo.
+        """
+        if not self.contra_cpu or self.jogador_atual != 1 or self.estado_jogo != 'jogando':
+            return
+        
+        self.pode_atirar = False
+        self.oponente.planejar(
+            self.gorilas[1].get_pos(), self.gorilas[0].get_pos(), self.disparar_cpu
+        )
+        
+    def disparar_cpu(self, angulo_horizontal, angulo_vertical, forca):
+        """
+        Aplica a mira escolhida pelo computador e atira.
+        
+        Args:
+            angulo_horizontal: Ângulo horizontal (em graus).
+            angulo_vertical: Ângulo vertical (em graus).
+            forca: Força do lançamento.
+        """
+        # Em pausa o disparo espera o jogo voltar
+        if self.estado_jogo == 'pausado':
+            self.taskMgr.doMethodLater(
+                0.5, lambda task: self.disparar_cpu(angulo_horizontal, angulo_vertical, forca),
+                'entregar_tiro_cpu'
+            )
+            return
+        if self.estado_jogo != 'jogando' or self.jogador_atual != 1:
+            return
+        
+        self.angulo_horizontal = angulo_horizontal
+        self.angulo_vertical = angulo_vertical
+        self.forca = forca
+        self.ui.atualizar_info_jogador()
+        
+        self.pode_atirar = True
+        self.atirar()
+        
     def aumentar_angulo_horizontal(self):
         self.angulo_horizontal = min(self.angulo_horizontal + 5, 180)
         self.ui.atualizar_info_jogador()
@@ -477,9 +570,18 @@ class Gorillas3DWar(ShowBase):
             # Toca som de vitória
             self.som.tocar_som('vitoria')
         
-    def iniciar_jogo(self):
+    def reiniciar_partida(self):
+        """
+        Reinicia a partida na mesma cidade (mesma semente).
+        """
+        self.iniciar_jogo(self.gerador_cidade.semente)
+        
+    def iniciar_jogo(self, semente=None):
         """
         Inicia um novo jogo.
+        
+        Args:
+            semente: Semente da cidade; sorteada se omitida.
         """
         # Reinicia todos os parâmetros do jogo
         self.pontuacao = [0, 0]
@@ -488,7 +590,8 @@ class Gorillas3DWar(ShowBase):
         
         # Regenera a cidade
         self.gerador_cidade.limpar_cidade()
-        self.cidade = self.gerador_cidade.gerar_cidade(7, 7)
+        dimensoes = self.dimensoes_cidade_grande if self.cidade_grande else self.dimensoes_cidade
+        self.cidade = self.gerador_cidade.gerar_cidade(*dimensoes, semente)
         
         # Recria os gorilas
         self.criar_gorilas()
@@ -497,6 +600,7 @@ class Gorillas3DWar(ShowBase):
         for projetil in self.projeteis:
             projetil.remover()
         self.projeteis = []
+        self.gerenciador_projeteis.limpar()
         
         # Limpa o sistema de destruição
         if hasattr(self, 'destruicao'):
@@ -524,6 +628,9 @@ class Gorillas3DWar(ShowBase):
         if hasattr(self, 'som'):
             self.som.tocar_musica('jogo')
         
+        # O computador pode começar se o turno for dele
+        self.verificar_turno_cpu()
+        
     def sair_jogo(self):
         """
         Sai do jogo e fecha a aplicação.
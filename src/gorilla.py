@@ -8,6 +8,7 @@ from panda3d.core import LPoint3, LVector3, TextNode
 from direct.actor.Actor import Actor
 import random
 import math
+from src.modelos import obter_biblioteca
 
 class Gorilla:
     """
@@ -121,9 +122,8 @@ class Gorilla:
         """
         Cria uma esfera com o nome, posição, raio e cor especificados.
         """
-        # Usa a função loadModel do Panda3D para criar uma esfera
-        esfera = self.game.loader.loadModel("models/misc/sphere")
-        esfera.setName(nome)
+        # Instancia a esfera compartilhada da biblioteca de modelos
+        esfera = obter_biblioteca(self.game).instanciar("models/misc/sphere", nome=nome)
         esfera.setPos(x, y, z)
         esfera.setScale(raio)
         esfera.setColor(*cor)
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Gorillas 3D War - Grade espacial
+Índice de caixas alinhadas aos eixos em uma grade uniforme no plano XY,
+usado para consultas de colisão contra os prédios da cidade.
+"""
+import math
+
+from src.colisao import intervalo_segmento_caixa
+
+
+class GradeEspacial:
+    """
+    Grade uniforme de caixas alinhadas aos eixos.
+
+    Cada objeto é inserido em todas as células XY que sua caixa cobre. As
+    consultas visitam apenas as células próximas ao ponto, à esfera ou ao
+    segmento, então o custo depende da densidade local e não do número
+    total de objetos.
+    """
+
+    def __init__(self, tamanho_celula=18.0):
+        """
+        Inicializa a grade.
+
+        Args:
+            tamanho_celula: Lado das células no plano XY.
+        """
+        self.tamanho_celula = tamanho_celula
+
+        # Células (ix, iy) -> lista de objetos
+        self.celulas = {}
+
+        # Objeto -> (mínimo, máximo, células ocupadas)
+        self.objetos = {}
+
+        # Incrementada a cada alteração, para quem mantém cópias do índice
+        self.versao = 0
+
+    def __len__(self):
+        return len(self.objetos)
+
+    def _celula(self, x, y):
+        """
+        Retorna o índice da célula que contém um ponto XY.
+        """
+        return (math.floor(x / self.tamanho_celula), math.floor(y / self.tamanho_celula))
+
+    def _celulas_area(self, x_min, y_min, x_max, y_max):
+        """
+        Retorna os índices das células que cobrem um retângulo XY.
+        """
+        ix0, iy0 = self._celula(x_min, y_min)
+        ix1, iy1 = self._celula(x_max, y_max)
+        return [(ix, iy) for ix in range(ix0, ix1 + 1) for iy in range(iy0, iy1 + 1)]
+
+    def inserir(self, objeto, minimo, maximo):
+        """
+        Insere (ou move) um objeto na grade.
+
+        Args:
+            objeto: Objeto indexado.
+            minimo: Canto mínimo (x, y, z) da caixa do objeto.
+            maximo: Canto máximo (x, y, z) da caixa do objeto.
+        """
+        if objeto in self.objetos:
+            self.remover(objeto)
+
+        minimo = tuple(minimo)
+        maximo = tuple(maximo)
+        celulas = self._celulas_area(minimo[0], minimo[1], maximo[0], maximo[1])
+        for celula in celulas:
+            self.celulas.setdefault(celula, []).append(objeto)
+        self.objetos[objeto] = (minimo, maximo, celulas)
+        self.versao += 1
+
+    def remover(self, objeto):
+        """
+        Remove um objeto da grade.
+
+        Args:
+            objeto: Objeto indexado.
+
+        Returns:
+            True se o objeto estava na grade.
+        """
+        dados = self.objetos.pop(objeto, None)
+        if dados is None:
+            return False
+
+        for celula in dados[2]:
+            lista = self.celulas[celula]
+            lista.remove(objeto)
+            if not lista:
+                del self.celulas[celula]
+        self.versao += 1
+        return True
+
+    def limites(self, objeto):
+        """
+        Retorna a caixa (mínimo, máximo) de um objeto indexado.
+        """
+        minimo, maximo, _ = self.objetos[objeto]
+        return minimo, maximo
+
+    def limpar(self):
+        """
+        Remove todos os objetos.
+        """
+        self.celulas.clear()
+        self.objetos.clear()
+        self.versao += 1
+
+    def _candidatos(self, celulas):
+        """
+        Objetos das células indicadas, sem repetição.
+        """
+        vistos = {}
+        for celula in celulas:
+            for objeto in self.celulas.get(celula, ()):
+                vistos[id(objeto)] = objeto
+        return vistos.values()
+
+    def consultar_ponto(self, ponto):
+        """
+        Retorna os objetos cuja caixa contém um ponto.
+
+        Args:
+            ponto: Posição (x, y, z).
+        """
+        resultado = []
+        for objeto in self.celulas.get(self._celula(ponto[0], ponto[1]), ()):
+            minimo, maximo, _ = self.objetos[objeto]
+            if all(minimo[k] <= ponto[k] <= maximo[k] for k in range(3)):
+                resultado.append(objeto)
+        return resultado
+
+    def consultar_esfera(self, centro, raio):
+        """
+        Retorna os objetos cuja caixa toca uma esfera.
+
+        Args:
+            centro: Centro (x, y, z) da esfera.
+            raio: Raio da esfera.
+        """
+        celulas = self._celulas_area(centro[0] - raio, centro[1] - raio,
+                                     centro[0] + raio, centro[1] + raio)
+        resultado = []
+        for objeto in self._candidatos(celulas):
+            minimo, maximo, _ = self.objetos[objeto]
+            distancia2 = 0.0
+            for k in range(3):
+                proximo = min(max(centro[k], minimo[k]), maximo[k])
+                distancia2 += (centro[k] - proximo) ** 2
+            if distancia2 <= raio * raio:
+                resultado.append(objeto)
+        return resultado
+
+    def candidatos_segmento(self, inicio, fim, raio=0.0):
+        """
+        Fase ampla: objetos das células percorridas por um segmento (com
+        folga de 'raio'), sem teste exato.
+
+        A travessia segue a linha célula a célula (Amanatides-Woo) e inclui
+        os vizinhos que a folga alcança.
+
+        Args:
+            inicio: Início (x, y, z) do segmento.
+            fim: Fim (x, y, z) do segmento.
+            raio: Folga em torno do segmento.
+        """
+        lado = self.tamanho_celula
+        anel = math.ceil(raio / lado) if raio > 0.0 else 0
+
+        ix, iy = self._celula(inicio[0], inicio[1])
+        ix_fim, iy_fim = self._celula(fim[0], fim[1])
+        dx = fim[0] - inicio[0]
+        dy = fim[1] - inicio[1]
+
+        passo_x = 1 if dx > 0 else -1
+        passo_y = 1 if dy > 0 else -1
+        if dx != 0.0:
+            borda_x = (ix + (1 if dx > 0 else 0)) * lado
+            t_max_x = (borda_x - inicio[0]) / dx
+            t_delta_x = lado / abs(dx)
+        else:
+            t_max_x = t_delta_x = math.inf
+        if dy != 0.0:
+            borda_y = (iy + (1 if dy > 0 else 0)) * lado
+            t_max_y = (borda_y - inicio[1]) / dy
+            t_delta_y = lado / abs(dy)
+        else:
+            t_max_y = t_delta_y = math.inf
+
+        percorridas = [(ix, iy)]
+        while (ix, iy) != (ix_fim, iy_fim):
+            if t_max_x < t_max_y:
+                if t_max_x > 1.0:
+                    break
+                ix += passo_x
+                t_max_x += t_delta_x
+            else:
+                if t_max_y > 1.0:
+                    break
+                iy += passo_y
+                t_max_y += t_delta_y
+            percorridas.append((ix, iy))
+
+        if anel:
+            celulas = {
+                (cx + ax, cy + ay)
+                for cx, cy in percorridas
+                for ax in range(-anel, anel + 1)
+                for ay in range(-anel, anel + 1)
+            }
+        else:
+            celulas = percorridas
+        return list(self._candidatos(celulas))
+
+    def consultar_segmento(self, inicio, fim, raio=0.0):
+        """
+        Retorna os objetos cuja caixa (expandida por 'raio') o segmento toca,
+        ordenados pela fração do segmento em que entram na caixa.
+
+        Args:
+            inicio: Início (x, y, z) do segmento.
+            fim: Fim (x, y, z) do segmento.
+            raio: Expansão das caixas (raio de uma esfera varrida).
+
+        Returns:
+            Lista de (fração de entrada, objeto); 0.0 se começa dentro.
+        """
+        resultado = []
+        for objeto in self.candidatos_segmento(inicio, fim, raio):
+            minimo, maximo, _ = self.objetos[objeto]
+            intervalo = intervalo_segmento_caixa(inicio, fim, raio, minimo, maximo)
+            if intervalo is None:
+                continue
+            entrada, saida = intervalo
+            if saida < 0.0 or entrada > 1.0:
+                continue
+            resultado.append((max(0.0, entrada), objeto))
+
+        resultado.sort(key=lambda item: item[0])
+        return resultado
+
+    def consultar_raio(self, origem, direcao, distancia_maxima=1000.0):
+        """
+        Retorna os objetos atingidos por um raio, do mais próximo ao mais
+        distante.
+
+        Args:
+            origem: Origem (x, y, z) do raio.
+            direcao: Direção (x, y, z) do raio (não precisa ser unitária).
+            distancia_maxima: Alcance do raio.
+
+        Returns:
+            Lista de (distância, objeto).
+        """
+        comprimento = math.sqrt(sum(c * c for c in direcao))
+        if comprimento == 0.0:
+            return []
+
+        escala = distancia_maxima / comprimento
+        fim = tuple(origem[k] + direcao[k] * escala for k in range(3))
+        return [(fracao * distancia_maxima, objeto)
+                for fracao, objeto in self.consultar_segmento(origem, fim)]
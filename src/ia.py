@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Gorillas 3D War - Oponente controlado pelo computador
+Escolhe ângulos e força simulando milhares de trajetórias candidatas de uma
+vez com NumPy.
+"""
+import math
+import time
+import threading
+import numpy as np
+
+from src.projeteis import GerenciadorProjeteis
+
+
+class OponenteCPU:
+    """
+    Oponente controlado pelo computador.
+
+    Cada candidato (ângulo horizontal, ângulo vertical, força) é avaliado de
+    forma analítica: o instante em que o arco desce até a altura do alvo dá
+    o ponto de chegada, e amostras do arco até esse instante são testadas
+    contra um mapa de alturas dos prédios (montado a partir da grade da
+    cidade). O melhor candidato é o de menor erro; rodadas seguintes
+    refinam a busca em torno dele enquanto houver orçamento de tempo. A
+    dificuldade controla o número de candidatos e o ruído aplicado ao tiro
+    escolhido.
+    """
+    # Parâmetros por dificuldade
+    DIFICULDADES = {
+        'facil': {
+            'candidatos': 512, 'rodadas': 1, 'ruido_angulo': 6.0,
+            'ruido_forca': 6.0, 'usar_thread': False
+        },
+        'medio': {
+            'candidatos': 1024, 'rodadas': 3, 'ruido_angulo': 2.5,
+            'ruido_forca': 2.5, 'usar_thread': False
+        },
+        'dificil': {
+            'candidatos': 4096, 'rodadas': 5, 'ruido_angulo': 0.6,
+            'ruido_forca': 0.8, 'usar_thread': True
+        },
+    }
+
+    # Limites dos controles do jogo
+    ANGULO_VERTICAL = (5.0, 85.0)
+    FORCA = (10.0, 100.0)
+
+    # Abertura da busca em torno da direção do alvo (graus)
+    ABERTURA_HORIZONTAL = 30.0
+
+    # Amostras do arco usadas no teste contra os prédios
+    AMOSTRAS = 24
+
+    # Resolução do mapa de alturas
+    RESOLUCAO_MAPA = 1.0
+
+    # Distância do lançamento em que os prédios ainda são ignorados (o tiro
+    # sai de cima do prédio do próprio gorila)
+    DISTANCIA_LIVRE = 2.0
+
+    # Penalidade somada ao erro de trajetórias bloqueadas
+    PENALIDADE_BLOQUEIO = 1000.0
+
+    # Tempo entre a decisão e o disparo, para o jogador ver a mira
+    ATRASO_DISPARO = 0.8
+
+    def __init__(self, game, dificuldade='medio', orcamento_ms=4.0):
+        """
+        Inicializa o oponente.
+
+        Args:
+            game: Referência ao jogo principal.
+            dificuldade: 'facil', 'medio' ou 'dificil'.
+            orcamento_ms: Tempo máximo de uma resolução na thread principal.
+        """
+        self.game = game
+        self.dificuldade = dificuldade
+        self.parametros = self.DIFICULDADES[dificuldade]
+        self.orcamento_ms = orcamento_ms
+        self.rng = np.random.default_rng()
+
+        # Mapa de alturas dos prédios (refeito quando a grade muda)
+        self._versao_mapa = None
+        self._mapa = np.zeros((1, 1), dtype=np.float32)
+        self._origem_mapa = (0.0, 0.0)
+
+        # Resolução em segundo plano
+        self._trava = threading.Lock()
+        self._resultado = None
+        self._ao_decidir = None
+        self._tarefa = None
+        self._chain_criada = False
+        self._pedido = 0
+
+        # Estatísticas da última resolução
+        self.estatisticas = {'candidatos': 0, 'tempo_ms': 0.0, 'erro': 0.0}
+
+    def _atualizar_mapa(self):
+        """
+        Rasteriza as caixas da grade da cidade em um mapa de alturas, com as
+        bordas expandidas pelo raio do projétil.
+        """
+        grade = self.game.gerador_cidade.grade
+        if grade.versao == self._versao_mapa:
+            return
+        self._versao_mapa = grade.versao
+
+        caixas = [grade.limites(objeto) for objeto in grade.objetos]
+        if not caixas:
+            self._mapa = np.zeros((1, 1), dtype=np.float32)
+            self._origem_mapa = (0.0, 0.0)
+            return
+
+        res = self.RESOLUCAO_MAPA
+        raio = GerenciadorProjeteis.RAIO
+        caixas = [((minimo[0] - raio, minimo[1] - raio), (maximo[0] + raio, maximo[1] + raio, maximo[2]))
+                  for minimo, maximo in caixas]
+        x0 = min(c[0][0] for c in caixas)
+        y0 = min(c[0][1] for c in caixas)
+        x1 = max(c[1][0] for c in caixas)
+        y1 = max(c[1][1] for c in caixas)
+        mapa = np.zeros((int(math.ceil((x1 - x0) / res)) + 1,
+                         int(math.ceil((y1 - y0) / res)) + 1), dtype=np.float32)
+        for minimo, maximo in caixas:
+            i0 = int((minimo[0] - x0) / res)
+            j0 = int((minimo[1] - y0) / res)
+            i1 = int(math.ceil((maximo[0] - x0) / res))
+            j1 = int(math.ceil((maximo[1] - y0) / res))
+            regiao = mapa[i0:i1, j0:j1]
+            np.maximum(regiao, maximo[2], out=regiao)
+
+        self._mapa = mapa
+        self._origem_mapa = (x0, y0)
+
+    def _alturas(self, mapa, origem_mapa, x, y):
+        """
+        Altura dos prédios sob os pontos (x, y); zero fora do mapa.
+        """
+        res = self.RESOLUCAO_MAPA
+        i = np.floor((x - origem_mapa[0]) / res).astype(np.int64)
+        j = np.floor((y - origem_mapa[1]) / res).astype(np.int64)
+        dentro = (i >= 0) & (i < mapa.shape[0]) & (j >= 0) & (j < mapa.shape[1])
+        alturas = np.zeros(x.shape, dtype=np.float32)
+        alturas[dentro] = mapa[i[dentro], j[dentro]]
+        return alturas
+
+    def avaliar(self, origem, alvo, aceleracao, angulos_h, angulos_v, forcas,
+                mapa=None, origem_mapa=None):
+        """
+        Calcula o erro de cada tiro candidato.
+
+        Args:
+            origem: Posição de lançamento (array de 3).
+            alvo: Ponto a atingir (array de 3).
+            aceleracao: Gravidade somada ao efeito do vento (array de 3).
+            angulos_h: Ângulos horizontais em graus (n).
+            angulos_v: Ângulos verticais em graus (n).
+            forcas: Forças de lançamento (n).
+            mapa: Mapa de alturas; o atual se omitido.
+            origem_mapa: Canto (x, y) do mapa de alturas.
+
+        Returns:
+            Array (n) com a distância horizontal entre a chegada e o alvo,
+            mais a penalidade se a trajetória for bloqueada ou não alcançar
+            a altura do alvo.
+        """
+        if mapa is None:
+            mapa, origem_mapa = self._mapa, self._origem_mapa
+
+        h = np.radians(angulos_h)
+        v = np.radians(angulos_v)
+        escala = forcas * 0.1
+        vel = np.stack((escala * np.cos(v) * np.cos(h),
+                        escala * np.cos(v) * np.sin(h),
+                        escala * np.sin(v)), axis=1)
+
+        # Instante em que o arco desce até a altura do alvo (raiz maior de
+        # z0 + vz·t + ½·az·t² = z_alvo)
+        a = 0.5 * aceleracao[2]
+        b = vel[:, 2]
+        c = origem[2] - alvo[2]
+        disc = b * b - 4.0 * a * c
+        raiz = np.sqrt(np.maximum(disc, 0.0))
+        # Sem aceleração para baixo o arco não desce: nenhum tiro alcança
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t_chegada = (-b - raiz) / (2.0 * a)
+        alcanca = (disc >= 0.0) & np.isfinite(t_chegada) & (t_chegada > 0.0)
+        t_chegada = np.where(alcanca, t_chegada, 0.0)
+
+        chegada = origem + vel * t_chegada[:, None] + aceleracao * (0.5 * t_chegada * t_chegada)[:, None]
+        erro = np.hypot(chegada[:, 0] - alvo[0], chegada[:, 1] - alvo[1])
+        erro = np.where(alcanca, erro, self.PENALIDADE_BLOQUEIO * 2.0)
+
+        # Amostras do arco até a chegada, testadas contra o mapa de alturas
+        fracoes = np.linspace(0.0, 1.0, self.AMOSTRAS, endpoint=False)[1:]
+        t = t_chegada[:, None] * fracoes[None, :]
+        px = origem[0] + vel[:, 0:1] * t + 0.5 * aceleracao[0] * t * t
+        py = origem[1] + vel[:, 1:2] * t + 0.5 * aceleracao[1] * t * t
+        pz = origem[2] + vel[:, 2:3] * t + 0.5 * aceleracao[2] * t * t
+
+        raio = GerenciadorProjeteis.RAIO
+        livre = np.hypot(px - origem[0], py - origem[1]) < self.DISTANCIA_LIVRE
+        colide = (pz - raio < self._alturas(mapa, origem_mapa, px, py)) & ~livre
+        bloqueado = colide.any(axis=1)
+
+        # O erro de um tiro bloqueado cresce com a distância do bloqueio ao alvo
+        primeiro = np.argmax(colide, axis=1)
+        linhas = np.arange(len(erro))
+        distancia_bloqueio = np.hypot(px[linhas, primeiro] - alvo[0], py[linhas, primeiro] - alvo[1])
+        return np.where(bloqueado, self.PENALIDADE_BLOQUEIO + distancia_bloqueio, erro)
+
+    def resolver(self, origem, alvo, gravidade, vento, orcamento_ms=None,
+                 mapa=None, origem_mapa=None):
+        """
+        Procura o melhor tiro de origem até alvo.
+
+        Args:
+            origem: Posição do gorila que atira.
+            alvo: Posição do gorila alvo.
+            gravidade: Vetor de gravidade.
+            vento: Vetor de vento (aplicado com 30% do efeito, como no voo).
+            orcamento_ms: Limite de tempo; o do oponente se omitido.
+            mapa: Mapa de alturas; o atual se omitido.
+            origem_mapa: Canto (x, y) do mapa de alturas.
+
+        Returns:
+            (ângulo horizontal, ângulo vertical, força, erro) do melhor tiro,
+            já com o ruído da dificuldade.
+        """
+        inicio = time.perf_counter()
+        if orcamento_ms is None:
+            orcamento_ms = self.orcamento_ms
+        if mapa is None:
+            self._atualizar_mapa()
+            mapa, origem_mapa = self._mapa, self._origem_mapa
+
+        origem = np.array(tuple(origem), dtype=np.float64)
+        alvo = np.array(tuple(alvo), dtype=np.float64)
+        alvo[2] += 1.0  # Mira no centro do corpo do gorila
+        aceleracao = np.array(tuple(gravidade), dtype=np.float64) + np.array(tuple(vento)) * 0.3
+
+        n = self.parametros['candidatos']
+        direcao = math.degrees(math.atan2(alvo[1] - origem[1], alvo[0] - origem[0]))
+        centro = np.array([direcao, sum(self.ANGULO_VERTICAL) / 2.0, sum(self.FORCA) / 2.0])
+        abertura = np.array([self.ABERTURA_HORIZONTAL,
+                             (self.ANGULO_VERTICAL[1] - self.ANGULO_VERTICAL[0]) / 2.0,
+                             (self.FORCA[1] - self.FORCA[0]) / 2.0])
+
+        melhor = None
+        melhor_erro = math.inf
+        avaliados = 0
+        for rodada in range(self.parametros['rodadas']):
+            inicio_rodada = time.perf_counter()
+            candidatos = centro + self.rng.uniform(-1.0, 1.0, (n, 3)) * abertura
+            np.clip(candidatos[:, 1], *self.ANGULO_VERTICAL, out=candidatos[:, 1])
+            np.clip(candidatos[:, 2], *self.FORCA, out=candidatos[:, 2])
+            if melhor is not None:
+                candidatos[0] = melhor
+
+            erros = self.avaliar(origem, alvo, aceleracao, candidatos[:, 0],
+                                 candidatos[:, 1], candidatos[:, 2], mapa, origem_mapa)
+            avaliados += n
+            i = int(np.argmin(erros))
+            if erros[i] < melhor_erro:
+                melhor_erro = float(erros[i])
+                melhor = candidatos[i].copy()
+
+            # Rodadas seguintes procuram em volta do melhor tiro, se ainda
+            # couberem no orçamento
+            centro = melhor
+            abertura = abertura * 0.25
+            agora = time.perf_counter()
+            if (2.0 * agora - inicio_rodada - inicio) * 1000.0 > orcamento_ms:
+                break
+
+        # Ruído da dificuldade
+        ang_h = melhor[0] + self.rng.normal(0.0, self.parametros['ruido_angulo'])
+        ang_v = float(np.clip(melhor[1] + self.rng.normal(0.0, self.parametros['ruido_angulo']),
+                              *self.ANGULO_VERTICAL))
+        forca = float(np.clip(melhor[2] + self.rng.normal(0.0, self.parametros['ruido_forca']),
+                              *self.FORCA))
+
+        self.estatisticas = {
+            'candidatos': avaliados,
+            'tempo_ms': (time.perf_counter() - inicio) * 1000.0,
+            'erro': melhor_erro
+        }
+        return float(ang_h % 360.0), ang_v, forca, melhor_erro
+
+    def planejar(self, origem, alvo, ao_decidir):
+        """
+        Planeja o próximo tiro e entrega o resultado na thread principal.
+
+        Nas dificuldades com thread, a busca roda na task chain 'ia' e pode
+        usar um orçamento maior sem travar o frame; nas outras, roda aqui
+        mesmo, dentro do orçamento do oponente.
+
+        Args:
+            origem: Posição do gorila que atira.
+            alvo: Posição do gorila alvo.
+            ao_decidir: Função chamada com (ângulo horizontal, ângulo
+                        vertical, força) depois de ATRASO_DISPARO segundos.
+        """
+        self.cancelar()
+        self._ao_decidir = ao_decidir
+
+        # Cópias dos dados do jogo: a thread não toca no estado compartilhado
+        self._atualizar_mapa()
+        argumentos = (
+            tuple(origem), tuple(alvo), tuple(self.game.gravidade), tuple(self.game.vento)
+        )
+
+        task_mgr = self.game.taskMgr
+        if self.parametros['usar_thread']:
+            if not self._chain_criada:
+                task_mgr.setupTaskChain('ia', numThreads=1, frameSync=False)
+                self._chain_criada = True
+            mapa, origem_mapa = self._mapa, self._origem_mapa
+            self._tarefa = task_mgr.add(
+                self._tarefa_resolver, 'resolver_tiro_cpu', taskChain='ia',
+                extraArgs=[self._pedido, argumentos, mapa, origem_mapa], appendTask=True
+            )
+        else:
+            with self._trava:
+                self._resultado = self.resolver(*argumentos)
+
+        task_mgr.doMethodLater(self.ATRASO_DISPARO, self._entregar, 'entregar_tiro_cpu')
+
+    def _tarefa_resolver(self, pedido, argumentos, mapa, origem_mapa, task):
+        """
+        Tarefa da task chain 'ia': resolve o tiro com orçamento folgado.
+        """
+        resultado = self.resolver(*argumentos, orcamento_ms=self.orcamento_ms * 10.0,
+                                  mapa=mapa, origem_mapa=origem_mapa)
+        with self._trava:
+            # Um planejamento cancelado no meio não entrega resultado
+            if pedido == self._pedido:
+                self._resultado = resultado
+        return task.done
+
+    def _entregar(self, task):
+        """
+        Entrega o tiro decidido quando ele estiver pronto.
+        """
+        with self._trava:
+            resultado = self._resultado
+        if resultado is None:
+            return task.again
+
+        ao_decidir = self._ao_decidir
+        self._resultado = None
+        self._ao_decidir = None
+        self._tarefa = None
+        if ao_decidir is not None:
+            ao_decidir(*resultado[:3])
+        return task.done
+
+    def cancelar(self):
+        """
+        Descarta um planejamento em andamento.
+        """
+        task_mgr = self.game.taskMgr
+        task_mgr.remove('entregar_tiro_cpu')
+        if self._tarefa is not None:
+            task_mgr.remove(self._tarefa)
+            self._tarefa = None
+        with self._trava:
+            self._resultado = None
+            self._pedido += 1
+        self._ao_decidir = None
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Gorillas 3D War - Linhas dinâmicas
+Geometria de linha com capacidade fixa, atualizada no próprio lugar como um
+buffer circular. Usada pela linha de trajetória e pelo rastro dos projéteis.
+"""
+import numpy as np
+from panda3d.core import Geom, GeomNode, GeomLines, GeomVertexData, GeomVertexFormat
+from panda3d.core import GeomVertexArrayFormat, GeomVertexRewriter, InternalName
+from panda3d.core import OmniBoundingVolume, TransparencyAttrib
+
+
+class LinhaDinamica:
+    """
+    Linha poligonal em buffer circular de vértices.
+
+    Cada novo ponto sobrescreve o vértice mais antigo: apenas esse vértice e
+    dois índices são reescritos a cada ponto (via GeomVertexRewriter), e o
+    alpha de todos os vértices é recalculado pela idade com uma cópia de
+    fatia do NumPy. Nenhum Geom ou nó é criado após a inicialização.
+    """
+
+    def __init__(self, node_pai, capacidade, cor=(1.0, 1.0, 0.0), alpha_maximo=1.0,
+                 espessura=1.0, nome='linha_dinamica'):
+        """
+        Inicializa a linha dinâmica.
+
+        Args:
+            node_pai: Nó pai para o GeomNode da linha.
+            capacidade: Número máximo de pontos mantidos na linha.
+            cor: Cor (r, g, b) da linha.
+            alpha_maximo: Alpha do ponto mais recente; os mais antigos desvanecem.
+            espessura: Espessura da linha em pixels.
+            nome: Nome do GeomNode.
+        """
+        self.capacidade = max(2, int(capacidade))
+        self.alpha_maximo = alpha_maximo
+        self.num_pontos = 0
+        self._cabeca = -1  # Slot do ponto mais recente
+
+        n = self.capacidade
+
+        # Formato com arrays separados: posição (reescrita) e cor (NumPy)
+        formato = GeomVertexFormat()
+        array = GeomVertexArrayFormat()
+        array.addColumn(InternalName.getVertex(), 3, Geom.NT_float32, Geom.C_point)
+        formato.addArray(array)
+        array = GeomVertexArrayFormat()
+        array.addColumn(InternalName.getColor(), 4, Geom.NT_float32, Geom.C_color)
+        formato.addArray(array)
+        formato = GeomVertexFormat.registerFormat(formato)
+
+        self.vdata = GeomVertexData(nome, formato, Geom.UHDynamic)
+        self.vdata.setNumRows(n)
+        self._cores()[:] = 0.0
+        self.definir_cor(cor)
+
+        # Alpha por idade (0 = mais recente), duplicado e invertido para que o
+        # alpha de todos os slots seja sempre uma fatia contígua
+        rampa = alpha_maximo * (1.0 - np.arange(n, dtype=np.float32) / n)
+        self._rampa_dupla = np.tile(rampa[::-1], 2)
+
+        # Segmento k liga o slot k ao slot k+1; começa degenerado (k, k)
+        self.segmentos = GeomLines(Geom.UHDynamic)
+        self.segmentos.setIndexType(Geom.NT_uint16 if n <= 0xffff else Geom.NT_uint32)
+        lista_indices = self.segmentos.modifyVertices()
+        lista_indices.setNumRows(2 * n)
+        np.asarray(memoryview(lista_indices))[:] = np.repeat(np.arange(n), 2)
+
+        geom = Geom(self.vdata)
+        geom.addPrimitive(self.segmentos)
+        geom_node = GeomNode(nome)
+        geom_node.addGeom(geom)
+
+        # Os vértices mudam todo frame; evita recalcular limites
+        geom_node.setBounds(OmniBoundingVolume())
+        geom_node.setFinal(True)
+
+        self.node = node_pai.attachNewNode(geom_node)
+        self.node.setTransparency(TransparencyAttrib.MAlpha)
+        self.node.setRenderModeThickness(espessura)
+        self.node.setLightOff()
+        self.node.setDepthWrite(False)
+
+    def _cores(self):
+        """
+        Retorna uma visão NumPy (n, 4) gravável das cores dos vértices.
+        """
+        dados = np.frombuffer(memoryview(self.vdata.modifyArray(1)), dtype=np.float32)
+        return dados.reshape(-1, 4)
+
+    def _definir_indice(self, linha, valor):
+        """
+        Reescreve um único índice da lista de segmentos.
+        """
+        reescritor = GeomVertexRewriter(self.segmentos.modifyVertices(), 0)
+        reescritor.setRow(linha)
+        reescritor.setData1i(valor)
+
+    def definir_cor(self, cor):
+        """
+        Define a cor (r, g, b) de todos os vértices da linha.
+
+        Args:
+            cor: Nova cor da linha.
+        """
+        self._cores()[:, :3] = cor[:3]
+
+    def adicionar_ponto(self, ponto):
+        """
+        Adiciona um ponto à linha, sobrescrevendo o mais antigo se cheia.
+
+        Args:
+            ponto: Posição do novo ponto.
+        """
+        n = self.capacidade
+        anterior = self._cabeca
+        cabeca = (anterior + 1) % n
+        self._cabeca = cabeca
+
+        # Reescreve apenas o vértice da cabeça
+        reescritor = GeomVertexRewriter(self.vdata, InternalName.getVertex())
+        reescritor.setRow(cabeca)
+        reescritor.setData3(ponto[0], ponto[1], ponto[2])
+
+        # Liga o ponto anterior à nova cabeça e desliga a cabeça do mais antigo
+        if self.num_pontos > 0:
+            self._definir_indice(2 * anterior + 1, cabeca)
+        self._definir_indice(2 * cabeca + 1, cabeca)
+        self.num_pontos = min(self.num_pontos + 1, n)
+
+        # Alpha por idade: idade do slot i é (cabeca - i) mod n
+        inicio = n - 1 - cabeca
+        self._cores()[:, 3] = self._rampa_dupla[inicio:inicio + n]
+
+    def limpar(self):
+        """
+        Remove todos os pontos da linha, mantendo a geometria alocada.
+        """
+        n = self.capacidade
+        np.asarray(memoryview(self.segmentos.modifyVertices()))[:] = np.repeat(np.arange(n), 2)
+        self.num_pontos = 0
+        self._cabeca = -1
+
+    def remover(self):
+        """
+        Remove a linha da cena.
+        """
+        self.node.removeNode()
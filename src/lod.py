@@ -259,6 +259,16 @@ class GerenciadorLOD:
         if callback not in self.callbacks_mudanca_qualidade:
             self.callbacks_mudanca_qualidade.append(callback)
     
+    def remover_callback_mudanca_qualidade(self, callback):
+        """
+        Remove um callback registrado com registrar_callback_mudanca_qualidade.
+        
+        Args:
+            callback: Função registrada.
+        """
+        if callback in self.callbacks_mudanca_qualidade:
+            self.callbacks_mudanca_qualidade.remove(callback)
+    
     def definir_qualidade(self, qualidade):
         """
         Define manualmente o nível de qualidade.
@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Gorillas 3D War - Gerenciador de luzes dinâmicas
+Distribui um conjunto fixo de luzes pontuais entre as fontes de luz ativas
+(explosões), respeitando o limite de luzes do nível de detalhe.
+"""
+from panda3d.core import PointLight, LPoint3, LVector3
+
+from src.pool import ObjectPool
+
+
+class GerenciadorLuzes:
+    """
+    Gerenciador do orçamento de luzes dinâmicas.
+
+    As luzes pontuais são criadas uma única vez e ficam permanentemente
+    ativas na cena; apenas cor, posição e alcance mudam a cada frame, de modo
+    que o estado de renderização dos objetos iluminados não é invalidado a
+    cada explosão. Fontes próximas são fundidas em uma só luz, as fontes mais
+    importantes recebem as luzes disponíveis e as demais desvanecem.
+    """
+    def __init__(self, game, lod_manager, fator_fusao=1.5, velocidade_fade=4.0):
+        """
+        Inicializa o gerenciador de luzes.
+
+        Args:
+            game: Referência ao jogo principal.
+            lod_manager: Gerenciador de LOD que define o limite de luzes.
+            fator_fusao: Fontes a menos de fator_fusao vezes o maior raio
+                         entre elas são iluminadas por uma única luz.
+            velocidade_fade: Velocidade (por segundo) com que o brilho de
+                             uma luz acompanha o valor desejado.
+        """
+        self.game = game
+        self.lod_manager = lod_manager
+        self.fator_fusao = fator_fusao
+        self.velocidade_fade = velocidade_fade
+
+        # Capacidade fixa: o maior limite entre todos os níveis de qualidade
+        capacidade = max(c['max_luzes'] for c in lod_manager.configuracoes.values())
+
+        def criar_luz():
+            luz_np = self.game.render.attachNewNode(PointLight('luz_dinamica'))
+            luz_np.node().setColor((0, 0, 0, 1))
+            return luz_np
+
+        def resetar_luz(luz_np):
+            luz_np.node().setColor((0, 0, 0, 1))
+            self.game.render.clearLight(luz_np)
+
+        self.pool = ObjectPool(
+            factory_func=criar_luz,
+            reset_func=resetar_luz,
+            initial_size=capacidade,
+            max_size=capacidade
+        )
+
+        # Luzes fixas, cada uma com o estado de alocação atual
+        self.slots = []
+        for _ in range(capacidade):
+            self.slots.append({
+                'node': self.pool.get(),
+                'fonte': None,       # ID da fonte líder que ocupa a luz
+                'brilho': 0.0,       # Brilho atual (0.0 a 1.0)
+                'cor': LVector3(0, 0, 0),
+                'ativa': False       # Se a luz está ligada na cena
+            })
+
+        # Fontes de luz registradas (id -> dados)
+        self.fontes = {}
+        self._proximo_id = 0
+
+        # Estatísticas do último frame
+        self.estatisticas = {
+            'fontes': 0,
+            'grupos': 0,
+            'luzes_usadas': 0,
+            'fontes_sem_luz': 0
+        }
+
+        # Limite e alcance iniciais vindos do LOD
+        config = lod_manager.obter_configuracoes_atuais()
+        self.max_luzes = 0
+        self.raio_luz = config['raio_luz']
+        self.definir_maximo(config['max_luzes'])
+        lod_manager.registrar_callback_mudanca_qualidade(self._ajustar_qualidade)
+
+    def registrar_fonte(self, posicao, cor, raio, intensidade=1.0, importancia=1.0):
+        """
+        Registra uma nova fonte de luz.
+
+        Args:
+            posicao: Posição da fonte.
+            cor: Cor (r, g, b) da fonte com intensidade máxima.
+            raio: Raio de influência da fonte.
+            intensidade: Intensidade inicial (0.0 a 1.0).
+            importancia: Peso extra na disputa pelas luzes disponíveis.
+
+        Returns:
+            ID da fonte registrada.
+        """
+        id_fonte = self._proximo_id
+        self._proximo_id += 1
+
+        self.fontes[id_fonte] = {
+            'posicao': LPoint3(posicao),
+            'cor': LVector3(cor[0], cor[1], cor[2]),
+            'raio': max(0.1, raio),
+            'intensidade': intensidade,
+            'importancia': importancia
+        }
+        return id_fonte
+
+    def atualizar_fonte(self, id_fonte, intensidade=None, cor=None):
+        """
+        Atualiza a intensidade e/ou a cor de uma fonte.
+
+        Args:
+            id_fonte: ID da fonte.
+            intensidade: Nova intensidade (0.0 a 1.0).
+            cor: Nova cor (r, g, b).
+        """
+        fonte = self.fontes.get(id_fonte)
+        if fonte is None:
+            return
+
+        if intensidade is not None:
+            fonte['intensidade'] = intensidade
+        if cor is not None:
+            fonte['cor'] = LVector3(cor[0], cor[1], cor[2])
+
+    def remover_fonte(self, id_fonte):
+        """
+        Remove uma fonte. A luz que ela ocupava desvanece suavemente.
+
+        Args:
+            id_fonte: ID da fonte.
+        """
+        self.fontes.pop(id_fonte, None)
+
+    def limpar(self):
+        """
+        Remove todas as fontes e apaga as luzes imediatamente.
+        """
+        self.fontes.clear()
+        for slot in self.slots:
+            slot['fonte'] = None
+            slot['brilho'] = 0.0
+            slot['node'].node().setColor((0, 0, 0, 1))
+
+    def definir_maximo(self, max_luzes):
+        """
+        Define quantas luzes podem estar ligadas ao mesmo tempo.
+        Só aqui as luzes são ligadas ou desligadas na cena.
+
+        Args:
+            max_luzes: Número máximo de luzes simultâneas.
+        """
+        self.max_luzes = max(0, min(max_luzes, len(self.slots)))
+
+        for i, slot in enumerate(self.slots):
+            ativa = i < self.max_luzes
+            if ativa and not slot['ativa']:
+                self.game.render.setLight(slot['node'])
+            elif not ativa and slot['ativa']:
+                self.game.render.clearLight(slot['node'])
+                slot['fonte'] = None
+                slot['brilho'] = 0.0
+                slot['node'].node().setColor((0, 0, 0, 1))
+            slot['ativa'] = ativa
+
+    def _ajustar_qualidade(self, qualidade_antiga, qualidade_nova, config):
+        """
+        Callback chamado quando a qualidade dos efeitos muda.
+        """
+        self.raio_luz = config['raio_luz']
+        self.definir_maximo(config['max_luzes'])
+
+    def atualizar(self, dt):
+        """
+        Agrupa as fontes, distribui as luzes e aplica o desvanecimento.
+
+        Args:
+            dt: Delta time (tempo desde o último frame).
+        """
+        grupos = self._agrupar_fontes()
+        grupos.sort(key=lambda g: g['pontuacao'], reverse=True)
+
+        # Apenas os grupos mais importantes recebem luz
+        escolhidos = grupos[:self.max_luzes]
+        por_membro = {id_fonte: g for g in escolhidos for id_fonte in g['ids']}
+        pendentes = {g['lider']: g for g in escolhidos}
+
+        # Grupos que já tinham luz continuam com ela (evita trocas bruscas),
+        # mesmo que outra fonte tenha passado a liderar o grupo
+        slots_ativos = self.slots[:self.max_luzes]
+        livres = []
+        for slot in slots_ativos:
+            grupo = por_membro.get(slot['fonte'])
+            if grupo is not None and grupo['lider'] in pendentes:
+                del pendentes[grupo['lider']]
+                slot['fonte'] = grupo['lider']
+                slot['grupo'] = grupo
+            else:
+                slot['grupo'] = None
+                if slot['brilho'] <= 0.0:
+                    slot['fonte'] = None
+                    livres.append(slot)
+
+        # Grupos novos ocupam as luzes livres; se não houver, a luz mais fraca
+        # que estiver desvanecendo é cedida
+        for grupo in sorted(pendentes.values(), key=lambda g: g['pontuacao'], reverse=True):
+            if not livres:
+                candidatos = [s for s in slots_ativos if s['grupo'] is None]
+                if not candidatos:
+                    break
+                slot = min(candidatos, key=lambda s: s['brilho'])
+                slot['brilho'] = 0.0
+            else:
+                slot = livres.pop()
+            slot['fonte'] = grupo['lider']
+            slot['grupo'] = grupo
+
+        # Aproxima o brilho de cada luz do valor desejado
+        passo = self.velocidade_fade * dt
+        luzes_usadas = 0
+        for slot in slots_ativos:
+            grupo = slot.pop('grupo', None)
+            luz_np = slot['node']
+            luz = luz_np.node()
+
+            if grupo is not None:
+                luz_np.setPos(grupo['posicao'])
+                slot['cor'] = grupo['cor']
+                raio = grupo['raio']
+                luz.setAttenuation(LVector3(0.0, 0.0, 0.5 / raio))
+                luz.setMaxDistance(min(raio * 3.0, self.raio_luz))
+                alvo = grupo['intensidade']
+            else:
+                alvo = 0.0
+
+            if slot['brilho'] < alvo:
+                slot['brilho'] = min(alvo, slot['brilho'] + passo)
+            else:
+                slot['brilho'] = max(alvo, slot['brilho'] - passo)
+
+            if slot['brilho'] <= 0.0 and grupo is None:
+                slot['fonte'] = None
+
+            cor = slot['cor'] * slot['brilho']
+            luz.setColor((cor[0], cor[1], cor[2], 1))
+            if slot['brilho'] > 0.0:
+                luzes_usadas += 1
+
+        self.estatisticas['fontes'] = len(self.fontes)
+        self.estatisticas['grupos'] = len(grupos)
+        self.estatisticas['luzes_usadas'] = luzes_usadas
+        self.estatisticas['fontes_sem_luz'] = sum(len(g['membros']) for g in grupos[self.max_luzes:])
+
+    def _agrupar_fontes(self):
+        """
+        Funde fontes próximas em grupos, cada um iluminado por uma única luz.
+
+        Returns:
+            Lista de grupos com posição, cor, raio, intensidade e pontuação.
+        """
+        camera = None
+        if self.game.camera is not None and not self.game.camera.isEmpty():
+            camera = self.game.camera.getPos(self.game.render)
+
+        # Ordena pela importância individual: a mais importante lidera o grupo
+        fontes = sorted(
+            ((id_fonte, f, self._pontuacao(f, camera)) for id_fonte, f in self.fontes.items()
+             if f['intensidade'] > 0.0),
+            key=lambda item: item[2], reverse=True
+        )
+
+        grupos = []
+        for id_fonte, fonte, pontuacao in fontes:
+            destino = None
+            for grupo in grupos:
+                limite = self.fator_fusao * max(grupo['raio_lider'], fonte['raio'])
+                if (grupo['posicao_lider'] - fonte['posicao']).lengthSquared() <= limite * limite:
+                    destino = grupo
+                    break
+
+            if destino is None:
+                grupos.append({
+                    'lider': id_fonte,
+                    'posicao_lider': fonte['posicao'],
+                    'raio_lider': fonte['raio'],
+                    'membros': [fonte],
+                    'ids': [id_fonte],
+                    'pontuacao': pontuacao
+                })
+            else:
+                destino['membros'].append(fonte)
+                destino['ids'].append(id_fonte)
+                destino['pontuacao'] += pontuacao
+
+        # Combina os membros de cada grupo ponderando pela intensidade
+        for grupo in grupos:
+            peso_total = sum(f['intensidade'] for f in grupo['membros'])
+            posicao = LVector3(0, 0, 0)
+            cor = LVector3(0, 0, 0)
+            raio = 0.0
+            for f in grupo['membros']:
+                peso = f['intensidade'] / peso_total
+                posicao += LVector3(f['posicao']) * peso
+                cor += f['cor'] * peso
+                raio = max(raio, f['raio'])
+            grupo['posicao'] = LPoint3(posicao)
+            grupo['cor'] = cor
+            grupo['raio'] = raio
+            grupo['intensidade'] = min(1.0, peso_total)
+
+        return grupos
+
+    def _pontuacao(self, fonte, camera):
+        """
+        Importância de uma fonte: intensa, grande e próxima da câmera.
+        """
+        pontuacao = fonte['intensidade'] * fonte['importancia'] * fonte['raio']
+        if camera is not None:
+            distancia = (fonte['posicao'] - camera).length()
+            pontuacao /= 1.0 + distancia / self.raio_luz
+        return pontuacao
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Gorillas 3D War - Biblioteca central de modelos
+Carrega cada modelo uma única vez e entrega instâncias ou cópias leves
+para todos os subsistemas do jogo.
+"""
+import math
+import os
+from panda3d.core import NodePath, GeomNode, Geom, GeomTriangles
+from panda3d.core import GeomVertexFormat, GeomVertexData, GeomVertexWriter
+
+
+class BibliotecaModelos:
+    """
+    Biblioteca de modelos compartilhados.
+
+    Cada modelo é carregado uma vez e mantido como protótipo fora da cena.
+    As instâncias entregues (instanceTo) compartilham o mesmo nó e a mesma
+    geometria; as cópias (copyTo) duplicam apenas os nós, reaproveitando os
+    mesmos Geoms. Modelos ausentes são substituídos por formas procedurais.
+    """
+    # Modelos usados pelo jogo, pré-carregados na inicialização
+    MODELOS_PADRAO = (
+        "models/misc/sphere",
+        "models/misc/plane",
+        "models/misc/box",
+    )
+
+    def __init__(self, game, pre_carregar=True):
+        """
+        Inicializa a biblioteca de modelos.
+
+        Args:
+            game: Referência ao jogo principal.
+            pre_carregar: Se True, carrega os modelos padrão imediatamente.
+        """
+        self.game = game
+
+        # Protótipos carregados (caminho -> NodePath fora da cena)
+        self.modelos = {}
+
+        # Caminhos que precisaram de forma procedural
+        self.procedurais = set()
+
+        # Contadores de uso por modelo
+        self.instancias_entregues = {}
+        self.copias_entregues = {}
+
+        if pre_carregar:
+            for caminho in self.MODELOS_PADRAO:
+                self.carregar(caminho)
+
+    def carregar(self, caminho):
+        """
+        Carrega um modelo (apenas na primeira vez) e retorna seu protótipo.
+
+        Args:
+            caminho: Caminho do modelo.
+
+        Returns:
+            NodePath do protótipo do modelo.
+        """
+        prototipo = self.modelos.get(caminho)
+        if prototipo is not None:
+            return prototipo
+
+        prototipo = self.game.loader.loadModel(caminho, okMissing=True)
+        if prototipo is None or prototipo.isEmpty():
+            # Modelo não encontrado: gera uma forma equivalente
+            prototipo = _criar_forma_procedural(caminho)
+            self.procedurais.add(caminho)
+
+        prototipo.detachNode()
+        self.modelos[caminho] = prototipo
+        self.instancias_entregues[caminho] = 0
+        self.copias_entregues[caminho] = 0
+        return prototipo
+
+    def instanciar(self, caminho, pai=None, nome=None):
+        """
+        Cria uma instância do modelo compartilhando nós e geometria.
+
+        O protótipo é instanciado sob um nó próprio, de modo que posição,
+        escala, cor e textura podem ser alteradas em cada instância sem
+        afetar as demais.
+
+        Args:
+            caminho: Caminho do modelo.
+            pai: Nó pai opcional para a instância.
+            nome: Nome opcional do nó da instância.
+
+        Returns:
+            NodePath da instância.
+        """
+        prototipo = self.carregar(caminho)
+
+        instancia = NodePath(nome or os.path.basename(caminho))
+        if pai is not None:
+            instancia.reparentTo(pai)
+        prototipo.instanceTo(instancia)
+
+        self.instancias_entregues[caminho] += 1
+        return instancia
+
+    def copiar(self, caminho, pai=None):
+        """
+        Cria uma cópia do modelo que pode ser modificada livremente
+        (por exemplo, achatada com flattenStrong). Os Geoms continuam
+        compartilhados até serem alterados.
+
+        Args:
+            caminho: Caminho do modelo.
+            pai: Nó pai opcional para a cópia.
+
+        Returns:
+            NodePath da cópia.
+        """
+        prototipo = self.carregar(caminho)
+
+        if pai is not None:
+            copia = prototipo.copyTo(pai)
+        else:
+            copia = prototipo.copyTo(NodePath())
+            copia.detachNode()
+
+        self.copias_entregues[caminho] += 1
+        return copia
+
+    def stats(self):
+        """
+        Retorna estatísticas de uso da biblioteca.
+
+        Returns:
+            Dicionário com estatísticas por modelo e totais.
+        """
+        por_modelo = {}
+        for caminho, prototipo in self.modelos.items():
+            por_modelo[caminho] = {
+                'instancias_ativas': prototipo.node().getNumParents(),
+                'instancias_entregues': self.instancias_entregues[caminho],
+                'copias_entregues': self.copias_entregues[caminho],
+                'procedural': caminho in self.procedurais
+            }
+
+        return {
+            'modelos_carregados': len(self.modelos),
+            'instancias_ativas': sum(m['instancias_ativas'] for m in por_modelo.values()),
+            'instancias_entregues': sum(self.instancias_entregues.values()),
+            'copias_entregues': sum(self.copias_entregues.values()),
+            'modelos': por_modelo
+        }
+
+    def limpar(self):
+        """
+        Descarta todos os protótipos carregados.
+        """
+        for prototipo in self.modelos.values():
+            prototipo.removeNode()
+
+        self.modelos.clear()
+        self.procedurais.clear()
+        self.instancias_entregues.clear()
+        self.copias_entregues.clear()
+
+
+def obter_biblioteca(game):
+    """
+    Retorna a biblioteca de modelos do jogo, criando-a se necessário.
+
+    Args:
+        game: Referência ao jogo principal.
+
+    Returns:
+        Instância de BibliotecaModelos compartilhada pelo jogo.
+    """
+    biblioteca = getattr(game, 'modelos', None)
+    if biblioteca is None:
+        biblioteca = BibliotecaModelos(game)
+        game.modelos = biblioteca
+    return biblioteca
+
+
+def _criar_forma_procedural(caminho):
+    """
+    Cria uma forma equivalente para um modelo ausente, escolhida pelo nome.
+
+    Args:
+        caminho: Caminho do modelo que não foi encontrado.
+
+    Returns:
+        NodePath com a forma gerada.
+    """
+    nome = os.path.basename(caminho).split('.')[0]
+
+    if nome == 'plane':
+        vertices, indices = _plano()
+    elif nome in ('box', 'cube'):
+        vertices, indices = _caixa()
+    else:
+        # Esfera serve de substituto genérico para qualquer outro modelo
+        vertices, indices = _esfera()
+
+    formato = GeomVertexFormat.getV3n3t2()
+    vdata = GeomVertexData(nome, formato, Geom.UHStatic)
+    vdata.setNumRows(len(vertices))
+
+    escritor_vertice = GeomVertexWriter(vdata, 'vertex')
+    escritor_normal = GeomVertexWriter(vdata, 'normal')
+    escritor_uv = GeomVertexWriter(vdata, 'texcoord')
+    for posicao, normal, uv in vertices:
+        escritor_vertice.addData3(*posicao)
+        escritor_normal.addData3(*normal)
+        escritor_uv.addData2(*uv)
+
+    triangulos = GeomTriangles(Geom.UHStatic)
+    for a, b, c in indices:
+        triangulos.addVertices(a, b, c)
+
+    geom = Geom(vdata)
+    geom.addPrimitive(triangulos)
+
+    geom_node = GeomNode(nome)
+    geom_node.addGeom(geom)
+    return NodePath(geom_node)
+
+
+def _plano():
+    """
+    Quad unitário centrado na origem, no plano XZ e voltado para -Y.
+    """
+    normal = (0, -1, 0)
+    vertices = [
+        ((-0.5, 0, -0.5), normal, (0, 0)),
+        ((0.5, 0, -0.5), normal, (1, 0)),
+        ((0.5, 0, 0.5), normal, (1, 1)),
+        ((-0.5, 0, 0.5), normal, (0, 1)),
+    ]
+    return vertices, [(0, 1, 2), (0, 2, 3)]
+
+
+def _caixa():
+    """
+    Cubo unitário centrado na origem, com normais por face.
+    """
+    faces = (
+        ((1, 0, 0), (0, 1, 0), (0, 0, 1)),
+        ((-1, 0, 0), (0, -1, 0), (0, 0, 1)),
+        ((0, 1, 0), (-1, 0, 0), (0, 0, 1)),
+        ((0, -1, 0), (1, 0, 0), (0, 0, 1)),
+        ((0, 0, 1), (1, 0, 0), (0, 1, 0)),
+        ((0, 0, -1), (-1, 0, 0), (0, 1, 0)),
+    )
+    vertices = []
+    indices = []
+    for normal, eixo_u, eixo_v in faces:
+        base = len(vertices)
+        for su, sv, uv in ((-1, -1, (0, 0)), (1, -1, (1, 0)), (1, 1, (1, 1)), (-1, 1, (0, 1))):
+            posicao = tuple(
+                0.5 * (normal[k] + su * eixo_u[k] + sv * eixo_v[k]) for k in range(3)
+            )
+            vertices.append((posicao, normal, uv))
+        indices.append((base, base + 1, base + 2))
+        indices.append((base, base + 2, base + 3))
+    return vertices, indices
+
+
+def _esfera(aneis=12, segmentos=16):
+    """
+    Esfera UV de raio 1 centrada na origem.
+    """
+    vertices = []
+    for i in range(aneis + 1):
+        theta = math.pi * i / aneis
+        for j in range(segmentos + 1):
+            phi = 2 * math.pi * j / segmentos
+            normal = (
+                math.sin(theta) * math.cos(phi),
+                math.sin(theta) * math.sin(phi),
+                -math.cos(theta)
+            )
+            vertices.append((normal, normal, (j / segmentos, i / aneis)))
+
+    indices = []
+    for i in range(aneis):
+        for j in range(segmentos):
+            a = i * (segmentos + 1) + j
+            b = a + segmentos + 1
+            indices.append((a, a + 1, b + 1))
+            indices.append((a, b + 1, b))
+    return vertices, indices
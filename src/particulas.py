@@ -0,0 +1,559 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Motor de partículas vetorizado para o jogo Gorillas 3D War.
+Armazena as partículas em arrays NumPy (estrutura de arrays) e avança todas
+de uma vez por frame, em vez de percorrer dicionários partícula a partícula.
+"""
+
+import numpy as np
+from panda3d.core import GeomVertexArrayFormat, GeomVertexFormat, GeomVertexData
+from panda3d.core import Geom, GeomTriangles, GeomNode, InternalName, OmniBoundingVolume
+
+
+class MotorParticulas:
+    """
+    Motor de partículas em estrutura de arrays (SoA).
+
+    Cada instância simula um tipo de partícula (detritos, centelhas, fumaça...)
+    com parâmetros físicos próprios. Posições, velocidades, tempos de vida,
+    escalas e cores ficam em arrays NumPy de capacidade fixa; os slots livres
+    são reaproveitados sem alocar novos arrays.
+    """
+
+    # Leis de variação da escala ao longo da vida da partícula
+    ESCALA_CONSTANTE = 'constante'
+    ESCALA_DECAIMENTO = 'decaimento'      # escala *= fator por frame, até escala_final
+    ESCALA_PROPORCIONAL = 'proporcional'  # escala_inicial * vida restante
+    ESCALA_CRESCIMENTO = 'crescimento'    # escala_inicial * (2 - vida restante)
+    ESCALA_EXPANSAO = 'expansao'          # escala_inicial * (1.5 - 0.5 * vida restante)
+
+    def __init__(self, capacidade, gravidade=0.0, arrasto=1.0, altura_chao=None,
+                 restituicao=0.4, atrito_chao=0.7, velocidade_repouso=1.0,
+                 lei_escala=ESCALA_CONSTANTE, fator_escala=1.0,
+                 desvanecer=True, cintilacao=0.0, usar_rotacao=False):
+        """
+        Inicializa o motor de partículas.
+
+        Args:
+            capacidade: Número máximo de partículas simultâneas.
+            gravidade: Aceleração vertical aplicada às partículas.
+            arrasto: Fator multiplicativo aplicado à velocidade a cada frame.
+            altura_chao: Altura do chão para quicar (None desativa a colisão).
+            restituicao: Fração da velocidade vertical mantida ao quicar.
+            atrito_chao: Fração da velocidade horizontal mantida ao quicar.
+            velocidade_repouso: Velocidade vertical abaixo da qual a partícula para no chão.
+            lei_escala: Lei de variação da escala (ver constantes ESCALA_*).
+            fator_escala: Fator por frame usado pela lei de decaimento.
+            desvanecer: Se True, o alpha diminui proporcionalmente à vida restante.
+            cintilacao: Probabilidade por frame de alternar a visibilidade (centelhas).
+            usar_rotacao: Se True, integra a rotação (HPR) das partículas.
+        """
+        self.capacidade = capacidade
+        self.gravidade = gravidade
+        self.arrasto = arrasto
+        self.altura_chao = altura_chao
+        self.restituicao = restituicao
+        self.atrito_chao = atrito_chao
+        self.velocidade_repouso = velocidade_repouso
+        self.lei_escala = lei_escala
+        self.fator_escala = fator_escala
+        self.desvanecer = desvanecer
+        self.cintilacao = cintilacao
+        self.usar_rotacao = usar_rotacao
+
+        # Estado das partículas (um elemento por slot)
+        self.posicoes = np.zeros((capacidade, 3), dtype=np.float32)
+        self.velocidades = np.zeros((capacidade, 3), dtype=np.float32)
+        self.rotacoes = np.zeros((capacidade, 3), dtype=np.float32)
+        self.velocidades_rotacao = np.zeros((capacidade, 3), dtype=np.float32)
+        self.vida = np.zeros(capacidade, dtype=np.float32)
+        self.vida_inicial = np.ones(capacidade, dtype=np.float32)
+        self.escalas = np.zeros(capacidade, dtype=np.float32)
+        self.escalas_iniciais = np.zeros(capacidade, dtype=np.float32)
+        self.escalas_finais = np.zeros(capacidade, dtype=np.float32)
+        self.cores = np.ones((capacidade, 4), dtype=np.float32)
+        self.alpha_inicial = np.ones(capacidade, dtype=np.float32)
+        self.visiveis = np.ones(capacidade, dtype=bool)
+        self.ativas = np.zeros(capacidade, dtype=bool)
+        self.grupos = np.full(capacidade, -1, dtype=np.int32)
+
+        # NodePaths associados aos slots (opcional)
+        self.nodes = [None] * capacidade
+
+        # Callback chamado com o NodePath de cada partícula expirada
+        self.ao_expirar = None
+        
+        # Renderizador em lote (substitui os NodePaths individuais quando definido)
+        self.renderizador = None
+
+        # Agendador opcional que define de quantos em quantos frames cada
+        # partícula é atualizada (partículas distantes acumulam o dt)
+        self.agendador = None
+        self.dt_acumulado = np.zeros(capacidade, dtype=np.float32)
+        self.quadros_acumulados = np.zeros(capacidade, dtype=np.int32)
+        self._quadro = 0
+
+        # Pilha de slots livres (o topo é o menor índice)
+        self._livres = list(range(capacidade - 1, -1, -1))
+
+    @property
+    def num_ativas(self):
+        """
+        Número de partículas ativas.
+        """
+        return self.capacidade - len(self._livres)
+
+    @property
+    def num_livres(self):
+        """
+        Número de slots livres (partículas que ainda podem ser emitidas).
+        """
+        return len(self._livres)
+
+    def emitir(self, posicoes, velocidades, vida, escalas, cores, grupo=-1,
+               escalas_finais=None, rotacoes=None, velocidades_rotacao=None, nodes=None):
+        """
+        Emite um lote de partículas.
+
+        Args:
+            posicoes: Array (n, 3) com as posições iniciais.
+            velocidades: Array (n, 3) com as velocidades iniciais.
+            vida: Array (n,) com os tempos de vida em segundos.
+            escalas: Array (n,) com as escalas iniciais.
+            cores: Array (n, 4) com as cores RGBA iniciais.
+            grupo: Identificador do grupo (por exemplo, a explosão de origem).
+            escalas_finais: Array (n,) com a escala mínima da lei de decaimento.
+            rotacoes: Array (n, 3) com a rotação HPR inicial.
+            velocidades_rotacao: Array (n, 3) com a velocidade angular em graus/s.
+            nodes: Lista opcional de NodePaths para as partículas. Os que
+                   sobrarem por falta de capacidade são devolvidos como se
+                   tivessem expirado (ao_expirar ou removeNode).
+
+        Returns:
+            Array com os slots ocupados (pode ser menor que n se faltar capacidade).
+        """
+        n = min(len(vida), len(self._livres))
+        if nodes is not None:
+            for node in nodes[max(n, 0):]:
+                if self.ao_expirar:
+                    self.ao_expirar(node)
+                else:
+                    node.removeNode()
+        if n <= 0:
+            return np.zeros(0, dtype=np.int64)
+
+        slots = np.array(self._livres[-n:], dtype=np.int64)
+        del self._livres[-n:]
+
+        self.posicoes[slots] = posicoes[:n]
+        self.velocidades[slots] = velocidades[:n]
+        self.vida[slots] = vida[:n]
+        self.vida_inicial[slots] = vida[:n]
+        self.escalas[slots] = escalas[:n]
+        self.escalas_iniciais[slots] = escalas[:n]
+        self.escalas_finais[slots] = escalas_finais[:n] if escalas_finais is not None else 0.0
+        self.cores[slots] = cores[:n]
+        self.alpha_inicial[slots] = self.cores[slots, 3]
+        self.rotacoes[slots] = rotacoes[:n] if rotacoes is not None else 0.0
+        self.velocidades_rotacao[slots] = velocidades_rotacao[:n] if velocidades_rotacao is not None else 0.0
+        self.visiveis[slots] = True
+        self.ativas[slots] = True
+        self.grupos[slots] = grupo
+        self.dt_acumulado[slots] = 0.0
+        self.quadros_acumulados[slots] = 0
+
+        if nodes is not None:
+            for slot, node in zip(slots.tolist(), nodes):
+                self.nodes[slot] = node
+
+        return slots
+
+    def atualizar(self, dt):
+        """
+        Avança as partículas ativas em um único passo vetorizado e escreve o
+        resultado de volta na cena. Com um agendador definido, cada partícula
+        só é simulada no seu intervalo de frames, usando o dt acumulado.
+
+        Args:
+            dt: Delta time (tempo desde o último frame).
+        """
+        ativas = np.flatnonzero(self.ativas)
+        if ativas.size == 0:
+            return
+
+        self._quadro += 1
+        self.dt_acumulado[ativas] += dt
+        self.quadros_acumulados[ativas] += 1
+
+        # Seleciona as partículas com passo neste frame (intervalos escalonados
+        # pelo slot para distribuir o trabalho entre os frames)
+        if self.agendador is not None:
+            intervalos = self.agendador.intervalos(self.posicoes[ativas])
+            idx = ativas[(self._quadro + ativas) % intervalos == 0]
+        else:
+            idx = ativas
+
+        if idx.size == 0:
+            self._escrever(ativas, None, np.zeros(0, dtype=np.int64))
+            return
+
+        passo = self.dt_acumulado[idx]
+        quadros = self.quadros_acumulados[idx]
+        self.dt_acumulado[idx] = 0.0
+        self.quadros_acumulados[idx] = 0
+
+        vida = self.vida[idx] - passo
+
+        # Integra velocidade (gravidade e resistência do ar) e posição
+        vel = self.velocidades[idx]
+        vel[:, 2] += self.gravidade * passo
+        if self.arrasto != 1.0:
+            vel *= (self.arrasto ** quadros)[:, None]
+        pos = self.posicoes[idx] + vel * passo[:, None]
+
+        # Colisão com o chão: quica com perda de energia ou para
+        if self.altura_chao is not None:
+            abaixo = pos[:, 2] < self.altura_chao
+            if abaixo.any():
+                quica = abaixo & (np.abs(vel[:, 2]) > self.velocidade_repouso)
+                para = abaixo & ~quica
+                vel[quica, 2] *= -self.restituicao
+                vel[quica, :2] *= self.atrito_chao
+                vel[para] = 0.0
+                vida[para] -= passo[para] * 2.0
+                pos[abaixo, 2] = self.altura_chao
+
+        self.velocidades[idx] = vel
+        self.posicoes[idx] = pos
+        self.vida[idx] = vida
+
+        if self.usar_rotacao:
+            self.rotacoes[idx] += self.velocidades_rotacao[idx] * passo[:, None]
+
+        # Escala e transparência em função da vida restante
+        razao = np.clip(vida / self.vida_inicial[idx], 0.0, 1.0)
+        if self.lei_escala == self.ESCALA_DECAIMENTO:
+            self.escalas[idx] = np.maximum(self.escalas_finais[idx], self.escalas[idx] * self.fator_escala ** quadros)
+        elif self.lei_escala == self.ESCALA_PROPORCIONAL:
+            self.escalas[idx] = self.escalas_iniciais[idx] * razao
+        elif self.lei_escala == self.ESCALA_CRESCIMENTO:
+            self.escalas[idx] = self.escalas_iniciais[idx] * (2.0 - razao)
+        elif self.lei_escala == self.ESCALA_EXPANSAO:
+            self.escalas[idx] = self.escalas_iniciais[idx] * (1.5 - 0.5 * razao)
+
+        if self.desvanecer:
+            self.cores[idx, 3] = self.alpha_inicial[idx] * razao
+
+        # Pisca aleatoriamente para efeito de faiscamento
+        alternar = None
+        if self.cintilacao > 0.0:
+            alternar = idx[np.random.random(idx.size) < self.cintilacao]
+            self.visiveis[alternar] = ~self.visiveis[alternar]
+
+        # Libera as partículas expiradas
+        expiradas = idx[vida <= 0]
+        if expiradas.size:
+            self.liberar(expiradas)
+            idx = idx[vida > 0]
+            ativas = np.flatnonzero(self.ativas)
+
+        self._escrever(ativas, alternar, idx)
+
+    def _escrever(self, idx, alternar=None, alterados=None):
+        """
+        Escreve o estado das partículas na cena, pelo renderizador em lote
+        ou pelos NodePaths individuais.
+
+        Args:
+            idx: Slots ativos a escrever.
+            alternar: Slots cuja visibilidade mudou neste frame.
+            alterados: Slots simulados neste frame; apenas esses NodePaths
+                       precisam ser reescritos (padrão: todos de idx).
+        """
+        if self.renderizador is not None:
+            self.renderizador.desenhar(idx[self.visiveis[idx]])
+        else:
+            self._escrever_nodes(idx if alterados is None else alterados, alternar)
+
+    def _redesenhar(self):
+        """
+        Reescreve as partículas ativas após remoções fora do passo de simulação.
+        """
+        if self.renderizador is not None:
+            self._escrever(np.flatnonzero(self.ativas))
+
+    def _escrever_nodes(self, idx, alternar=None):
+        """
+        Escreve o estado das partículas nos NodePaths associados, em lote.
+
+        Args:
+            idx: Slots ativos a escrever.
+            alternar: Slots cuja visibilidade mudou neste frame.
+        """
+        if idx.size == 0:
+            return
+
+        nodes = self.nodes
+        slots = idx.tolist()
+        posicoes = self.posicoes[idx].tolist()
+        escalas = self.escalas[idx].tolist()
+        alphas = self.cores[idx, 3].tolist()
+
+        if self.usar_rotacao:
+            rotacoes = self.rotacoes[idx].tolist()
+        else:
+            rotacoes = [(0.0, 0.0, 0.0)] * len(slots)
+
+        for slot, (x, y, z), (h, p, r), s, a in zip(slots, posicoes, rotacoes, escalas, alphas):
+            node = nodes[slot]
+            if node is not None:
+                node.setPosHprScale(x, y, z, h, p, r, s, s, s)
+                if self.desvanecer:
+                    node.setAlphaScale(a)
+
+        if alternar is not None and alternar.size:
+            for slot in alternar.tolist():
+                node = nodes[slot]
+                if node is None or not self.ativas[slot]:
+                    continue
+                if self.visiveis[slot]:
+                    node.show()
+                else:
+                    node.hide()
+
+    def liberar(self, slots):
+        """
+        Libera slots, devolvendo-os à pilha de livres.
+
+        Args:
+            slots: Array ou lista de slots a liberar.
+        """
+        for slot in np.asarray(slots).tolist():
+            if not self.ativas[slot]:
+                continue
+            self.ativas[slot] = False
+            self.grupos[slot] = -1
+            node = self.nodes[slot]
+            if node is not None:
+                self.nodes[slot] = None
+                if self.ao_expirar:
+                    self.ao_expirar(node)
+                else:
+                    node.removeNode()
+            self._livres.append(slot)
+
+    def contar_grupo(self, grupo):
+        """
+        Retorna o número de partículas ativas de um grupo.
+
+        Args:
+            grupo: Identificador do grupo.
+        """
+        return int(np.count_nonzero(self.ativas & (self.grupos == grupo)))
+
+    def limitar_grupo(self, grupo, maximo):
+        """
+        Remove as partículas excedentes de um grupo.
+
+        Args:
+            grupo: Identificador do grupo.
+            maximo: Número máximo de partículas que o grupo pode manter.
+        """
+        slots = np.flatnonzero(self.ativas & (self.grupos == grupo))
+        if slots.size > maximo:
+            self.liberar(slots[maximo:])
+            self._redesenhar()
+
+    def limitar_total(self, maximo):
+        """
+        Remove as partículas mais próximas do fim da vida até restarem no máximo
+        'maximo' partículas ativas.
+
+        Args:
+            maximo: Número máximo de partículas ativas.
+        """
+        slots = np.flatnonzero(self.ativas)
+        if slots.size > maximo:
+            ordem = np.argsort(self.vida[slots])
+            self.liberar(slots[ordem[:slots.size - maximo]])
+            self._redesenhar()
+
+    def limpar(self):
+        """
+        Remove todas as partículas.
+        """
+        self.liberar(np.flatnonzero(self.ativas))
+        self._redesenhar()
+
+
+def _criar_forma(forma):
+    """
+    Cria a geometria base (vértices unitários e faces) de uma partícula.
+
+    Args:
+        forma: 'icosaedro' (aproximação de esfera) ou 'octaedro' (mais leve).
+
+    Returns:
+        Tupla (vertices, faces) com arrays NumPy.
+    """
+    if forma == 'octaedro':
+        vertices = np.array([
+            (1, 0, 0), (-1, 0, 0), (0, 1, 0), (0, -1, 0), (0, 0, 1), (0, 0, -1)
+        ], dtype=np.float32)
+        faces = np.array([
+            (0, 2, 4), (2, 1, 4), (1, 3, 4), (3, 0, 4),
+            (2, 0, 5), (1, 2, 5), (3, 1, 5), (0, 3, 5)
+        ], dtype=np.uint32)
+        return vertices, faces
+
+    fi = (1.0 + 5.0 ** 0.5) / 2.0
+    vertices = np.array([
+        (-1, fi, 0), (1, fi, 0), (-1, -fi, 0), (1, -fi, 0),
+        (0, -1, fi), (0, 1, fi), (0, -1, -fi), (0, 1, -fi),
+        (fi, 0, -1), (fi, 0, 1), (-fi, 0, -1), (-fi, 0, 1)
+    ], dtype=np.float32)
+    vertices /= np.linalg.norm(vertices, axis=1)[:, None]
+    faces = np.array([
+        (0, 11, 5), (0, 5, 1), (0, 1, 7), (0, 7, 10), (0, 10, 11),
+        (1, 5, 9), (5, 11, 4), (11, 10, 2), (10, 7, 6), (7, 1, 8),
+        (3, 9, 4), (3, 4, 2), (3, 2, 6), (3, 6, 8), (3, 8, 9),
+        (4, 9, 5), (2, 4, 11), (6, 2, 10), (8, 6, 7), (9, 8, 1)
+    ], dtype=np.uint32)
+    return vertices, faces
+
+
+def _matrizes_hpr(hpr):
+    """
+    Converte um array (n, 3) de ângulos HPR em graus para matrizes de rotação
+    (n, 3, 3), na convenção de vetores-linha do Panda3D (roll, pitch, heading).
+
+    Args:
+        hpr: Array (n, 3) com heading, pitch e roll.
+    """
+    h, p, r = np.radians(hpr).T
+    ch, sh = np.cos(h), np.sin(h)
+    cp, sp = np.cos(p), np.sin(p)
+    cr, sr = np.cos(r), np.sin(r)
+
+    # Composição R_roll * R_pitch * R_heading expandida
+    m = np.empty((len(h), 3, 3), dtype=np.float32)
+    m[:, 0, 0] = cr * ch - sr * sp * sh
+    m[:, 0, 1] = cr * sh + sr * sp * ch
+    m[:, 0, 2] = -sr * cp
+    m[:, 1, 0] = -cp * sh
+    m[:, 1, 1] = cp * ch
+    m[:, 1, 2] = sp
+    m[:, 2, 0] = sr * ch + cr * sp * sh
+    m[:, 2, 1] = sr * sh - cr * sp * ch
+    m[:, 2, 2] = cr * cp
+    return m
+
+
+class RenderizadorParticulas:
+    """
+    Renderizador em lote para um MotorParticulas.
+
+    Desenha todas as partículas vivas do motor como um único Geom: os vértices
+    de cada partícula são gerados a partir de uma forma base (icosaedro ou
+    octaedro) e reescritos diretamente no GeomVertexData a cada frame, com
+    uma única chamada de desenho por tipo de partícula.
+    """
+
+    def __init__(self, motor, node_pai, forma='icosaedro', nome='particulas'):
+        """
+        Inicializa o renderizador e se registra no motor.
+
+        Args:
+            motor: MotorParticulas cujas partículas serão desenhadas.
+            node_pai: Nó pai para o GeomNode do lote.
+            forma: Forma base de cada partícula ('icosaedro' ou 'octaedro').
+            nome: Nome do GeomNode.
+        """
+        self.motor = motor
+        self.vertices_base, faces = _criar_forma(forma)
+        self.vertices_por_particula = len(self.vertices_base)
+        self._num_desenhadas = 0
+
+        capacidade = motor.capacidade
+        num_vertices = capacidade * self.vertices_por_particula
+
+        # Formato com arrays separados para escrita direta via NumPy
+        formato = GeomVertexFormat()
+        for coluna, contents in ((InternalName.getVertex(), Geom.C_point),
+                                 (InternalName.getNormal(), Geom.C_normal)):
+            array = GeomVertexArrayFormat()
+            array.addColumn(coluna, 3, Geom.NT_float32, contents)
+            formato.addArray(array)
+        array = GeomVertexArrayFormat()
+        array.addColumn(InternalName.getColor(), 4, Geom.NT_float32, Geom.C_color)
+        formato.addArray(array)
+        formato = GeomVertexFormat.registerFormat(formato)
+
+        self.vdata = GeomVertexData(nome, formato, Geom.UHDynamic)
+        self.vdata.setNumRows(num_vertices)
+        self._array(0)[:] = 0.0
+        self._array(1)[:] = np.tile(self.vertices_base, (capacidade, 1))
+        self._array(2)[:] = 0.0
+
+        # Índices estáticos: a mesma forma repetida para toda a capacidade
+        triangulos = GeomTriangles(Geom.UHStatic)
+        triangulos.setIndexType(Geom.NT_uint16 if num_vertices <= 0xffff else Geom.NT_uint32)
+        indices = faces[None, :, :] + (np.arange(capacidade, dtype=np.uint32) * self.vertices_por_particula)[:, None, None]
+        lista_indices = triangulos.modifyVertices()
+        lista_indices.setNumRows(indices.size)
+        np.asarray(memoryview(lista_indices))[:] = indices.reshape(-1)
+
+        geom = Geom(self.vdata)
+        geom.addPrimitive(triangulos)
+        geom_node = GeomNode(nome)
+        geom_node.addGeom(geom)
+
+        # As partículas se espalham pela cena; evita recalcular limites por frame
+        geom_node.setBounds(OmniBoundingVolume())
+        geom_node.setFinal(True)
+
+        self.node = node_pai.attachNewNode(geom_node)
+        motor.renderizador = self
+
+    def _array(self, indice):
+        """
+        Retorna uma visão NumPy (n, colunas) gravável de um array de vértices.
+
+        Args:
+            indice: Índice do array no GeomVertexData (0 posição, 1 normal, 2 cor).
+        """
+        colunas = 4 if indice == 2 else 3
+        dados = np.frombuffer(memoryview(self.vdata.modifyArray(indice)), dtype=np.float32)
+        return dados.reshape(-1, colunas)
+
+    def desenhar(self, idx):
+        """
+        Reescreve o lote com as partículas dos slots indicados.
+
+        Args:
+            idx: Slots das partículas visíveis.
+        """
+        motor = self.motor
+        v = self.vertices_por_particula
+        k = idx.size
+        fim = k * v
+
+        if k:
+            escalas = motor.escalas[idx][:, None, None]
+            if motor.usar_rotacao:
+                rotacoes = _matrizes_hpr(motor.rotacoes[idx])
+                forma = np.einsum('vj,kjl->kvl', self.vertices_base, rotacoes)
+                self._array(1)[:fim] = forma.reshape(-1, 3)
+            else:
+                forma = self.vertices_base[None, :, :]
+
+            posicoes = self._array(0)
+            posicoes[:fim] = (forma * escalas + motor.posicoes[idx][:, None, :]).reshape(-1, 3)
+            cores = self._array(2)
+            cores[:fim] = np.repeat(motor.cores[idx], v, axis=0)
+
+        # Colapsa as partículas que deixaram de ser desenhadas
+        if self._num_desenhadas > k:
+            self._array(0)[fim:self._num_desenhadas * v] = 0.0
+        self._num_desenhadas = k
@@ -7,6 +7,7 @@ Permite reutilizar objetos para melhorar o desempenho.
 
 from panda3d.core import NodePath
 import weakref
+from src.modelos import obter_biblioteca
 
 class ObjectPool:
     """
@@ -131,8 +132,7 @@ class ParticlePool:
         
         # Função de fábrica para criar novas partículas
         def create_particle():
-            particle = self.game.loader.loadModel(model_path)
-            particle.reparentTo(parent_node)
+            particle = obter_biblioteca(self.game).instanciar(model_path, parent_node)
             particle.hide()  # Inicia escondida
             # Configura transparência
             particle.setTransparency(1)
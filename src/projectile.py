@@ -4,15 +4,25 @@
 Gorillas 3D War - Módulo para projéteis
 """
 from panda3d.core import NodePath, CollisionSphere, CollisionNode
-from panda3d.core import LPoint3, LVector3, LineSegs, BitMask32, CollisionRay
+from panda3d.core import LPoint3, LVector3, BitMask32, CollisionRay
 from panda3d.core import TransparencyAttrib, TextureStage, ColorBlendAttrib
 import math
 import random
+from src.modelos import obter_biblioteca
+from src.linhas import LinhaDinamica
+from src.projeteis import GerenciadorProjeteis, obter_gerenciador_projeteis
 
 class Banana:
     """
     Classe que representa uma banana (projétil) no jogo.
+    
+    A física fica no GerenciadorProjeteis, que avança e testa as colisões de
+    todos os projéteis em lote; a banana ocupa um slot do gerenciador e
+    cuida apenas do modelo, do brilho, da trajetória e do rastro.
     """
+    # Raio da esfera de colisão da banana
+    RAIO = GerenciadorProjeteis.RAIO
+    
     def __init__(self, game, posicao, angulo_horizontal, angulo_vertical, forca):
         """
         Inicializa uma banana.
@@ -41,18 +51,22 @@ class Banana:
         # Configura colisões
         self.configurar_colisoes()
         
-        # Trajetória para efeito visual
-        self.trajetoria = []
+        # Trajetória para efeito visual (buffer circular de pontos)
         self.max_pontos_trajetoria = 50
-        self.linha_trajetoria = None
+        self.linha_trajetoria = LinhaDinamica(
+            game.render, self.max_pontos_trajetoria, (1.0, 1.0, 0.0),
+            alpha_maximo=0.5, espessura=2.0, nome='trajetoria_banana'
+        )
+        
+        # Rastro brilhante curto logo atrás da banana
+        self.rastro = None
+        if hasattr(game, 'efeitos'):
+            self.rastro = game.efeitos.criar_rastro_projetil()
         
         # Rotação da banana
         self.rotacao = 0
         self.velocidade_rotacao = random.uniform(5, 15)
         
-        # Tempo de vida da banana (para evitar que fique para sempre no mundo)
-        self.tempo_vida = 15.0  # segundos
-        
     def criar_modelo(self):
         """
         Cria o modelo 3D da banana.
@@ -68,21 +82,19 @@ class Banana:
         
         # Criamos uma forma curva de banana usando várias esferas
         # Parte central da banana
-        centro = self.game.loader.loadModel("models/misc/sphere")
-        centro.reparentTo(self.corpo)
+        modelos = obter_biblioteca(self.game)
+        centro = modelos.instanciar("models/misc/sphere", self.corpo)
         centro.setScale(0.3, 0.5, 0.25)
         centro.setColor(*cor_banana)
         
         # Ponta da banana (mais fina)
-        ponta1 = self.game.loader.loadModel("models/misc/sphere")
-        ponta1.reparentTo(self.corpo)
+        ponta1 = modelos.instanciar("models/misc/sphere", self.corpo)
         ponta1.setPos(0.4, 0, 0.1)
         ponta1.setScale(0.15, 0.25, 0.15)
         ponta1.setColor(*cor_banana)
         
         # Outra ponta da banana
-        ponta2 = self.game.loader.loadModel("models/misc/sphere")
-        ponta2.reparentTo(self.corpo)
+        ponta2 = modelos.instanciar("models/misc/sphere", self.corpo)
         ponta2.setPos(-0.4, 0, 0.1)
         ponta2.setScale(0.15, 0.25, 0.15)
         ponta2.setColor(*cor_banana)
@@ -114,19 +126,45 @@ class Banana:
         vy = velocidade_base * math.cos(ang_v_rad) * math.sin(ang_h_rad)
         vz = velocidade_base * math.sin(ang_v_rad)
         
-        # Define a velocidade inicial
-        self.velocidade = LVector3(vx, vy, vz)
+        # Ocupa um slot do gerenciador, desenhado pelo próprio modelo
+        self.gerenciador = obter_gerenciador_projeteis(self.game)
+        self.slot = self.gerenciador.lancar(
+            self.posicao_inicial, (vx, vy, vz), tempo_vida=15.0, em_lote=False
+        )
         
-        # Armazena a posição atual como um LPoint3
-        self.posicao = LPoint3(self.posicao_inicial)
+    @property
+    def posicao(self):
+        """
+        Posição atual da banana.
+        """
+        if self.slot is None:
+            return LPoint3(self.posicao_inicial)
+        return self.gerenciador.posicao(self.slot)
+    
+    @property
+    def velocidade(self):
+        """
+        Velocidade atual da banana.
+        """
+        if self.slot is None:
+            return LVector3(0, 0, 0)
+        return LVector3(*self.gerenciador.velocidade(self.slot))
+    
+    @property
+    def impacto(self):
+        """
+        Dados do impacto ('tipo', 'objeto', 'ponto', 'tempo') ou None.
+        """
+        if self.slot is None:
+            return None
+        return self.gerenciador.impactos.get(self.slot)
         
     def criar_efeito_brilho(self):
         """
         Adiciona um efeito de brilho à banana para destacá-la.
         """
         # Cria uma esfera maior e semitransparente para o efeito de brilho
-        glow = self.game.loader.loadModel("models/misc/sphere")
-        glow.reparentTo(self.corpo)
+        glow = obter_biblioteca(self.game).instanciar("models/misc/sphere", self.corpo, "brilho")
         glow.setScale(1.5)  # Maior que a banana
         glow.setTransparency(TransparencyAttrib.MAlpha)
         glow.setColor(1.0, 1.0, 0.5, 0.3)  # Amarelo semitransparente
@@ -157,53 +195,36 @@ class Banana:
         # Torna a colisão invisível em tempo de execução
         self.coll_node_path.hide()
         
-    def atualizar(self, gravidade, vento):
+    def atualizar(self):
         """
-        Atualiza a posição e velocidade da banana.
-        
-        Args:
-            gravidade: Vetor de gravidade.
-            vento: Vetor de vento.
+        Atualiza o modelo da banana a partir do estado do seu slot (a física
+        já foi avançada pelo GerenciadorProjeteis neste frame).
             
         Returns:
             String indicando o estado da banana:
             - 'ativo': A banana ainda está em movimento.
-            - 'colisao': A banana colidiu com algo.
+            - 'colisao': A banana colidiu com algo (detalhes em self.impacto).
             - 'fora_limites': A banana saiu dos limites do mundo.
         """
-        # Atualiza o tempo de vida
-        self.tempo_vida -= self.game.taskMgr.globalClock.getDt()
-        if self.tempo_vida <= 0:
+        if self.slot is None:
             return 'fora_limites'
         
-        # Atualiza a velocidade considerando gravidade e vento
-        self.velocidade += gravidade * self.game.taskMgr.globalClock.getDt()
-        self.velocidade += vento * self.game.taskMgr.globalClock.getDt() * 0.3  # Reduz o efeito do vento
-        
-        # Atualiza a posição
-        self.posicao += self.velocidade * self.game.taskMgr.globalClock.getDt()
+        estado = self.gerenciador.estados[self.slot]
         
         # Atualiza o nó com a nova posição
         self.node.setPos(self.posicao)
+        self.atualizar_linha_trajetoria()
+        
+        if estado == GerenciadorProjeteis.COLISAO:
+            return 'colisao'
+        if estado == GerenciadorProjeteis.FORA_LIMITES:
+            return 'fora_limites'
         
         # Atualiza a rotação
         self.rotacao += self.velocidade_rotacao
         self.node.setH(self.rotacao)
         self.node.setP(self.rotacao * 0.5)
         self.node.setR(self.rotacao * 0.3)
-        
-        # Armazena o ponto na trajetória
-        self.trajetoria.append(LPoint3(self.posicao))
-        if len(self.trajetoria) > self.max_pontos_trajetoria:
-            self.trajetoria.pop(0)
-            
-        # Atualiza a linha da trajetória
-        self.atualizar_linha_trajetoria()
-        
-        # Cria partículas de rastro
-        if hasattr(self.game, 'efeitos'):
-            if random.random() < 0.3:  # Reduz a frequência para melhorar desempenho
-                self.game.efeitos.criar_rastro_banana(self.posicao)
                 
         # Pulsa o efeito de brilho
         if hasattr(self, 'glow'):
@@ -211,50 +232,18 @@ class Banana:
             tempo = self.game.taskMgr.globalClock.getFrameTime()
             fator_escala = 1.0 + 0.2 * math.sin(tempo * 5.0)
             self.glow.setScale(1.5 * fator_escala)
-        
-        # Verifica colisões
-        # Em uma implementação completa, verificaríamos colisões com a cidade
-        # usando o sistema de colisão do Panda3D
-        
-        # Verifica se saiu dos limites do mundo
-        limite = 200  # unidades
-        if (abs(self.posicao.getX()) > limite or 
-            abs(self.posicao.getY()) > limite or 
-            self.posicao.getZ() < -10 or
-            self.posicao.getZ() > limite):
-            return 'fora_limites'
-            
-        # Verifica se está muito próximo do chão
-        if self.posicao.getZ() < 0.5:
-            return 'colisao'
             
         return 'ativo'
         
     def atualizar_linha_trajetoria(self):
         """
-        Atualiza a linha visual que representa a trajetória da banana.
+        Adiciona a posição atual à linha da trajetória e ao rastro.
+        Os pontos mais antigos são sobrescritos e desvanecem.
         """
-        # Remove a linha antiga se existir
-        if self.linha_trajetoria:
-            self.linha_trajetoria.removeNode()
-            
-        # Se não há pontos suficientes, não desenha
-        if len(self.trajetoria) < 2:
-            return
-            
-        # Cria uma nova linha
-        ls = LineSegs()
-        ls.setColor(1.0, 1.0, 0.0, 0.5)  # Amarelo semi-transparente
-        ls.setThickness(2.0)
-        
-        # Adiciona os pontos da trajetória
-        ls.moveTo(self.trajetoria[0])
-        for ponto in self.trajetoria[1:]:
-            ls.drawTo(ponto)
-            
-        # Cria o node path da linha
-        linha_node = ls.create()
-        self.linha_trajetoria = self.game.render.attachNewNode(linha_node)
+        self.linha_trajetoria.adicionar_ponto(self.posicao)
+        
+        if self.rastro:
+            self.rastro.adicionar_ponto(self.posicao)
         
     def verificar_colisao_com(self, outro_node):
         """
@@ -333,9 +322,16 @@ class Banana:
         """
         Remove a banana do mundo.
         """
-        # Remove a linha da trajetória
-        if self.linha_trajetoria:
-            self.linha_trajetoria.removeNode()
+        # Devolve o slot ao gerenciador
+        if self.slot is not None:
+            self.gerenciador.liberar(self.slot)
+            self.slot = None
+        
+        # Remove a linha da trajetória e devolve o rastro
+        self.linha_trajetoria.remover()
+        if self.rastro:
+            self.game.efeitos.liberar_rastro(self.rastro)
+            self.rastro = None
         
         # Remove do sistema de colisão
         if hasattr(self, 'coll_node_path'):
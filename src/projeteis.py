@@ -0,0 +1,546 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Gorillas 3D War - Gerenciador de projéteis em lote
+Mantém todos os projéteis em voo em arrays NumPy e avança, testa colisões e
+desenha todos de uma vez por frame.
+"""
+import math
+import numpy as np
+from panda3d.core import LPoint3
+
+from src.particulas import RenderizadorParticulas
+
+
+class GerenciadorProjeteis:
+    """
+    Gerenciador de projéteis em estrutura de arrays (SoA).
+
+    Cada projétil ocupa um slot com origem, velocidade inicial e tempo do
+    arco balístico atual; a posição é calculada de forma analítica
+    (p0 + v0·t + ½·a·t²) e a colisão é um teste contínuo da esfera do
+    projétil contra o chão, os prédios (caixas da grade da cidade) e os
+    gorilas, feito para todos os slots com operações vetorizadas.
+
+    Os projéteis marcados como 'em lote' são desenhados por um único
+    RenderizadorParticulas; a banana do jogador (Banana) tem modelo próprio
+    e usa o gerenciador só para a física.
+    """
+    # Estados dos slots
+    ATIVO = 0
+    COLISAO = 1
+    FORA_LIMITES = 2
+
+    # Tipos de impacto
+    TIPOS_IMPACTO = ('chao', 'predio', 'gorila')
+
+    # Raio da esfera de colisão dos projéteis
+    RAIO = 0.5
+
+    # Raio de colisão dos gorilas (somado ao do projétil dá 1.5)
+    RAIO_GORILA = 1.0
+
+    # Desvio máximo entre a parábola e o segmento testado em um frame
+    TOLERANCIA_ARCO = 0.1
+
+    # Limites do mundo quando a cidade não informa os seus
+    LIMITE_HORIZONTAL = 200.0
+    LIMITE_INFERIOR = -10.0
+    LIMITE_SUPERIOR = 200.0
+
+    def __init__(self, game, capacidade=512):
+        """
+        Inicializa o gerenciador.
+
+        Args:
+            game: Referência ao jogo principal.
+            capacidade: Número máximo de projéteis simultâneos.
+        """
+        self.game = game
+        self.capacidade = capacidade
+
+        # Arco balístico de cada slot
+        self.origens = np.zeros((capacidade, 3), dtype=np.float64)
+        self.velocidades_iniciais = np.zeros((capacidade, 3), dtype=np.float64)
+        self.tempos = np.zeros(capacidade, dtype=np.float64)
+        self.tempos_voo = np.zeros(capacidade, dtype=np.float64)
+        self.vida = np.zeros(capacidade, dtype=np.float64)
+        self.aceleracao = np.zeros(3, dtype=np.float64)
+
+        # Estado de cada slot
+        self.ativos = np.zeros(capacidade, dtype=bool)
+        self.estados = np.zeros(capacidade, dtype=np.int8)
+        self.em_lote = np.zeros(capacidade, dtype=bool)
+        self.liberar_automatico = np.zeros(capacidade, dtype=bool)
+        self.notificados = np.zeros(capacidade, dtype=bool)
+
+        # Atributos lidos pelo RenderizadorParticulas
+        self.posicoes = np.zeros((capacidade, 3), dtype=np.float32)
+        self.rotacoes = np.zeros((capacidade, 3), dtype=np.float32)
+        self.velocidades_rotacao = np.zeros((capacidade, 3), dtype=np.float32)
+        self.escalas = np.full(capacidade, 0.35, dtype=np.float32)
+        self.cores = np.tile(np.array([1.0, 0.9, 0.0, 1.0], dtype=np.float32), (capacidade, 1))
+        self.usar_rotacao = True
+        self.renderizador = None
+
+        # Impactos (slot -> dicionário) e callbacks de fim de voo
+        self.impactos = {}
+        self.ao_terminar = {}
+
+        # Pilha de slots livres (o topo é o menor índice)
+        self._livres = list(range(capacidade - 1, -1, -1))
+
+        # Cópia em arrays das caixas da grade da cidade
+        self._grade = None
+        self._versao_grade = None
+        self._caixas_min = np.zeros((0, 3))
+        self._caixas_max = np.zeros((0, 3))
+        self._caixas_objetos = []
+
+        # Células da grade em formato compacto: chaves ordenadas e, para cada
+        # uma, o intervalo [início, fim) dos índices de caixa em _caixas_celulas
+        self._chaves_celulas = np.zeros(0, dtype=np.int64)
+        self._inicio_celulas = np.zeros(0, dtype=np.int64)
+        self._fim_celulas = np.zeros(0, dtype=np.int64)
+        self._caixas_celulas = np.zeros(0, dtype=np.int64)
+        self._extremos_celulas = np.zeros((2, 2), dtype=np.int64)
+
+        # Desenho em lote dos projéteis sem modelo próprio
+        RenderizadorParticulas(self, game.render, forma='octaedro', nome='projeteis_lote')
+        self.renderizador.node.setLightOff()
+
+    @property
+    def num_ativos(self):
+        """
+        Número de slots ocupados.
+        """
+        return self.capacidade - len(self._livres)
+
+    def lancar(self, posicao, velocidade, tempo_vida=15.0, em_lote=True,
+               ao_terminar=None, liberar_automatico=False):
+        """
+        Lança um projétil.
+
+        Args:
+            posicao: Posição inicial.
+            velocidade: Velocidade inicial.
+            tempo_vida: Tempo máximo de voo em segundos.
+            em_lote: Se True, o projétil é desenhado pelo lote.
+            ao_terminar: Função chamada com (slot, estado, impacto) quando o
+                         voo termina.
+            liberar_automatico: Se True, o slot é liberado ao terminar o voo.
+
+        Returns:
+            Slot do projétil ou None se não houver slot livre.
+        """
+        slots = self.lancar_lote(
+            np.asarray([tuple(posicao)], dtype=np.float64),
+            np.asarray([tuple(velocidade)], dtype=np.float64),
+            tempo_vida, em_lote, ao_terminar, liberar_automatico
+        )
+        return slots[0] if slots else None
+
+    def lancar_lote(self, posicoes, velocidades, tempo_vida=15.0, em_lote=True,
+                    ao_terminar=None, liberar_automatico=True):
+        """
+        Lança vários projéteis de uma vez (armas de fragmentação, chuva de
+        bananas...).
+
+        Args:
+            posicoes: Array (n, 3) com as posições iniciais.
+            velocidades: Array (n, 3) com as velocidades iniciais.
+            tempo_vida: Tempo máximo de voo em segundos.
+            em_lote: Se True, os projéteis são desenhados pelo lote.
+            ao_terminar: Função chamada com (slot, estado, impacto) para
+                         cada projétil que termina o voo.
+            liberar_automatico: Se True, os slots são liberados ao terminar.
+
+        Returns:
+            Lista com os slots lançados (pode ser menor que n se faltar espaço).
+        """
+        n = min(len(posicoes), len(self._livres))
+        if n == 0:
+            return []
+
+        slots = np.array([self._livres.pop() for _ in range(n)], dtype=np.int64)
+
+        # Os arcos de todos os slots começam em tempo 0 com a aceleração atual
+        self.origens[slots] = posicoes[:n]
+        self.velocidades_iniciais[slots] = velocidades[:n]
+        self.tempos[slots] = 0.0
+        self.tempos_voo[slots] = 0.0
+        self.vida[slots] = tempo_vida
+        self.posicoes[slots] = posicoes[:n]
+        self.rotacoes[slots] = 0.0
+        self.velocidades_rotacao[slots] = np.random.uniform(300.0, 900.0, (n, 3))
+
+        self.ativos[slots] = True
+        self.estados[slots] = self.ATIVO
+        self.em_lote[slots] = em_lote
+        self.liberar_automatico[slots] = liberar_automatico
+        self.notificados[slots] = False
+
+        slots = slots.tolist()
+        if ao_terminar is not None:
+            for slot in slots:
+                self.ao_terminar[slot] = ao_terminar
+        return slots
+
+    def liberar(self, slot):
+        """
+        Libera o slot de um projétil.
+
+        Args:
+            slot: Slot do projétil.
+        """
+        if not self.ativos[slot]:
+            return
+        self.ativos[slot] = False
+        self.impactos.pop(slot, None)
+        self.ao_terminar.pop(slot, None)
+        self._livres.append(slot)
+
+    def limpar(self):
+        """
+        Libera todos os slots.
+        """
+        for slot in np.flatnonzero(self.ativos).tolist():
+            self.liberar(slot)
+        self._desenhar()
+
+    def posicao(self, slot):
+        """
+        Retorna a posição de um projétil como LPoint3.
+        """
+        return LPoint3(*self.posicoes[slot])
+
+    def velocidade(self, slot):
+        """
+        Retorna a velocidade de um projétil.
+        """
+        return self.velocidades_iniciais[slot] + self.aceleracao * self.tempos[slot]
+
+    def atualizar(self, dt, gravidade, vento):
+        """
+        Avança todos os projéteis ativos e testa suas colisões.
+
+        Args:
+            dt: Delta time (tempo desde o último frame).
+            gravidade: Vetor de gravidade.
+            vento: Vetor de vento (aplicado com 30% do efeito).
+
+        Returns:
+            Lista dos slots cujo voo terminou neste frame.
+        """
+        aceleracao = np.array(tuple(gravidade), dtype=np.float64) + np.array(tuple(vento)) * 0.3
+        idx = np.flatnonzero(self.ativos & (self.estados == self.ATIVO))
+
+        # Nova aceleração: todos os arcos recomeçam no estado atual
+        if not np.array_equal(aceleracao, self.aceleracao):
+            t = self.tempos[idx][:, None]
+            self.origens[idx] = self._arco(idx, self.tempos[idx])
+            self.velocidades_iniciais[idx] += self.aceleracao * t
+            self.tempos[idx] = 0.0
+            self.aceleracao = aceleracao
+
+        if idx.size == 0:
+            self._desenhar()
+            return []
+
+        # Tempo de vida esgotado
+        self.vida[idx] -= dt
+        expirados = idx[self.vida[idx] <= 0.0]
+        self.estados[expirados] = self.FORA_LIMITES
+        idx = idx[self.vida[idx] > 0.0]
+
+        # Divide o frame em segmentos curtos o bastante para acompanhar a curva
+        desvio = np.linalg.norm(self.aceleracao) * dt * dt / 8.0
+        segmentos = max(1, math.ceil(math.sqrt(desvio / self.TOLERANCIA_ARCO)))
+
+        t0 = self.tempos[idx]
+        anterior = self._arco(idx, t0)
+        voando = np.ones(idx.size, dtype=bool)
+        tempo_anterior = t0
+        for k in range(1, segmentos + 1):
+            tempo = t0 + dt * k / segmentos
+            atual = self._arco(idx, tempo)
+
+            fracoes, tipos, objetos = self._varrer(anterior[voando], atual[voando])
+            atingidos = np.flatnonzero(voando)[np.isfinite(fracoes)]
+            if atingidos.size:
+                f = fracoes[np.isfinite(fracoes)]
+                pontos = anterior[atingidos] + (atual[atingidos] - anterior[atingidos]) * f[:, None]
+                tempos_impacto = tempo_anterior[atingidos] + (tempo[atingidos] - tempo_anterior[atingidos]) * f
+                tipos_atingidos = tipos[np.isfinite(fracoes)]
+                objetos_atingidos = [o for o, ok in zip(objetos, np.isfinite(fracoes)) if ok]
+
+                for j, i in enumerate(atingidos.tolist()):
+                    slot = int(idx[i])
+                    self.tempos_voo[slot] += tempos_impacto[j] - t0[i]
+                    self.impactos[slot] = {
+                        'tipo': self.TIPOS_IMPACTO[tipos_atingidos[j]],
+                        'objeto': objetos_atingidos[j],
+                        'ponto': LPoint3(*pontos[j]),
+                        'tempo': float(self.tempos_voo[slot])
+                    }
+                    self.posicoes[slot] = pontos[j]
+                self.estados[idx[atingidos]] = self.COLISAO
+                voando[atingidos] = False
+
+            anterior = atual
+            tempo_anterior = tempo
+
+        # Projéteis que continuam voando
+        livres = idx[voando]
+        self.tempos[livres] += dt
+        self.tempos_voo[livres] += dt
+        self.posicoes[livres] = anterior[voando]
+        self.rotacoes[livres] += self.velocidades_rotacao[livres] * dt
+
+        p = self.posicoes[livres]
+        minimo, maximo = self._limites()
+        fora = np.any((p < minimo) | (p > maximo), axis=1)
+        self.estados[livres[fora]] = self.FORA_LIMITES
+
+        self._desenhar()
+        return self._finalizar_voos()
+
+    def _limites(self):
+        """
+        Limites do mundo da cidade atual, ou os padrão da classe.
+
+        Returns:
+            (mínimo, máximo) como arrays de 3 coordenadas.
+        """
+        cidade = getattr(self.game, 'gerador_cidade', None)
+        if cidade is not None and hasattr(cidade, 'limites'):
+            minimo, maximo = cidade.limites()
+        else:
+            minimo = (-self.LIMITE_HORIZONTAL, -self.LIMITE_HORIZONTAL, self.LIMITE_INFERIOR)
+            maximo = (self.LIMITE_HORIZONTAL, self.LIMITE_HORIZONTAL, self.LIMITE_SUPERIOR)
+        return np.asarray(minimo, dtype=np.float64), np.asarray(maximo, dtype=np.float64)
+
+    def _arco(self, idx, tempos):
+        """
+        Posições analíticas dos slots indicados nos tempos indicados.
+        """
+        t = tempos[:, None]
+        return self.origens[idx] + self.velocidades_iniciais[idx] * t + self.aceleracao * (0.5 * t * t)
+
+    def _finalizar_voos(self):
+        """
+        Chama os callbacks dos voos que terminaram e libera os slots
+        automáticos.
+
+        Returns:
+            Lista dos slots cujo voo terminou neste frame.
+        """
+        terminados = np.flatnonzero(self.ativos & (self.estados != self.ATIVO) & ~self.notificados)
+        terminados = terminados.tolist()
+        for slot in terminados:
+            self.notificados[slot] = True
+            callback = self.ao_terminar.get(slot)
+            if callback is not None:
+                callback(slot, int(self.estados[slot]), self.impactos.get(slot))
+            if self.liberar_automatico[slot]:
+                self.liberar(slot)
+        return terminados
+
+    def _desenhar(self):
+        """
+        Reescreve o lote com os projéteis em voo desenhados em lote.
+        """
+        self.renderizador.desenhar(np.flatnonzero(self.ativos & self.em_lote & (self.estados == self.ATIVO)))
+
+    def _atualizar_caixas(self):
+        """
+        Copia para arrays as caixas dos prédios quando a grade muda.
+        """
+        cidade = getattr(self.game, 'gerador_cidade', None)
+        if cidade is None:
+            return
+        grade = cidade.grade
+        if grade is self._grade and grade.versao == self._versao_grade:
+            return
+
+        self._grade = grade
+        self._versao_grade = grade.versao
+        self._caixas_objetos = list(grade.objetos)
+        limites = [grade.limites(o) for o in self._caixas_objetos]
+        self._caixas_min = np.array([l[0] for l in limites], dtype=np.float64).reshape(-1, 3)
+        self._caixas_max = np.array([l[1] for l in limites], dtype=np.float64).reshape(-1, 3)
+
+        indices = {objeto: i for i, objeto in enumerate(self._caixas_objetos)}
+        celulas = sorted(grade.celulas.items(), key=lambda item: self._chave_celula(*item[0]))
+        contagens = np.array([len(objetos) for _, objetos in celulas], dtype=np.int64)
+        self._chaves_celulas = np.array([self._chave_celula(*celula) for celula, _ in celulas], dtype=np.int64)
+        self._fim_celulas = np.cumsum(contagens)
+        self._inicio_celulas = self._fim_celulas - contagens
+        self._caixas_celulas = np.array([indices[objeto] for _, objetos in celulas for objeto in objetos],
+                                        dtype=np.int64)
+        if celulas:
+            coordenadas = np.array([celula for celula, _ in celulas], dtype=np.int64)
+            self._extremos_celulas = np.array([coordenadas.min(axis=0), coordenadas.max(axis=0)])
+
+    @staticmethod
+    def _chave_celula(ix, iy):
+        """
+        Chave inteira única de uma célula (ix, iy) da grade.
+        """
+        return ix * (1 << 32) + iy
+
+    def _pares_candidatos(self, seg_min, seg_max):
+        """
+        Fase ampla pela grade: pares (projétil, caixa) que dividem alguma
+        célula com a caixa envolvente do segmento e cujas caixas se tocam.
+
+        Args:
+            seg_min: Cantos mínimos (m, 3) das caixas dos segmentos.
+            seg_max: Cantos máximos (m, 3) das caixas dos segmentos.
+
+        Returns:
+            (índices dos projéteis, índices das caixas).
+        """
+        vazio = np.zeros(0, dtype=np.int64)
+        if not len(self._chaves_celulas):
+            return vazio, vazio
+
+        # Células cobertas por cada segmento (em geral uma só, pois os
+        # segmentos de um frame são curtos), recortadas à área ocupada da
+        # grade; segmentos fora dela ou inválidos ficam com vão negativo
+        lado = self._grade.tamanho_celula
+        menor, maior = self._extremos_celulas
+        with np.errstate(invalid='ignore'):
+            c0 = np.clip(np.nan_to_num(np.floor(seg_min[:, :2] / lado), nan=maior + 1), menor, maior + 1)
+            c1 = np.clip(np.nan_to_num(np.floor(seg_max[:, :2] / lado), nan=menor - 1), menor - 1, maior)
+        c0 = c0.astype(np.int64)
+        vao = c1.astype(np.int64) - c0
+        if (vao < 0).any(axis=1).all():
+            return vazio, vazio
+
+        lista_p, lista_c = [], []
+        ultima = len(self._chaves_celulas) - 1
+        for ox in range(int(vao[:, 0].max()) + 1):
+            for oy in range(int(vao[:, 1].max()) + 1):
+                sel = np.flatnonzero((vao[:, 0] >= ox) & (vao[:, 1] >= oy))
+                chaves = self._chave_celula(c0[sel, 0] + ox, c0[sel, 1] + oy)
+                pos = np.minimum(np.searchsorted(self._chaves_celulas, chaves), ultima)
+                achou = self._chaves_celulas[pos] == chaves
+                sel = sel[achou]
+                pos = pos[achou]
+
+                # Expande cada célula nas suas caixas
+                contagens = self._fim_celulas[pos] - self._inicio_celulas[pos]
+                total = int(contagens.sum())
+                deslocamento = np.repeat(self._inicio_celulas[pos] - (np.cumsum(contagens) - contagens), contagens)
+                lista_p.append(np.repeat(sel, contagens))
+                lista_c.append(self._caixas_celulas[deslocamento + np.arange(total)])
+
+        p_idx = np.concatenate(lista_p)
+        c_idx = np.concatenate(lista_c)
+
+        # Uma caixa em várias células aparece repetida
+        if len(lista_p) > 1:
+            pares = np.unique(p_idx * len(self._caixas_objetos) + c_idx)
+            p_idx, c_idx = np.divmod(pares, len(self._caixas_objetos))
+
+        toca = np.all((seg_min[p_idx] <= self._caixas_max[c_idx]) &
+                      (seg_max[p_idx] >= self._caixas_min[c_idx]), axis=1)
+        return p_idx[toca], c_idx[toca]
+
+    def _varrer(self, inicio, fim):
+        """
+        Varre as esferas dos projéteis de inicio a fim contra o chão, os
+        prédios e os gorilas. Toques já existentes no início são ignorados.
+
+        Args:
+            inicio: Array (m, 3) com as posições iniciais.
+            fim: Array (m, 3) com as posições finais.
+
+        Returns:
+            (frações, tipos, objetos): fração do primeiro toque (inf se não
+            houver), índice em TIPOS_IMPACTO e objeto atingido de cada projétil.
+        """
+        m = len(inicio)
+        fracoes = np.full(m, np.inf)
+        tipos = np.zeros(m, dtype=np.int64)
+        objetos = [None] * m
+        if m == 0:
+            return fracoes, tipos, objetos
+
+        r = self.RAIO
+        delta = fim - inicio
+
+        # Chão (plano z = 0, vindo de cima)
+        h0 = inicio[:, 2] - r
+        h1 = fim[:, 2] - r
+        desce = (h0 >= 0.0) & (h1 <= 0.0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            f = np.where(desce, np.where(h0 == h1, 0.0, h0 / (h0 - h1)), np.inf)
+        fracoes = np.minimum(fracoes, f)
+
+        # Prédios: fase ampla pelas células da grade, placas nos pares
+        self._atualizar_caixas()
+        if len(self._caixas_objetos):
+            seg_min = np.minimum(inicio, fim) - r
+            seg_max = np.maximum(inicio, fim) + r
+            p_idx, c_idx = self._pares_candidatos(seg_min, seg_max)
+            if p_idx.size:
+                o = inicio[p_idx]
+                d = delta[p_idx]
+                baixo = self._caixas_min[c_idx] - r
+                alto = self._caixas_max[c_idx] + r
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    t1 = (baixo - o) / d
+                    t2 = (alto - o) / d
+                # Eixos sem movimento: dentro da placa não restringe
+                parado = d == 0.0
+                dentro = (o >= baixo) & (o <= alto)
+                t_menor = np.where(parado, np.where(dentro, -np.inf, np.inf), np.minimum(t1, t2))
+                t_maior = np.where(parado, np.where(dentro, np.inf, -np.inf), np.maximum(t1, t2))
+                entrada = t_menor.max(axis=1)
+                saida = t_maior.min(axis=1)
+                toca = (entrada <= saida) & (entrada >= 0.0) & (entrada <= 1.0)
+
+                for p, c, e in zip(p_idx[toca].tolist(), c_idx[toca].tolist(), entrada[toca].tolist()):
+                    if e < fracoes[p]:
+                        fracoes[p] = e
+                        tipos[p] = 1
+                        objetos[p] = self._caixas_objetos[c]
+
+        # Gorilas: esfera contra esfera com o raio combinado
+        raio_total = r + self.RAIO_GORILA
+        a = np.einsum('ij,ij->i', delta, delta)
+        for gorila in getattr(self.game, 'gorilas', ()):
+            centro = np.array(tuple(gorila.get_pos()), dtype=np.float64)
+            mvec = inicio - centro
+            c = np.einsum('ij,ij->i', mvec, mvec) - raio_total * raio_total
+            b = np.einsum('ij,ij->i', mvec, delta)
+            disc = b * b - a * c
+            candidato = (c > 0.0) & (b < 0.0) & (disc >= 0.0)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                t = np.where(candidato, (-b - np.sqrt(np.maximum(disc, 0.0))) / a, np.inf)
+            melhor = (t <= 1.0) & (t < fracoes)
+            fracoes = np.where(melhor, t, fracoes)
+            tipos[melhor] = 2
+            for p in np.flatnonzero(melhor).tolist():
+                objetos[p] = gorila
+
+        return fracoes, tipos, objetos
+
+
+def obter_gerenciador_projeteis(game):
+    """
+    Retorna o gerenciador de projéteis do jogo, criando-o se necessário.
+
+    Args:
+        game: Referência ao jogo principal.
+
+    Returns:
+        Instância de GerenciadorProjeteis compartilhada pelo jogo.
+    """
+    gerenciador = getattr(game, 'gerenciador_projeteis', None)
+    if gerenciador is None:
+        gerenciador = GerenciadorProjeteis(game)
+        game.gerenciador_projeteis = gerenciador
+    return gerenciador
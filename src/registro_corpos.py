@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Gorillas 3D War - Registro de corpos físicos
+Guarda os corpos do sistema de física por ID, com índices por nó, tag e
+categoria, e uma fila de prioridade com os instantes de expiração.
+"""
+import heapq
+import itertools
+
+
+class RegistroCorpos:
+    """
+    Registro dos corpos físicos ativos.
+
+    Inserção, busca e remoção custam O(1) (mais O(log n) na fila de
+    expiração). A fila é um heap de (instante, id) com remoção preguiçosa:
+    entradas de corpos já removidos são descartadas ao chegarem ao topo, e
+    o heap é reconstruído quando as entradas mortas passam a ser maioria.
+    """
+
+    def __init__(self):
+        """
+        Inicializa o registro vazio.
+        """
+        # Registros por ID
+        self.corpos = {}
+
+        # Índices secundários
+        self._por_node = {}       # PandaNode -> ID
+        self._por_tag = {}        # tag -> conjunto de IDs
+        self._por_categoria = {}  # categoria -> conjunto de IDs
+
+        # Heap de (instante de expiração, ID)
+        self._expiracoes = []
+        self._com_expiracao = 0
+
+        self._ids = itertools.count()
+
+    def __len__(self):
+        return len(self.corpos)
+
+    def __iter__(self):
+        return iter(list(self.corpos.values()))
+
+    def adicionar(self, node_path, nome, tags=None, categoria=None, expira_em=None):
+        """
+        Registra um corpo.
+
+        Args:
+            node_path: NodePath do corpo físico.
+            nome: Nome do corpo.
+            tags: Lista de tags do corpo.
+            categoria: Categoria de colisão do corpo.
+            expira_em: Instante (no relógio da física) em que o corpo deve
+                       ser removido, ou None para corpos permanentes.
+
+        Returns:
+            Registro (dicionário) do corpo, com o ID em 'id'.
+        """
+        id_corpo = next(self._ids)
+        corpo = {
+            'id': id_corpo,
+            'node': node_path,
+            'nome': nome,
+            'tags': list(tags or []),
+            'categoria': categoria,
+            'expira_em': expira_em
+        }
+
+        self.corpos[id_corpo] = corpo
+        self._por_node[node_path.node()] = id_corpo
+        for tag in corpo['tags']:
+            self._por_tag.setdefault(tag, set()).add(id_corpo)
+        if categoria is not None:
+            self._por_categoria.setdefault(categoria, set()).add(id_corpo)
+
+        if expira_em is not None:
+            heapq.heappush(self._expiracoes, (expira_em, id_corpo))
+            self._com_expiracao += 1
+
+        return corpo
+
+    def remover(self, id_corpo):
+        """
+        Remove um corpo de todos os índices.
+
+        Args:
+            id_corpo: ID do corpo.
+
+        Returns:
+            Registro removido ou None se o ID não existir.
+        """
+        corpo = self.corpos.pop(id_corpo, None)
+        if corpo is None:
+            return None
+
+        self._por_node.pop(corpo['node'].node(), None)
+        for tag in corpo['tags']:
+            _descartar(self._por_tag, tag, id_corpo)
+        if corpo['categoria'] is not None:
+            _descartar(self._por_categoria, corpo['categoria'], id_corpo)
+
+        if corpo['expira_em'] is not None:
+            self._com_expiracao -= 1
+            self._compactar_expiracoes()
+
+        return corpo
+
+    def obter(self, id_corpo):
+        """
+        Retorna o registro de um corpo pelo ID, ou None.
+        """
+        return self.corpos.get(id_corpo)
+
+    def obter_por_node(self, node):
+        """
+        Retorna o registro do corpo de um nó do Bullet, ou None.
+
+        Args:
+            node: PandaNode (BulletRigidBodyNode) do corpo.
+        """
+        id_corpo = self._por_node.get(node)
+        if id_corpo is None:
+            return None
+        return self.corpos[id_corpo]
+
+    def com_tag(self, tag):
+        """
+        Retorna os registros dos corpos que têm uma tag.
+        """
+        return [self.corpos[i] for i in self._por_tag.get(tag, ())]
+
+    def da_categoria(self, categoria):
+        """
+        Retorna os registros dos corpos de uma categoria de colisão.
+        """
+        return [self.corpos[i] for i in self._por_categoria.get(categoria, ())]
+
+    def retirar_vencidos(self, agora):
+        """
+        Retira do registro os corpos cujo instante de expiração já passou.
+        Apenas as entradas vencidas do heap são visitadas.
+
+        Args:
+            agora: Instante atual no relógio da física.
+
+        Returns:
+            Lista dos registros retirados.
+        """
+        vencidos = []
+        while self._expiracoes and self._expiracoes[0][0] <= agora:
+            expira_em, id_corpo = heapq.heappop(self._expiracoes)
+
+            # Entrada de um corpo já removido (ou com outro prazo)
+            corpo = self.corpos.get(id_corpo)
+            if corpo is None or corpo['expira_em'] != expira_em:
+                continue
+
+            corpo['expira_em'] = None
+            self._com_expiracao -= 1
+            vencidos.append(self.remover(id_corpo))
+
+        return vencidos
+
+    def definir_expiracao(self, id_corpo, expira_em):
+        """
+        Altera (ou cancela, com None) o instante de expiração de um corpo.
+        A entrada antiga no heap fica morta e é descartada depois.
+        """
+        corpo = self.corpos.get(id_corpo)
+        if corpo is None:
+            return
+
+        if corpo['expira_em'] is not None:
+            self._com_expiracao -= 1
+        corpo['expira_em'] = expira_em
+        if expira_em is not None:
+            heapq.heappush(self._expiracoes, (expira_em, id_corpo))
+            self._com_expiracao += 1
+        self._compactar_expiracoes()
+
+    def _compactar_expiracoes(self):
+        """
+        Reconstrói o heap quando a maioria das entradas está morta.
+        """
+        if len(self._expiracoes) <= 2 * self._com_expiracao + 64:
+            return
+
+        self._expiracoes = [
+            (c['expira_em'], i) for i, c in self.corpos.items() if c['expira_em'] is not None
+        ]
+        heapq.heapify(self._expiracoes)
+
+    def limpar(self):
+        """
+        Esvazia o registro.
+        """
+        self.corpos.clear()
+        self._por_node.clear()
+        self._por_tag.clear()
+        self._por_categoria.clear()
+        self._expiracoes = []
+        self._com_expiracao = 0
+
+
+def _descartar(indice, chave, id_corpo):
+    """
+    Remove um ID de um índice, apagando a chave quando fica vazia.
+    """
+    ids = indice.get(chave)
+    if ids is None:
+        return
+    ids.discard(id_corpo)
+    if not ids:
+        del indice[chave]
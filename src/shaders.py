@@ -45,6 +45,9 @@ class ShaderManager:
         # Shader para efeito de rastro
         trail_shader = self._create_trail_shader()
         self.shaders['trail'] = trail_shader
+        
+        # Shader das fachadas dos prédios (janelas vindas do atlas)
+        self.shaders['fachada'] = criar_shader_fachada()
     
     def _create_explosion_shader(self):
         """
@@ -457,3 +460,122 @@ class ShaderManager:
             node_path: O NodePath do qual remover o shader.
         """
         node_path.clearShader()
+
+
+def criar_shader_fachada():
+    """
+    Cria o shader das fachadas dos prédios.
+    
+    As paredes trazem em p3d_MultiTexCoord0 a posição na grade de janelas
+    (xy, em células) e o canto da região do prédio no atlas (zw, em texels;
+    negativo onde não há janelas), e no atributo 'janela' a fração de cada
+    célula ocupada pela janela. Cada texel do atlas guarda o limiar de
+    acendimento (R), a fase da cintilação (G) e se a célula tem janela (B).
+    
+    Uniforms:
+        atlas_janelas: Textura do atlas.
+        fracao_acesas: Janelas com limiar abaixo deste valor ficam acesas.
+        cintilacao: Intensidade da cintilação das janelas acesas (0 a 1).
+    
+    Returns:
+        Um objeto Shader configurado para as fachadas.
+    """
+    fachada_vsh = """
+    #version 150
+    
+    // Inputs do Panda3D
+    in vec4 p3d_Vertex;
+    in vec3 p3d_Normal;
+    in vec4 p3d_Color;
+    in vec4 p3d_MultiTexCoord0;
+    in vec2 janela;
+    uniform mat4 p3d_ModelViewProjectionMatrix;
+    uniform mat4 p3d_ModelViewMatrix;
+    uniform mat3 p3d_NormalMatrix;
+    
+    // Outputs para o fragment shader
+    out vec3 posicao_vista;
+    out vec3 normal_vista;
+    out vec4 cor;
+    out vec4 fachada;
+    out vec2 fracao;
+    
+    void main() {
+        posicao_vista = (p3d_ModelViewMatrix * p3d_Vertex).xyz;
+        normal_vista = normalize(p3d_NormalMatrix * p3d_Normal);
+        cor = p3d_Color;
+        fachada = p3d_MultiTexCoord0;
+        fracao = janela;
+        gl_Position = p3d_ModelViewProjectionMatrix * p3d_Vertex;
+    }
+    """
+    
+    fachada_fsh = """
+    #version 150
+    
+    // Inputs do vertex shader
+    in vec3 posicao_vista;
+    in vec3 normal_vista;
+    in vec4 cor;
+    in vec4 fachada;
+    in vec2 fracao;
+    
+    // Luzes da cena (ambiente, direcionais e pontuais)
+    uniform struct {
+        vec4 ambient;
+    } p3d_LightModel;
+    uniform struct p3d_LightSourceParameters {
+        vec4 color;
+        vec4 position;
+        vec3 attenuation;
+    } p3d_LightSource[8];
+    
+    // Uniforms
+    uniform sampler2D atlas_janelas;  // Estado das janelas
+    uniform float fracao_acesas;      // Fração de janelas acesas
+    uniform float cintilacao;         // Intensidade da cintilação
+    uniform float osg_FrameTime;      // Tempo atual
+    
+    // Output
+    out vec4 fragColor;
+    
+    void main() {
+        // Iluminação difusa simples
+        vec3 n = normalize(normal_vista);
+        vec3 luz = p3d_LightModel.ambient.rgb;
+        for (int k = 0; k < 8; ++k) {
+            vec4 posicao = p3d_LightSource[k].position;
+            vec3 direcao = posicao.xyz - posicao_vista * posicao.w;
+            float distancia = length(direcao);
+            float atenuacao = 1.0;
+            if (posicao.w != 0.0) {
+                vec3 a = p3d_LightSource[k].attenuation;
+                atenuacao = 1.0 / max(a.x + a.y * distancia + a.z * distancia * distancia, 1e-4);
+            }
+            luz += p3d_LightSource[k].color.rgb * max(dot(n, direcao / max(distancia, 1e-4)), 0.0) * atenuacao;
+        }
+        vec3 resultado = cor.rgb * luz;
+        
+        // Janelas: célula da grade e estado no atlas
+        if (fachada.z >= 0.0) {
+            vec2 celula = floor(fachada.xy);
+            vec2 dentro = fachada.xy - celula;
+            if (celula.x >= 0.0 && celula.y >= 0.0 && all(lessThan(dentro, fracao))) {
+                // O canto no atlas é inteiro; arredonda o valor interpolado
+                vec4 estado = texelFetch(atlas_janelas, ivec2(floor(fachada.zw + 0.5) + celula), 0);
+                if (estado.b > 0.5) {
+                    if (estado.r < fracao_acesas) {
+                        float onda = 0.5 + 0.5 * sin(osg_FrameTime * (2.0 + 6.0 * estado.g) + estado.g * 6.2832);
+                        resultado = vec3(0.9, 0.9, 0.6) * (1.0 - cintilacao * onda);
+                    } else {
+                        resultado = vec3(0.1, 0.1, 0.2) * luz;
+                    }
+                }
+            }
+        }
+        
+        fragColor = vec4(resultado, cor.a);
+    }
+    """
+    
+    return Shader.make(Shader.SL_GLSL, fachada_vsh, fachada_fsh)
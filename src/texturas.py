@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Gorillas 3D War - Texturas procedurais
+Gera as texturas dos efeitos com operações vetorizadas do NumPy e guarda o
+resultado em disco para que os próximos carregamentos sejam imediatos.
+"""
+import os
+import numpy as np
+from panda3d.core import Texture
+
+# Incrementar sempre que algum gerador mudar, invalidando o cache em disco
+VERSAO_GERADORES = 1
+
+
+class GeradorTexturas:
+    """
+    Gerador de texturas procedurais para os efeitos visuais.
+    Cada textura é calculada como um array RGBA inteiro de uma vez e enviada
+    ao Panda3D com uma única cópia de memória.
+    """
+    def __init__(self, diretorio_cache="cache"):
+        """
+        Inicializa o gerador de texturas.
+
+        Args:
+            diretorio_cache: Diretório onde as texturas geradas são guardadas,
+                             relativo à pasta do jogo (a de main.py).
+                             None desativa o cache em disco.
+        """
+        # Caminho absoluto, para não criar um cache novo em cada diretório
+        # de onde o jogo é iniciado
+        if diretorio_cache:
+            raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+            diretorio_cache = os.path.join(raiz, diretorio_cache)
+        self.diretorio_cache = diretorio_cache
+
+        # Texturas já criadas nesta execução
+        self.texturas = {}
+
+        # Geradores disponíveis por tipo
+        self.geradores = {
+            'fumaca': _gerar_fumaca,
+            'fogo': _gerar_fogo,
+            'explosao': _gerar_explosao,
+            'onda': _gerar_onda,
+        }
+
+    def obter(self, tipo, largura, altura, semente=0):
+        """
+        Retorna a textura procedural do tipo pedido, gerando-a se necessário.
+
+        Args:
+            tipo: Tipo de textura ('fumaca', 'fogo', 'explosao', 'onda').
+            largura: Largura da textura em pixels.
+            altura: Altura da textura em pixels.
+            semente: Semente do ruído (usada pela textura de fogo).
+
+        Returns:
+            Textura do Panda3D.
+        """
+        chave = (tipo, largura, altura, semente)
+        if chave in self.texturas:
+            return self.texturas[chave]
+
+        pixels = self._ler_cache(chave)
+        if pixels is None:
+            pixels = self._gerar_pixels(tipo, largura, altura, semente)
+            self._gravar_cache(chave, pixels)
+
+        textura = self._criar_textura(f"{tipo}_procedural", pixels)
+        self.texturas[chave] = textura
+        return textura
+
+    def _gerar_pixels(self, tipo, largura, altura, semente):
+        """
+        Calcula os pixels RGBA (uint8, linha 0 no topo) de uma textura.
+        """
+        if tipo not in self.geradores:
+            raise ValueError(f"Tipo de textura desconhecido: {tipo}")
+
+        # Coordenadas normalizadas: nx por coluna e ny por linha
+        nx = (np.arange(largura, dtype=np.float32) / largura)[None, :]
+        ny = (np.arange(altura, dtype=np.float32) / altura)[:, None]
+
+        rgba = self.geradores[tipo](nx, ny, np.random.default_rng(semente))
+        rgba = np.broadcast_to(rgba, (altura, largura, 4))
+        return (np.clip(rgba, 0.0, 1.0) * 255.0 + 0.5).astype(np.uint8)
+
+    def _criar_textura(self, nome, pixels):
+        """
+        Envia os pixels para uma nova textura em uma única operação.
+        """
+        altura, largura = pixels.shape[:2]
+
+        textura = Texture(nome)
+        textura.setup2dTexture(largura, altura, Texture.T_unsigned_byte, Texture.F_rgba8)
+
+        # O Panda3D guarda a primeira linha na base da imagem
+        textura.setRamImageAs(np.ascontiguousarray(pixels[::-1]).tobytes(), "RGBA")
+        textura.setMagfilter(Texture.FTLinear)
+        textura.setMinfilter(Texture.FTLinearMipmapLinear)
+        return textura
+
+    def _caminho_cache(self, chave):
+        """
+        Retorna o arquivo de cache correspondente aos parâmetros da textura.
+        """
+        tipo, largura, altura, semente = chave
+        nome = f"textura_{tipo}_{largura}x{altura}_s{semente}_v{VERSAO_GERADORES}.npy"
+        return os.path.join(self.diretorio_cache, nome)
+
+    def _ler_cache(self, chave):
+        """
+        Lê os pixels de uma textura do cache em disco, se existirem.
+        """
+        if not self.diretorio_cache:
+            return None
+
+        caminho = self._caminho_cache(chave)
+        if not os.path.exists(caminho):
+            return None
+
+        try:
+            pixels = np.load(caminho)
+        except (OSError, ValueError) as e:
+            print(f"Aviso: Cache de textura inválido em {caminho}: {e}")
+            return None
+
+        tipo, largura, altura, semente = chave
+        if pixels.shape != (altura, largura, 4) or pixels.dtype != np.uint8:
+            return None
+        return pixels
+
+    def _gravar_cache(self, chave, pixels):
+        """
+        Grava os pixels de uma textura no cache em disco.
+        """
+        if not self.diretorio_cache:
+            return
+
+        try:
+            os.makedirs(self.diretorio_cache, exist_ok=True)
+            np.save(self._caminho_cache(chave), pixels)
+        except OSError as e:
+            print(f"Aviso: Não foi possível gravar o cache de textura: {e}")
+
+
+def _distancia_centro(nx, ny):
+    """
+    Distância normalizada de cada pixel ao centro (1.0 na borda).
+    """
+    return np.sqrt((nx - 0.5) ** 2 + (ny - 0.5) ** 2) * 2.0
+
+
+def _empilhar(r, g, b, a):
+    """
+    Combina os canais em um array (altura, largura, 4).
+    """
+    r, g, b, a = np.broadcast_arrays(r, g, b, a)
+    return np.stack((r, g, b, a), axis=-1)
+
+
+def _gerar_fumaca(nx, ny, rng):
+    """
+    Gradiente radial concentrado no centro.
+    """
+    valor = np.maximum(0.0, 1.0 - _distancia_centro(nx, ny)) ** 2
+    return _empilhar(valor, valor, valor, valor * 0.8)
+
+
+def _gerar_fogo(nx, ny, rng):
+    """
+    Gradiente vertical de vermelho para amarelo com ruído.
+    """
+    ruido = rng.random((ny.shape[0], nx.shape[1]), dtype=np.float32) * 0.2
+    r = np.minimum(1.0, 0.7 + ny * 0.3 + ruido)
+    g = ny * 0.7 + ruido * 0.5
+    b = ruido * 0.1
+    return _empilhar(r, g, b, (1.0 - ny) * 0.9)
+
+
+def _gerar_explosao(nx, ny, rng):
+    """
+    Anel largo com cores quentes.
+    """
+    valor = np.sqrt(np.maximum(0.0, 1.0 - np.abs(_distancia_centro(nx, ny) - 0.5) * 2.0))
+    return _empilhar(np.minimum(1.0, valor * 1.5), valor * 0.6, valor * 0.3, valor)
+
+
+def _gerar_onda(nx, ny, rng):
+    """
+    Anel fino e branco para a onda de choque.
+    """
+    valor = np.maximum(0.0, 1.0 - np.abs(_distancia_centro(nx, ny) - 0.8) * 8.0)
+    return _empilhar(1.0, 1.0, 1.0, valor)
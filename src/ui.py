@@ -167,14 +167,45 @@ class GameUI:
         botao_jogar = DirectButton(
             text="Jogar",
             scale=0.1,
-            command=self.game.iniciar_jogo,
+            command=self.game.novo_jogo,
+            extraArgs=[False],
             frameColor=(0.2, 0.6, 0.2, 0.8),
             relief=DGG.FLAT,
             text_fg=(1, 1, 1, 1),
             text_pos=(0, -0.04),
             text_scale=0.8,
             frameSize=(-2, 2, -0.5, 0.5),
-            pos=(0, 0, 0.2),
+            pos=(0, 0, 0.3),
+            parent=self.menu_principal
+        )
+        
+        botao_cpu = DirectButton(
+            text="Contra CPU",
+            scale=0.1,
+            command=self.game.novo_jogo,
+            extraArgs=[True],
+            frameColor=(0.2, 0.4, 0.6, 0.8),
+            relief=DGG.FLAT,
+            text_fg=(1, 1, 1, 1),
+            text_pos=(0, -0.04),
+            text_scale=0.8,
+            frameSize=(-2, 2, -0.5, 0.5),
+            pos=(0, 0, 0.1),
+            parent=self.menu_principal
+        )
+        
+        botao_cidade_grande = DirectButton(
+            text="Cidade Grande",
+            scale=0.1,
+            command=self.game.novo_jogo,
+            extraArgs=[False, 'medio', True],
+            frameColor=(0.5, 0.4, 0.2, 0.8),
+            relief=DGG.FLAT,
+            text_fg=(1, 1, 1, 1),
+            text_pos=(0, -0.04),
+            text_scale=0.8,
+            frameSize=(-2, 2, -0.5, 0.5),
+            pos=(0, 0, -0.1),
             parent=self.menu_principal
         )
         
@@ -188,7 +219,7 @@ class GameUI:
             text_pos=(0, -0.04),
             text_scale=0.8,
             frameSize=(-2, 2, -0.5, 0.5),
-            pos=(0, 0, -0.1),
+            pos=(0, 0, -0.3),
             parent=self.menu_principal
         )
         
@@ -243,7 +274,7 @@ class GameUI:
         botao_reiniciar = DirectButton(
             text="Reiniciar",
             scale=0.07,
-            command=self.game.iniciar_jogo,
+            command=self.game.reiniciar_partida,
             frameColor=(0.4, 0.4, 0.6, 0.8),
             relief=DGG.FLAT,
             text_fg=(1, 1, 1, 1),
@@ -378,6 +409,8 @@ class GameUI:
         """
         # Jogador atual
         jogador_texto = f"Jogador {self.game.jogador_atual + 1}"
+        if self.game.contra_cpu and self.game.jogador_atual == 1:
+            jogador_texto = "CPU"
         cor = (1, 0.2, 0.2, 1) if self.game.jogador_atual == 0 else (0.2, 1, 0.2, 1)
         self.jogador_texto.setText(jogador_texto)
         self.jogador_texto.setFg(cor)
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Testes do motor de partículas quando a capacidade acaba.
+"""
+import os
+import sys
+
+import numpy as np
+from panda3d.core import NodePath
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.effects import EffectsSystem
+from src.particulas import MotorParticulas
+
+
+class PoolFalso:
+    """
+    Pool de sprites que conta quantos estão fora do pool.
+    """
+    def __init__(self):
+        self.emprestados = set()
+
+    def get_particle(self):
+        node = NodePath('sprite')
+        self.emprestados.add(node)
+        return node
+
+    def release_particle(self, node):
+        self.emprestados.remove(node)
+
+
+def _lote(n):
+    """
+    Arrays de emissão para n partículas.
+    """
+    return (np.zeros((n, 3), dtype=np.float32), np.zeros((n, 3), dtype=np.float32),
+            np.ones(n, dtype=np.float32), np.ones(n, dtype=np.float32),
+            np.ones((n, 4), dtype=np.float32))
+
+
+def test_emitir_devolve_nodes_sem_slot():
+    motor = MotorParticulas(capacidade=4)
+    pool = PoolFalso()
+    motor.ao_expirar = pool.release_particle
+
+    nodes = [pool.get_particle() for _ in range(6)]
+    slots = motor.emitir(*_lote(6), nodes=nodes)
+
+    assert len(slots) == 4
+    assert motor.num_livres == 0
+    assert pool.emprestados == set(nodes[:4])
+
+    motor.liberar(slots)
+    assert not pool.emprestados
+
+
+def test_fumaca_com_motor_cheio_nao_vaza_sprites():
+    efeitos = EffectsSystem.__new__(EffectsSystem)
+    efeitos.texturas = {}
+    efeitos.pool_particulas_fumaca = PoolFalso()
+    efeitos.motor_fumaca = MotorParticulas(capacidade=10, lei_escala=MotorParticulas.ESCALA_CRESCIMENTO)
+    efeitos.motor_fumaca.ao_expirar = efeitos.pool_particulas_fumaca.release_particle
+
+    explosoes = [{'id': i, 'posicao': (0.0, 0.0, 0.0)} for i in range(3)]
+    for explosao in explosoes:
+        efeitos._criar_fumaca_explosao(explosao, 6, 5.0, 2.0)
+
+    assert [len(explosao['fumaca']) for explosao in explosoes] == [6, 4, 0]
+    assert len(efeitos.pool_particulas_fumaca.emprestados) == efeitos.motor_fumaca.num_ativas == 10
+
+    efeitos.motor_fumaca.liberar(np.flatnonzero(efeitos.motor_fumaca.ativas))
+    assert not efeitos.pool_particulas_fumaca.emprestados